@@ -16,6 +16,9 @@ public class Main {
         SensorTcpServer sensorServer = new SensorTcpServer(SENSOR_PORT);
         DoorlockServer doorlockServer = new DoorlockServer(DOOR_PORT);
 
+        // 센서 원본 줄을 명령 포트로 중계 (SUBSCRIBE SENSOR를 보낸 파이썬 연결에만)
+        sensorServer.addPacketListener(commandServer::sendSensor);
+
         // 2. 서버 실행 ( 중요 수정: 각각 별도 스레드에서 실행)
         // 이렇게 해야 하나가 연결 대기 중이라도 다른 코드(GUI)가 멈추지 않습니다.
         new Thread(() -> commandServer.start()).start();
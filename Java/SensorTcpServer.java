@@ -24,6 +24,17 @@ public class SensorTcpServer {
         this.sensorListener = listener;
     }
 
+    // 원본 SENSOR 줄 전달 (파이썬 런타임이 명령 포트로 받아 센서 저장소에 반영)
+    private PacketListener packetListener;
+
+    public interface PacketListener {
+        void onPacket(String line);
+    }
+
+    public void addPacketListener(PacketListener listener) {
+        this.packetListener = listener;
+    }
+
     // =============== 센서 수신 서버 ===============
     public void start() {
         try (ServerSocket serverSocket = new ServerSocket(port)) {
@@ -42,6 +53,9 @@ public class SensorTcpServer {
             while ((line = in.readLine()) != null) {
                 if (line.startsWith("SENSOR")) {
                     parseSensorPacket(line);
+                    if (packetListener != null) {
+                        packetListener.onPacket(line);
+                    }
                 }
             }
 
@@ -333,7 +333,9 @@ public class SmartHomeGUI {
             return; 
         }
 
-        if (cmd.equals("REQ_TEMP")) {
+        // REQ_TEMP 또는 REQ_TEMP #요청ID -> CURRENT_TEMP:값 [#요청ID]
+        if (cmd.equals("REQ_TEMP") || cmd.startsWith("REQ_TEMP #")) {
+            String reqId = cmd.substring("REQ_TEMP".length()).trim();
             String currentText = lblTemp.getText();
             System.out.println("[JAVA] 현재 GUI 온도: " + currentText);
 
@@ -341,7 +343,7 @@ public class SmartHomeGUI {
             
             if(tempStr.isEmpty()) tempStr = "0.0"; 
 
-            String response = "CURRENT_TEMP:" + tempStr;
+            String response = "CURRENT_TEMP:" + tempStr + (reqId.isEmpty() ? "" : " " + reqId);
             commandServer.sendCommand(response);
             System.out.println("[JAVA] 온도 응답 전송: " + response);
             return;
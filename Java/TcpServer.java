@@ -7,6 +7,8 @@ import java.net.Socket;
 import java.util.ArrayList;
 import java.util.Collections;
 import java.util.List;
+import java.util.Set;
+import java.util.concurrent.ConcurrentHashMap;
 
 /**
  * 브로드 캐스트로 파이썬으로 전송
@@ -16,6 +18,8 @@ public class TcpServer {
 
     private final int port;
     private final List<PrintWriter> clients = Collections.synchronizedList(new ArrayList<>());
+    // 'SUBSCRIBE SENSOR'를 보낸 클라이언트 (파이썬 런타임)만 센서 원본 줄을 받음
+    private final Set<PrintWriter> sensorSubscribers = ConcurrentHashMap.newKeySet();
     private CommandListener commandListener;
 
     public TcpServer(int port) {
@@ -60,6 +64,12 @@ public class TcpServer {
             while ((line = in.readLine()) != null) {
                 String cmd = line.trim();
                 if (cmd.isEmpty()) continue;
+                if (cmd.equals("SUBSCRIBE SENSOR")) {
+                    // 구독 요청은 다른 클라이언트로 중계하지 않음
+                    sensorSubscribers.add(writer);
+                    System.out.println("센서 중계 구독: " + clientSocket.getInetAddress());
+                    continue;
+                }
                 System.out.println("명령어 받음: " + cmd);
                 if (commandListener != null) {
                     commandListener.onCommand(cmd);
@@ -69,6 +79,7 @@ public class TcpServer {
         } catch (IOException ignored) {
         } finally {
             clients.remove(writer);
+            sensorSubscribers.remove(writer);
             System.out.println("명령어 클라이언트 연결 종료");
             try { clientSocket.close(); } catch (Exception ignored) {}
         }
@@ -91,4 +102,14 @@ public class TcpServer {
     public void sendCommand(String cmd) {
         broadcast(cmd, null);
     }
+
+    // 센서 원본 줄은 구독한 클라이언트에게만 전송 (POP 보드 노트북 등 명령 클라이언트에는 보내지 않음)
+    public void sendSensor(String line) {
+        for (PrintWriter out : sensorSubscribers) {
+            out.println(line);
+            if (out.checkError()) {
+                sensorSubscribers.remove(out);
+            }
+        }
+    }
 }
@@ -0,0 +1,104 @@
+## LLM 답변 캐시 + 문장 단위 분할
+## 같은 질문("오늘 날씨 어때?")은 정규화한 질문 + 언어를 키로 메모리 LRU에 저장해 두고, 질문 종류(인텐트)별 TTL 안에서는
+## 네트워크 호출 없이 바로 답한다 (날씨는 짧게, 일반 상식은 길게, 실내 상태처럼 실시간 값에 기대는 질문은 저장하지 않음).
+## SentenceSplitter는 스트리밍으로 조금씩 오는 답변을 문장이 끝날 때마다 잘라 내서 첫 문장부터 바로 TTS로 넘길 수 있게 한다.
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from intent_engine import normalize
+
+# 인텐트 -> (판별 키워드, TTL 초). 위에서부터 처음 맞는 인텐트를 사용하고, 없으면 DEFAULT_INTENT
+INTENT_RULES = (
+    ("live", ("실내", "집안", "온도", "습도", "indoor", "temperature", "humidity", "室内", "温度", "湿度"), 0),
+    ("weather", ("날씨", "기온", "비와", "비 와", "weather", "rain", "天気", "tenki", "雨"), 10 * 60),
+    ("time", ("오늘", "지금", "내일", "뉴스", "today", "now", "tomorrow", "news", "今日", "今", "明日"), 30 * 60),
+)
+DEFAULT_INTENT = ("fact", 24 * 60 * 60)
+
+
+def _keyword_pattern(kws):
+    """영어 키워드는 단어 경계로만 ("now"가 "know"/"snow" 안에서 걸리지 않도록), 한국어/일본어는 부분 일치"""
+    parts = [rf"\b{re.escape(k)}\b" if k.isascii() else re.escape(k) for k in kws]
+    return re.compile("|".join(parts))
+
+
+_INTENT_PATTERNS = tuple((name, _keyword_pattern(kws), ttl) for name, kws, ttl in INTENT_RULES)
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?。！？])\s+|(?<=[。！？])|\n+")
+
+
+def classify(text):
+    """질문 -> (인텐트 이름, TTL 초)"""
+    lowered = text.lower()
+    for name, pattern, ttl in _INTENT_PATTERNS:
+        if pattern.search(lowered):
+            return name, ttl
+    return DEFAULT_INTENT
+
+
+class AnswerCache:
+    """(정규화 질문, 언어) -> 답변, 인텐트별 TTL이 있는 LRU"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()     # 키 -> (답변, 만료 monotonic 시각, 인텐트)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(text, lang):
+        return f"{lang}\0{normalize(text)}"
+
+    def get(self, text, lang):
+        """캐시된 답변 또는 None"""
+        key = self.make_key(text, lang)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, text, lang, answer):
+        """답변 저장 (TTL 0인 인텐트나 빈 답변은 저장하지 않음). 저장했으면 인텐트 이름"""
+        intent, ttl = classify(text)
+        if ttl <= 0 or not answer:
+            return None
+        key = self.make_key(text, lang)
+        with self._lock:
+            self._entries[key] = (answer, time.monotonic() + ttl, intent)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return intent
+
+
+class SentenceSplitter:
+    """스트리밍 텍스트 조각을 받아 완성된 문장만 돌려줌"""
+
+    def __init__(self):
+        self._buf = ""
+
+    def feed(self, chunk):
+        """새 조각을 넣고 이번에 끝난 문장 목록 반환"""
+        parts = _SENTENCE_END_RE.split(self._buf + chunk)
+        self._buf = parts.pop()
+        return [p.strip() for p in parts if p.strip()]
+
+    def flush(self):
+        """남은 마지막 문장 (없으면 빈 목록)"""
+        rest, self._buf = self._buf.strip(), ""
+        return [rest] if rest else []
+
+
+def split_sentences(text):
+    splitter = SentenceSplitter()
+    return splitter.feed(text) + splitter.flush()
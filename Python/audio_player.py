@@ -0,0 +1,151 @@
+## 음성 출력 전용 재생 워커
+## speak 요청을 우선순위 큐에 넣고 바로 반환한다 (fire-and-forget). 재생은 전용 스레드 하나가 순서대로 처리하므로
+## 여러 스레드에서 동시에 말해도 겹치지 않고, 제어 명령 전송이 음성 재생을 기다리지 않는다.
+## 새 요청이 끼어들기(barge-in)로 들어오면 현재 재생을 끊고 낮은 우선순위 대기 항목을 버린다.
+import io
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 우선순위 (숫자가 작을수록 먼저 재생)
+PRIORITY_ALERT = 0     # 경고/보안 안내
+PRIORITY_COMMAND = 1   # 기기 제어/도어 안내
+PRIORITY_NORMAL = 2    # 일반 안내
+PRIORITY_CHAT = 3      # LLM 답변
+
+
+class Utterance:
+    """재생 요청 하나 (cancel()로 취소, done으로 완료 대기)"""
+
+    def __init__(self, text, lang, priority, tag, trace=None):
+        self.text = text
+        self.lang = lang
+        self.priority = priority
+        self.tag = tag
+        self.trace = trace        # tracing.Trace (있으면 합성/재생 시간을 기록)
+        self.cancelled = False
+        self.done = threading.Event()
+        self.audio_future = None   # (mp3 경로, mp3 바이트)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+
+class AudioPlayer:
+    """TTS 캐시의 mp3를 받아 한 스레드에서 순서대로 재생하는 플레이어"""
+
+    POLL_SEC = 0.05
+
+    def __init__(self, resolve_audio):
+        # resolve_audio(text, lang) -> (mp3 경로, mp3 바이트) (TTSCache.get_audio)
+        self.resolve_audio = resolve_audio
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._current = None
+        self._stop_current = threading.Event()
+        self._lock = threading.Lock()
+        self._outstanding = 0     # say() 후 아직 끝나지 않은(재생/취소) 요청 수
+        # 재생 중에 다음 문장 합성을 미리 받아 둠
+        self._prefetch = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tts-prefetch")
+        # 재생 스레드는 첫 요청 때(또는 start()로) 시작 (모듈 import만으로는 스레드/오디오 장치를 건드리지 않음)
+        self._worker = None
+
+    def start(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="audio-player", daemon=True)
+                self._worker.start()
+
+    def say(self, text, lang="ko", priority=PRIORITY_NORMAL, barge_in=False, tag=None, trace=None):
+        """재생 요청을 큐에 넣고 즉시 반환"""
+        self.start()
+        item = Utterance(text, lang, priority, tag, trace)
+        with self._lock:
+            self._outstanding += 1
+        item.audio_future = self._prefetch.submit(self._resolve, item)
+        if barge_in:
+            self._drop(lambda other: other.priority >= priority)
+        self._queue.put((priority, next(self._seq), item))
+        return item
+
+    def _resolve(self, item):
+        started = time.perf_counter()
+        audio = self.resolve_audio(item.text, item.lang)
+        if item.trace is not None:
+            item.trace.record("tts_fetch", time.perf_counter() - started)
+        return audio
+
+    def pending(self):
+        """대기 중이거나 재생 중인 요청 수"""
+        with self._lock:
+            return self._outstanding
+
+    def cancel(self, tag=None):
+        """tag가 같은 요청(없으면 전부)을 취소하고 재생 중이면 중단"""
+        self._drop(lambda other: tag is None or other.tag == tag)
+
+    def _drop(self, predicate):
+        with self._lock:
+            with self._queue.mutex:
+                pending = [entry[2] for entry in self._queue.queue]
+            for other in pending:
+                if predicate(other):
+                    other.cancel()
+            if self._current is not None and predicate(self._current):
+                self._current.cancel()
+                self._stop_current.set()
+
+    # -----------------------------------------------------
+    # 재생 스레드
+    # -----------------------------------------------------
+    def _run(self):
+        while True:
+            _, _, item = self._queue.get()
+            try:
+                if item.cancelled:
+                    continue
+                path, data = item.audio_future.result()
+                with self._lock:
+                    if item.cancelled:
+                        continue
+                    self._current = item
+                    self._stop_current.clear()
+                started = time.perf_counter()
+                if item.trace is not None:
+                    # 파이프라인 시작부터 첫 소리가 나기까지 (사용자가 체감하는 응답 시간)
+                    item.trace.record("first_audio", item.trace.elapsed(), once=True)
+                self._play(path, data)
+                if item.trace is not None:
+                    item.trace.record("playback", time.perf_counter() - started)
+            except Exception as e:
+                print(f"[TTS] Error: {e}")
+            finally:
+                with self._lock:
+                    self._current = None
+                    self._outstanding -= 1
+                item.done.set()
+
+    def _play(self, path, mp3):
+        # 오디오 라이브러리는 실제로 재생할 때 읽음 (오디오 장치가 없는 환경에서도 import 가능하도록)
+        import sounddevice as sd
+        import soundfile as sf
+        try:
+            # 캐시가 준 바이트에서 바로 디코딩 (파일은 playsound 대체 경로에서만 사용)
+            data, sr = sf.read(io.BytesIO(mp3), dtype="float32")
+        except Exception:
+            # libsndfile이 mp3를 못 읽는 환경이면 기존 방식으로 재생 (중간 취소 불가)
+            from playsound import playsound
+            playsound(path)
+            return
+        sd.play(data, sr)
+        stream = sd.get_stream()
+        while stream.active:
+            if self._stop_current.wait(self.POLL_SEC):
+                sd.stop()
+                return
+        sd.wait()
@@ -0,0 +1,84 @@
+## 마이크 녹음기
+## 폴링용 읽기 스레드 대신 sounddevice 콜백이 미리 할당된 float32 버퍼에 바로 써 넣는다.
+## 최대 음량(peak)은 블록이 들어올 때마다 갱신하고, 전사기에는 복사 없이 버퍼의 뷰를 넘긴다.
+## 최대 녹음 길이를 넘으면 더 받지 않고 스트림을 멈춰서 메모리가 끝없이 늘지 않는다.
+import threading
+import numpy as np
+
+
+class AudioBuffer:
+    """float32 모노 오디오 누적 버퍼 (미리 할당, 필요하면 두 배씩 늘리되 max_sec에서 멈춤)"""
+
+    def __init__(self, sample_rate=16000, initial_sec=10, max_sec=30):
+        self.sample_rate = sample_rate
+        self.max_samples = int(sample_rate * max_sec)
+        self._data = np.zeros(min(int(sample_rate * initial_sec), self.max_samples), dtype=np.float32)
+        self._len = 0
+        self.peak = 0.0            # 지금까지의 최대 절대값 (전체 배열을 다시 훑지 않도록 누적)
+        self.full = False
+        self._lock = threading.Lock()
+
+    def append(self, chunk):
+        """청크를 이어 붙임. 최대 길이에 도달하면 잘라 넣고 False"""
+        chunk = np.asarray(chunk, dtype=np.float32).reshape(-1)
+        with self._lock:
+            room = self.max_samples - self._len
+            if len(chunk) > room:
+                chunk = chunk[:room]
+                self.full = True
+            need = self._len + len(chunk)
+            if need > len(self._data):
+                # 기존 구간은 수정되지 않으므로 이전 배열의 뷰를 들고 있는 쪽도 안전함
+                grown = np.zeros(min(max(need, len(self._data) * 2), self.max_samples), dtype=np.float32)
+                grown[:self._len] = self._data[:self._len]
+                self._data = grown
+            self._data[self._len:need] = chunk
+            self._len = need
+            if len(chunk):
+                self.peak = max(self.peak, float(np.max(np.abs(chunk))))
+            return not self.full
+
+    def view(self, start=0, end=None):
+        """복사 없이 [start, end) 구간 뷰 반환"""
+        with self._lock:
+            end = self._len if end is None else min(end, self._len)
+            return self._data[start:end]
+
+    def __len__(self):
+        return self._len
+
+
+class AudioRecorder:
+    """sounddevice 입력 콜백으로 AudioBuffer를 채우는 녹음기"""
+
+    def __init__(self, buffer, on_audio=None, block_sec=0.1):
+        # on_audio(): 새 오디오가 버퍼에 들어올 때마다 콜백 스레드에서 호출 (가볍게 유지할 것)
+        self.buffer = buffer
+        self.on_audio = on_audio
+        self.blocksize = int(buffer.sample_rate * block_sec)
+        self._stream = None
+
+    def _callback(self, indata, frames, time_info, status):
+        if status:
+            print(f"[Voice] 입력 상태: {status}")
+        ok = self.buffer.append(indata[:, 0])
+        if self.on_audio:
+            self.on_audio()
+        if not ok:
+            print("[Voice] 최대 녹음 길이 도달 -> 녹음 중단")
+            import sounddevice as sd
+            raise sd.CallbackStop
+
+    def start(self):
+        # 마이크를 쓸 때만 PortAudio를 읽음 (오디오 장치가 없는 환경에서도 import 가능하도록)
+        import sounddevice as sd
+        self._stream = sd.InputStream(channels=1, samplerate=self.buffer.sample_rate, dtype=np.float32,
+                                      blocksize=self.blocksize, callback=self._callback)
+        self._stream.start()
+
+    def stop(self):
+        """스트림 정지 (반환 시점에는 콜백이 더 이상 호출되지 않으므로 별도 대기 불필요)"""
+        stream, self._stream = self._stream, None
+        if stream is not None:
+            stream.stop()
+            stream.close()
@@ -0,0 +1,81 @@
+## 자동화 디스패처 (문 열림 이벤트 병합 + 동작 키별 중복 제거 + 선언형 규칙)
+## 문이 한 번 열리면 얼굴 인증/음성 '문 열어'의 UNLOCK 전송, Java가 보내는 UNLOCKED 도어 이벤트, 연속으로 튀는 도어 신호가 잇달아 들어온다.
+## 경로마다 따로 쿨타임을 두면 안내 음성, REQ_TEMP 왕복, UNLOCK 전송이 겹쳐 실행되므로 여기 한 곳에서 거른다.
+##  - coalesce(): 같은 종류의 이벤트는 window초 안에 들어온 것을 하나로 병합 (첫 이벤트에서 바로 처리, 이후는 합치기만)
+##  - once(): 동작 키("UNLOCK", "smart_care" 등)별 마지막 실행 시각으로 ttl초 안의 중복 실행을 거름
+##  - Rule/evaluate(): "센서 비교 -> 명령 + 안내"를 데이터로 적고 병합된 이벤트마다 한 번 평가
+## 시간은 모두 monotonic 시계 기준 (시스템 시각이 바뀌어도 쿨타임이 틀어지지 않음).
+import math
+import operator
+import threading
+import time
+from collections import Counter, namedtuple
+
+OPS = {"<=": operator.le, ">=": operator.ge, "<": operator.lt, ">": operator.gt}
+
+# sensor 값이 (op, threshold)를 만족하면 command 전송 + message 안내
+Rule = namedtuple("Rule", "name sensor op threshold command message")
+
+
+def evaluate(rules, readings):
+    """readings(센서 -> 값)를 만족하는 규칙 목록 (값이 없는 센서의 규칙은 건너뜀)"""
+    return [rule for rule in rules
+            if readings.get(rule.sensor) is not None and OPS[rule.op](readings[rule.sensor], rule.threshold)]
+
+
+class Event:
+    """병합된 이벤트 하나 (sources: 병합 창 안에 들어온 출처, 처리 중에도 계속 추가됨)"""
+
+    def __init__(self, kind, source, opened):
+        self.kind = kind
+        self.source = source       # 창을 연 첫 출처
+        self.sources = [source]
+        self.opened = opened
+
+
+class AutomationDispatcher:
+    """이벤트 종류별 병합 창 + 동작 키별 마지막 실행 시각 (스레드 안전)"""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._open = {}            # 종류 -> (Event, 창이 닫히는 시각)
+        self._seen = {}            # 종류 -> 마지막으로 들어온 시각 (병합된 것 포함)
+        self._done = {}            # 동작 키 -> 마지막 실행 시각
+        self.counts = Counter()
+
+    def coalesce(self, kind, source, window):
+        """새 창을 열었으면 Event (호출 측이 한 번 처리), 열린 창에 병합됐으면 None"""
+        now = self.clock()
+        with self._lock:
+            self._seen[kind] = now
+            opened = self._open.get(kind)
+            if opened is not None and now < opened[1]:
+                event = opened[0]
+                event.sources.append(source)
+                self.counts[f"{kind}.coalesced"] += 1
+            else:
+                event = Event(kind, source, now)
+                self._open[kind] = (event, now + window)
+                self.counts[f"{kind}.dispatched"] += 1
+                return event
+        print(f"[Auto] {kind} 병합: {source} (창을 연 출처 {event.source}, "
+              f"{now - event.opened:.2f}초 뒤, {len(event.sources)}번째)")
+        return None
+
+    def since(self, kind):
+        """kind 이벤트가 마지막으로 들어온 뒤 지난 초 (없으면 inf)"""
+        with self._lock:
+            seen = self._seen.get(kind)
+        return math.inf if seen is None else self.clock() - seen
+
+    def once(self, key, ttl):
+        """key 동작을 지금 실행해도 되면 True (실행 시각 기록), ttl초 안에 이미 실행했으면 False"""
+        now = self.clock()
+        with self._lock:
+            last = self._done.get(key)
+            if last is not None and now - last < ttl:
+                self.counts[f"{key}.deduped"] += 1
+                return False
+            self._done[key] = now
+            return True
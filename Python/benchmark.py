@@ -0,0 +1,445 @@
+## 오프라인 벤치마크 / 재생 하네스
+## Java GUI, POP 보드, 웹캠, 마이크, Gemini, Google TTS 없이 main.py 파이프라인을 그대로 돌려서 단계별 지연 시간을 잰다.
+##  - 명령 포트(39186)/도어락 포트(39189)는 프로세스 안의 가짜 TCP 서버가 대신하고, 음성 트리거 포트(40191)에는 클라이언트로 붙는다.
+##  - 마이크 대신 recordings/*.wav를 녹음 버퍼에 흘려 넣고, 웹캠 대신 영상/이미지 파일을 카메라 프레임으로 돌려준다.
+##  - Gemini/TTS/날씨 조회는 지연 시간만 흉내 내는 대역으로 바꾼다 (Whisper/face_recognition은 설치돼 있으면 실제 모델 사용).
+## 결과는 main.tracer의 단계별 p50/p95와 파이프라인별 처리량으로 출력한다.
+##   python benchmark.py --repeat 5
+##   python benchmark.py --fake-stt --faces ./fixtures/owner.mp4 --json bench.json
+import argparse
+import asyncio
+import glob
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# ---------------------------------------------------------
+# 입력 대역 (마이크/카메라)
+# ---------------------------------------------------------
+def read_wav(path, sample_rate=16000):
+    """WAV -> float32 모노 (-1~1), 필요하면 선형 보간으로 sample_rate에 맞춤"""
+    try:
+        with wave.open(path, "rb") as w:
+            width, channels, rate = w.getsampwidth(), w.getnchannels(), w.getframerate()
+            raw = w.readframes(w.getnframes())
+        dtype = {1: np.uint8, 2: np.int16, 4: np.int32}[width]
+        audio = np.frombuffer(raw, dtype=dtype).astype(np.float32)
+        audio = (audio - 128.0) / 128.0 if width == 1 else audio / float(np.iinfo(dtype).max)
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    except (wave.Error, KeyError):
+        # float WAV 등 wave 모듈이 못 읽는 형식
+        import soundfile as sf
+        audio, rate = sf.read(path, dtype="float32", always_2d=True)
+        audio = audio.mean(axis=1)
+    if rate != sample_rate:
+        n = int(len(audio) * sample_rate / rate)
+        audio = np.interp(np.linspace(0, len(audio) - 1, n), np.arange(len(audio)), audio).astype(np.float32)
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+class WavFeeder:
+    """AudioRecorder 대역: WAV를 block_sec 단위로 녹음 버퍼에 넣음 (speed배속)"""
+
+    def __init__(self, audio, buffer, on_audio=None, block_sec=0.1, speed=1.0):
+        self.audio = audio
+        self.buffer = buffer
+        self.on_audio = on_audio
+        self.block = int(buffer.sample_rate * block_sec)
+        self.interval = block_sec / speed if speed > 0 else 0.0
+        self.done = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        for start in range(0, len(self.audio), self.block):
+            if self._stop.is_set():
+                break
+            ok = self.buffer.append(self.audio[start:start + self.block])
+            if self.on_audio:
+                self.on_audio()
+            if not ok or self._stop.wait(self.interval):
+                break
+        self.done.set()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="wav-feeder", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def load_frames(path, limit=300):
+    """영상 파일 또는 이미지 폴더 -> BGR 프레임 목록 (--faces를 줄 때만 OpenCV가 필요)"""
+    import cv2
+    if os.path.isdir(path):
+        files = sorted(f for ext in ("*.jpg", "*.jpeg", "*.png") for f in glob.glob(os.path.join(path, ext)))
+        frames = [cv2.imread(f) for f in files[:limit]]
+        frames = [f for f in frames if f is not None]
+    else:
+        cap = cv2.VideoCapture(path)
+        frames = []
+        while len(frames) < limit:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frames.append(frame)
+        cap.release()
+    if not frames:
+        raise ValueError(f"프레임을 읽지 못했습니다: {path}")
+    # 크기가 다르면 첫 프레임 크기로 맞춤 (카메라처럼 고정 해상도)
+    h, w = frames[0].shape[:2]
+    return [f if f.shape[:2] == (h, w) else cv2.resize(f, (w, h)) for f in frames]
+
+
+class FrameCamera:
+    """CameraService 대역: 미리 읽은 프레임을 fps 속도로 반복 재생"""
+
+    def __init__(self, frames, fps=30.0):
+        self.frames = frames
+        self.fps = fps
+        self._started = time.monotonic()
+
+    def acquire(self, timeout=3.0):
+        return True
+
+    def release(self):
+        pass
+
+    def frame_shape(self):
+        return self.frames[0].shape
+
+    def latest(self, last_seq=0, out=None, timeout=1.0):
+        seq = max(last_seq + 1, int((time.monotonic() - self._started) * self.fps))
+        wait = seq / self.fps - (time.monotonic() - self._started)
+        if wait > 0:
+            time.sleep(wait)
+        frame = self.frames[seq % len(self.frames)]
+        if out is not None:
+            np.copyto(out, frame)
+            return seq, out
+        return seq, frame
+
+
+# ---------------------------------------------------------
+# 외부 서비스 대역 (Gemini / TTS / Whisper)
+# ---------------------------------------------------------
+class FakeGemini:
+    """generate_content(stream=True) 흉내: 첫 토큰 지연 후 조각 단위로 답변"""
+
+    ANSWER = "벤치마크용 답변입니다. 실제 모델은 호출하지 않았습니다."
+
+    def __init__(self, first_token_sec=0.4, chunk_sec=0.05):
+        self.first_token_sec = first_token_sec
+        self.chunk_sec = chunk_sec
+
+    def generate_content(self, prompt, stream=False):
+        time.sleep(self.first_token_sec)
+        words = self.ANSWER.split(" ")
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(self.chunk_sec)
+            yield SimpleNamespace(text=word + (" " if i < len(words) - 1 else ""))
+
+
+def make_fake_tts(delay_sec=0.15):
+    def fetch(text, lang):
+        time.sleep(delay_sec)
+        return b"ID3" + text.encode("utf-8")
+    return fetch
+
+
+class FakeWhisper:
+    """WhisperModel.transcribe 흉내: 오디오 길이에 비례해 기다리고 옆의 .txt(없으면 빈 문자열)를 돌려줌"""
+
+    def __init__(self, transcripts, sec_per_audio_sec=0.15):
+        self.transcripts = transcripts      # 재생 중인 WAV의 정답 문장 (하네스가 갱신)
+        self.sec_per_audio_sec = sec_per_audio_sec
+
+    def transcribe(self, audio, beam_size=5, language=None, **kwargs):
+        time.sleep(len(audio) / 16000 * self.sec_per_audio_sec * (1.0 if beam_size > 1 else 0.5))
+        text = self.transcripts.get("current", "")
+        segs = [SimpleNamespace(text=text, avg_logprob=-0.1, no_speech_prob=0.0)] if text else []
+        return iter(segs), SimpleNamespace(language=language or "ko")
+
+
+# ---------------------------------------------------------
+# Java 서버 대역 (명령 포트 + 도어락 포트)
+# ---------------------------------------------------------
+class FakeJava:
+    """명령 포트: 받은 줄 기록 + REQ_TEMP 응답, 도어락 포트: door_event()로 이벤트 전송"""
+
+    def __init__(self, temp=29.0):
+        self.temp = temp
+        self.received = []         # (monotonic 시각, 줄)
+        self._cmd_writers = []
+        self._door_writers = []
+        self._changed = asyncio.Event()
+        self.cmd_port = self.door_port = None
+
+    async def start(self):
+        self._cmd_server = await asyncio.start_server(self._on_cmd, "127.0.0.1", 0)
+        self._door_server = await asyncio.start_server(self._on_door, "127.0.0.1", 0)
+        self.cmd_port = self._cmd_server.sockets[0].getsockname()[1]
+        self.door_port = self._door_server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        for server in (self._cmd_server, self._door_server):
+            server.close()
+        for writer in self._cmd_writers + self._door_writers:
+            writer.close()
+
+    async def _on_cmd(self, reader, writer):
+        self._cmd_writers.append(writer)
+        while line := await reader.readline():
+            text = line.decode("utf-8", "replace").strip()
+            self.received.append((time.monotonic(), text))
+            self._changed.set()
+            kind, _, rid = text.partition(" ")
+            if kind == "REQ_TEMP":
+                writer.write(f"CURRENT_TEMP:{self.temp} {rid}".strip().encode() + b"\n")
+                await writer.drain()
+
+    async def _on_door(self, reader, writer):
+        self._door_writers.append(writer)
+        await reader.read()
+
+    async def wait_connected(self, timeout=5.0):
+        end = time.monotonic() + timeout
+        while not (self._cmd_writers and self._door_writers) and time.monotonic() < end:
+            await asyncio.sleep(0.05)
+
+    async def broadcast(self, line):
+        """GUI가 보낸 명령처럼 파이썬 쪽으로 중계"""
+        for writer in self._cmd_writers:
+            writer.write(line.encode("utf-8") + b"\n")
+            await writer.drain()
+
+    async def door_event(self, kind):
+        for writer in self._door_writers:
+            writer.write(kind.encode("utf-8") + b"\n")
+            await writer.drain()
+
+    async def wait_command(self, since, kinds, timeout):
+        """since 이후에 받은 줄 중 kinds로 시작하는 첫 줄의 (시각, 줄) 또는 None"""
+        end = time.monotonic() + timeout
+        while True:
+            for ts, text in self.received:
+                if ts >= since and text.split(" ")[0] in kinds:
+                    return ts, text
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return None
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# ---------------------------------------------------------
+# 실행
+# ---------------------------------------------------------
+def patch_main(main, args, java, transcripts):
+    """main 모듈의 외부 의존성을 대역으로 교체 (import 시점에는 아무것도 시작하지 않으므로 런타임 시작 전에 바꾸면 됨)"""
+    from tts_cache import TTSCache
+    from java_link import JavaLink
+    from warmup import LazyModel
+
+    # 외부 서비스
+    main.tts_cache = TTSCache(tempfile.mkdtemp(prefix="bench_tts_"), fetch_fn=make_fake_tts(args.tts_sec))
+    main.audio_player.resolve_audio = main.tts_cache.get_audio
+    main.audio_player._play = lambda path, mp3: time.sleep(args.play_sec)
+    main.gemini_model = LazyModel("Gemini", lambda: FakeGemini(args.llm_sec), timer=main.startup)
+    main.context._fetch_city = lambda: "서울"
+    main.context._fetch_weather = lambda city: f"{city} 날씨: 기온 20°, 상태 맑음"
+    if args.fake_stt:
+        main.whisper_model = LazyModel("Whisper", lambda: FakeWhisper(transcripts), timer=main.startup)
+
+    # 네트워크: 가짜 Java 서버 포트로 연결, 음성 트리거 서버는 빈 포트에
+    main.java_link = JavaLink("127.0.0.1", java.cmd_port, on_line=lambda msg: main.bus.publish("gui.line", msg),
+                              subscribe=("SENSOR",))
+    main.DOOR_EVENT_PORT = java.door_port
+    main.VOICE_SERVER_PORT = free_port()
+
+    # 반복 측정을 위해 쿨타임 제거 (문 열림 병합 창은 묶음 하나를 덮을 만큼만 남김)
+    main.FACE_COOLDOWN_SEC = 0.0
+    main.SMART_CARE_COOLDOWN_SEC = 0.0
+    main.UNLOCK_COALESCE_SEC = 1.0
+
+
+async def wait_until(predicate, timeout, interval=0.02):
+    end = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > end:
+            return False
+        await asyncio.sleep(interval)
+    return True
+
+
+async def bench_voice(main, wavs, args, transcripts):
+    """WAV마다 START/STOP_RECORDING을 보내고 답변 재생이 끝날 때까지 기다림 -> 처리한 발화 수"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", main.VOICE_SERVER_PORT)
+    feeders = []
+
+    def make_recorder(buffer, on_audio=None):
+        feeder = WavFeeder(current["audio"], buffer, on_audio=on_audio, speed=args.speed)
+        feeders.append(feeder)
+        return feeder
+
+    main.AudioRecorder = make_recorder
+    current = {}
+    done = 0
+    for _ in range(args.repeat):
+        for path in wavs:
+            current["audio"] = read_wav(path, main.SAMPLE_RATE)
+            txt = os.path.splitext(path)[0] + ".txt"
+            transcripts["current"] = open(txt, encoding="utf-8").read().strip() if os.path.exists(txt) else ""
+            before = main.tracer.count("voice", "total")
+            started = len(feeders)
+
+            writer.write(b"START_RECORDING\n")
+            await writer.drain()
+            if not await wait_until(lambda: len(feeders) > started and feeders[-1].done.is_set(), 60):
+                print(f"[Bench] 녹음 재생 시간 초과: {path}")
+            writer.write(b"STOP_RECORDING\n")
+            await writer.drain()
+
+            if not await wait_until(lambda: main.tracer.count("voice", "total") > before, args.timeout):
+                print(f"[Bench] 처리 시간 초과: {path}")
+                continue
+            await wait_until(lambda: main.audio_player.pending() == 0, args.timeout)
+            done += 1
+    writer.close()
+    return done
+
+
+async def bench_face(main, java, args):
+    """REQ_FACE_UNLOCK을 중계하고 UNLOCK(또는 시간 초과)까지 기다림 -> 요청 수"""
+    done = 0
+    for _ in range(args.repeat):
+        before = main.tracer.count("face", "unlock") + main.tracer.count("face", "timeout")
+        await java.broadcast("REQ_FACE_UNLOCK")
+        finished = lambda: main.tracer.count("face", "unlock") + main.tracer.count("face", "timeout") > before
+        if not await wait_until(finished, main.FACE_REQUEST_SEC + args.timeout):
+            print("[Bench] 얼굴 인식 응답 없음")
+            continue
+        await wait_until(lambda: main.audio_player.pending() == 0, args.timeout)
+        done += 1
+    return done
+
+
+async def bench_door(main, java, args):
+    """UNLOCKED 이벤트를 burst개씩 보내고 첫 제어 명령까지 시간을 기록 -> 묶음마다 보낸 제어 명령 수 목록"""
+    counts = []
+    for _ in range(args.repeat):
+        trace = main.tracer.start("bench")
+        since = time.monotonic()
+        for _ in range(args.door_burst):
+            await java.door_event("UNLOCKED")
+        first = await java.wait_command(since, ("REQ_TEMP", "FAN_ON", "FAN_OFF"), args.timeout)
+        if first is None:
+            print("[Bench] 도어 이벤트 후 제어 명령 없음")
+            continue
+        trace.finish("door_to_command")
+        await wait_until(lambda: main.audio_player.pending() == 0, args.timeout)
+        await asyncio.sleep(0.2)
+        # 문이 한 번 열린 것에 대한 이벤트 묶음이므로 REQ_TEMP/FAN_ON은 각각 한 번이 이상적
+        counts.append(sum(1 for ts, t in java.received if ts >= since and t.split(" ")[0] in ("REQ_TEMP", "FAN_ON")))
+        # 다음 묶음이 같은 문 열림으로 병합되지 않도록 병합 창이 닫힐 때까지 대기
+        await asyncio.sleep(max(0.0, since + main.UNLOCK_COALESCE_SEC - time.monotonic()))
+    return counts
+
+
+async def run(args):
+    import main
+    transcripts = {}
+    java = FakeJava(temp=args.temp)
+    await java.start()
+    patch_main(main, args, java, transcripts)
+    if args.faces:
+        main.camera = FrameCamera(load_frames(args.faces), fps=args.fps)
+
+    runtime = asyncio.create_task(main.run_runtime())
+    await java.wait_connected()
+    models = [main.whisper_model, main.gemini_model] + ([main.face_models] if args.faces else [])
+    for model in models:
+        try:
+            await model.wait()
+        except RuntimeError as e:
+            print(f"[Bench] {e}")
+
+    throughput = {}
+    wavs = sorted(glob.glob(os.path.join(args.wav_dir, "*.wav")))
+    if wavs and not args.skip_voice and main.whisper_model.ready:
+        started = time.perf_counter()
+        n = await bench_voice(main, wavs, args, transcripts)
+        throughput["voice_utterances_per_sec"] = n / (time.perf_counter() - started)
+    if args.faces and main.face_models.ready:
+        started = time.perf_counter()
+        n = await bench_face(main, java, args)
+        elapsed = time.perf_counter() - started
+        throughput["face_requests_per_sec"] = n / elapsed
+        throughput["face_frames_per_sec"] = main.tracer.count("face", "detect") / elapsed
+    if args.door_burst > 0:
+        started = time.perf_counter()
+        counts = await bench_door(main, java, args)
+        throughput["door_events_per_sec"] = len(counts) * args.door_burst / (time.perf_counter() - started)
+        if counts:
+            throughput["door_commands_per_burst"] = float(np.mean(counts))
+
+    runtime.cancel()
+    await asyncio.gather(runtime, return_exceptions=True)
+    await java.stop()
+
+    print("[Bench] 처리량")
+    for key, value in throughput.items():
+        print(f"   {key:<28} {value:8.2f}")
+    summary = main.tracer.summary()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"throughput": throughput,
+                       "stages": {f"{pipe}/{stage}": s for (pipe, stage), s in sorted(summary.items())}},
+                      f, ensure_ascii=False, indent=2)
+        print(f"[Bench] 결과 저장: {args.json}")
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="스마트홈 파이프라인 오프라인 벤치마크")
+    p.add_argument("--wav-dir", default=os.path.join(BENCH_DIR, "recordings"), help="재생할 WAV 폴더 (옆에 같은 이름 .txt가 있으면 --fake-stt 정답으로 사용)")
+    p.add_argument("--faces", help="얼굴 인식에 쓸 영상 파일 또는 이미지 폴더 (없으면 얼굴 측정 생략)")
+    p.add_argument("--repeat", type=int, default=3, help="입력마다 반복 횟수")
+    p.add_argument("--speed", type=float, default=4.0, help="WAV 재생 배속 (0이면 최대한 빨리)")
+    p.add_argument("--fps", type=float, default=30.0, help="가짜 카메라 프레임 속도")
+    p.add_argument("--fake-stt", action="store_true", help="Whisper 대신 길이 비례 지연만 흉내 (faster-whisper 없이 나머지 단계 측정)")
+    p.add_argument("--skip-voice", action="store_true")
+    p.add_argument("--door-burst", type=int, default=3, help="한 번에 보낼 UNLOCKED 이벤트 수 (0이면 도어 측정 생략)")
+    p.add_argument("--temp", type=float, default=29.0, help="가짜 Java가 돌려줄 실내 온도")
+    p.add_argument("--llm-sec", type=float, default=0.4, help="가짜 Gemini 첫 토큰 지연")
+    p.add_argument("--tts-sec", type=float, default=0.15, help="가짜 TTS 합성 지연")
+    p.add_argument("--play-sec", type=float, default=0.05, help="가짜 재생 시간")
+    p.add_argument("--timeout", type=float, default=30.0)
+    p.add_argument("--json", help="결과를 JSON 파일로 저장")
+    return p.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
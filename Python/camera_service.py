@@ -0,0 +1,134 @@
+## 카메라 공용 캡처 서비스
+## 카메라 장치는 이 서비스만 열고, 전용 스레드가 미리 할당된 링 버퍼에 프레임을 계속 받아 둔다 (프레임마다 새 배열 없음).
+## 얼굴 등록/인식 등 사용하는 쪽은 acquire()/release()로 사용 의사를 알리고 latest()로 최신 프레임을 읽는다.
+## 마지막 사용 후에도 idle_sec 동안은 장치를 열어 두어, 다음 요청 때 장치 열기/노출 안정화 지연이 없다.
+## cv2는 캡처 스레드가 장치를 열 때 import 한다 (서비스를 만드는 것만으로는 OpenCV를 읽지 않음).
+import threading
+import time
+import numpy as np
+
+
+class CameraService:
+    """카메라 장치 하나를 소유하는 백그라운드 캡처 스레드 + 프레임 링 버퍼"""
+
+    WARMUP_FRAMES = 3   # 장치를 연 직후 자동 노출이 안정될 때까지 버리는 프레임 수
+
+    def __init__(self, index=0, api="ANY", ring_size=4, idle_sec=60.0):
+        self.index = index
+        self.api = api             # 캡처 백엔드 이름 (cv2.CAP_<api>, 예: "DSHOW")
+        self.ring_size = ring_size
+        self.idle_sec = idle_sec
+
+        self._cond = threading.Condition()
+        self._users = 0
+        self._last_release = 0.0
+        self._running = False
+        self._ring = None          # (ring_size, H, W, 3) uint8
+        self._seq = 0              # 발행된 프레임 번호 (계속 증가)
+        self._latest_idx = -1
+        self._ready = False        # 현재 장치에서 받은 프레임이 있는지
+        self._failed = False
+
+    # -----------------------------------------------------
+    # 사용 등록
+    # -----------------------------------------------------
+    def acquire(self, timeout=3.0):
+        """사용 시작. 첫 프레임이 준비되면 True, 카메라를 열 수 없으면 False"""
+        with self._cond:
+            self._users += 1
+            self._failed = False
+            if not self._running:
+                self._running = True
+                threading.Thread(target=self._capture_loop, name="camera", daemon=True).start()
+            ok = self._cond.wait_for(lambda: self._ready or self._failed, timeout=timeout)
+            if not ok or self._failed:
+                self._users -= 1
+                return False
+            return True
+
+    def release(self):
+        """사용 종료 (장치는 idle_sec 동안 유지)"""
+        with self._cond:
+            self._users = max(0, self._users - 1)
+            self._last_release = time.monotonic()
+
+    # -----------------------------------------------------
+    # 프레임 읽기
+    # -----------------------------------------------------
+    def latest(self, last_seq=0, out=None, timeout=1.0):
+        """last_seq보다 새 프레임을 기다려 (번호, 프레임) 반환. 시간 초과 시 (last_seq, None)
+
+        out을 주면 그 배열에 복사해서 돌려주고, 없으면 링 버퍼 슬롯의 뷰를 돌려준다
+        (뷰는 ring_size - 1 프레임이 더 들어오기 전까지 유효).
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._ready and self._seq > last_seq, timeout=timeout):
+                return last_seq, None
+            seq, frame = self._seq, self._ring[self._latest_idx]
+            if out is not None:
+                np.copyto(out, frame)
+                frame = out
+        return seq, frame
+
+    def frame_shape(self):
+        with self._cond:
+            return None if self._ring is None else self._ring.shape[1:]
+
+    # -----------------------------------------------------
+    # 캡처 스레드
+    # -----------------------------------------------------
+    def _capture_loop(self):
+        import cv2
+        cap = cv2.VideoCapture(self.index, getattr(cv2, f"CAP_{self.api}"))
+        if not cap.isOpened():
+            print("[Camera] 카메라 오픈 실패")
+            with self._cond:
+                self._failed = True
+                self._running = False
+                self._cond.notify_all()
+            return
+
+        print("[Camera] 카메라 열림")
+        for _ in range(self.WARMUP_FRAMES):
+            cap.read()
+
+        idx = 0
+        while True:
+            with self._cond:
+                if self._users == 0 and time.monotonic() - self._last_release > self.idle_sec:
+                    # 잠근 상태에서 닫아야 새 acquire가 새 캡처 스레드를 띄울 때 장치가 겹치지 않음
+                    cap.release()
+                    self._running = False
+                    self._ready = False
+                    self._ring = None
+                    self._latest_idx = -1
+                    print("[Camera] 유휴 시간 초과로 카메라 닫음")
+                    return
+
+            if self._ring is None:
+                ok, frame = cap.read()
+                if not ok:
+                    time.sleep(0.01)
+                    continue
+                # 첫 프레임 크기로 링 버퍼를 한 번만 할당
+                ring = np.empty((self.ring_size,) + frame.shape, dtype=frame.dtype)
+                ring[0] = frame
+                with self._cond:
+                    self._ring = ring
+            else:
+                slot = self._ring[idx]
+                ok, frame = cap.read(slot)   # 슬롯 배열에 바로 받아 재사용
+                if not ok:
+                    time.sleep(0.01)
+                    continue
+                if frame.ctypes.data != slot.ctypes.data:
+                    if frame.shape != slot.shape:
+                        continue
+                    np.copyto(slot, frame)
+
+            with self._cond:
+                self._latest_idx = idx
+                self._seq += 1
+                self._ready = True
+                self._cond.notify_all()
+            idx = (idx + 1) % self.ring_size
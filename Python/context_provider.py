@@ -0,0 +1,129 @@
+## LLM 질의용 외부 컨텍스트 (위치/날씨) 제공자
+## 위치(ipinfo.io)는 한 번만 조회해서 기억하고, 날씨(네이버 검색 크롤링)는 백그라운드에서 주기적으로 갱신해 메모리에 둔다.
+## 질의 시에는 메모리 값을 바로 돌려주고, TTL이 지났으면 오래된 값을 그대로 쓰면서 뒤에서 갱신한다 (stale-while-revalidate).
+## HTTP 요청은 연결을 재사용하는 requests.Session 하나로 보낸다 (TTS 등 다른 모듈도 같은 세션을 쓸 수 있음).
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+WEATHER_UNAVAILABLE = "날씨 정보 조회 불가"
+DEFAULT_CITY = "서울"
+
+# 영문 도시명 -> 한글 변환 매핑 (IP Geolocation 대응)
+CITY_MAP = {
+    "Seoul": "서울", "Busan": "부산", "Incheon": "인천", "Daegu": "대구",
+    "Daejeon": "대전", "Gwangju": "광주", "Suwon": "수원", "Ulsan": "울산",
+    "Jeonju": "전주", "Jeju": "제주", "Seongnam": "성남", "Goyang": "고양",
+    "Yongin": "용인", "Cheongju": "청주", "Cheonan": "천안", "Pohang": "포항",
+    # 필요 시 추가
+}
+
+
+def make_session(pool_size=8):
+    """연결 풀을 쓰는 공용 HTTP 세션"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+class ContextProvider:
+    """위치(한 번 조회) + 날씨(TTL, 백그라운드 갱신) 메모리 캐시"""
+
+    def __init__(self, session=None, weather_ttl=600.0, refresh_sec=300.0, retry_sec=60.0, executor=None):
+        self.session = session or make_session()
+        self.weather_ttl = weather_ttl        # 이보다 오래된 날씨는 쓰면서 뒤에서 갱신
+        self.refresh_sec = refresh_sec        # 주기적 갱신 간격
+        self.retry_sec = retry_sec            # 조회 실패 후 다시 시도하기까지 최소 간격
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="context")
+
+        self._lock = threading.Lock()
+        self._city = None
+        self._weather = None                  # (문장, 조회 monotonic 시각)
+        self._last_attempt = -1e9
+        self._refreshing = False
+
+    # -----------------------------------------------------
+    # 조회 (네트워크 I/O, 백그라운드에서 실행)
+    # -----------------------------------------------------
+    def _fetch_city(self):
+        """IP 기반 현재 위치(도시) 조회"""
+        try:
+            res = self.session.get("https://ipinfo.io/json", timeout=3)
+            city_eng = res.json().get("city", "Seoul")
+            return CITY_MAP.get(city_eng, city_eng)
+        except Exception as e:
+            print(f"[Context] 위치 조회 실패: {e}")
+            return None
+
+    ## gemini 자체로는 날씨 정보를 받아오지 못하여 크롤링으로 대체(네이버 날씨)
+    def _fetch_weather(self, city):
+        """네이버 날씨 크롤링 (현재 위치 기준)"""
+        from bs4 import BeautifulSoup
+        res = self.session.get(f"https://search.naver.com/search.naver?query={city}+날씨", timeout=5)
+        soup = BeautifulSoup(res.text, 'html.parser')
+        temp = soup.find('div', {'class': 'temperature_text'}).text.strip().replace("현재 온도", "")
+        status = soup.find('span', {'class': 'weather before_slash'}).text
+        return f"{city} 날씨: 기온 {temp}, 상태 {status}"
+
+    def refresh(self):
+        """위치(처음 한 번)와 날씨를 조회해 메모리에 반영 (블로킹)"""
+        with self._lock:
+            self._last_attempt = time.monotonic()
+        city = self._city
+        if city is None:
+            # 실패하면 이번에는 기본 도시로 조회하고, 다음 갱신 때 위치를 다시 시도
+            city = self._fetch_city()
+            with self._lock:
+                self._city = city
+            city = city or DEFAULT_CITY
+        try:
+            text = self._fetch_weather(city)
+        except Exception as e:
+            print(f"[Weather] 조회 실패: {e}")
+            return False
+        with self._lock:
+            self._weather = (text, time.monotonic())
+        print(f"[Weather] 갱신: {text}")
+        return True
+
+    def _refresh_job(self):
+        try:
+            self.refresh()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def refresh_async(self):
+        """진행 중인 갱신이 없고 최근에 실패하지 않았으면 백그라운드 갱신 시작"""
+        with self._lock:
+            if self._refreshing or time.monotonic() - self._last_attempt < self.retry_sec:
+                return False
+            self._refreshing = True
+        self._executor.submit(self._refresh_job)
+        return True
+
+    # -----------------------------------------------------
+    # 읽기 (메모리에서 바로 반환)
+    # -----------------------------------------------------
+    def location(self):
+        return self._city or DEFAULT_CITY
+
+    def weather(self):
+        """날씨 문장을 바로 반환. 아직 없으면 WEATHER_UNAVAILABLE, TTL이 지났으면 오래된 값 + 뒤에서 갱신"""
+        with self._lock:
+            entry = self._weather
+        if entry is None or time.monotonic() - entry[1] > self.weather_ttl:
+            self.refresh_async()
+        return entry[0] if entry is not None else WEATHER_UNAVAILABLE
+
+    def weather_age(self):
+        """마지막 날씨 조회 후 경과 초 (없으면 None)"""
+        entry = self._weather
+        return None if entry is None else time.monotonic() - entry[1]
@@ -0,0 +1,91 @@
+## asyncio 이벤트 버스
+## 네트워크 리스너, 마이크/전사 스레드, 얼굴 인식 등에서 발생한 이벤트를 하나의 큐로 모아 이벤트 루프에서 순서대로 처리한다.
+## publish()는 어느 스레드에서 불러도 안전하며 (루프 밖이면 call_soon_threadsafe), 큐가 가득 차면 새 이벤트를 버리고 로그만 남긴다.
+## 핸들러가 코루틴 함수면 태스크로 띄우고, 일반 함수면 디스패처에서 바로 호출한다 (일반 핸들러는 짧게 유지할 것).
+import asyncio
+import threading
+from collections import defaultdict
+
+
+class EventBus:
+    """토픽별 핸들러 + 크기 제한 큐 하나로 이벤트를 루프에서 처리"""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._handlers = defaultdict(list)
+        self._queue = None
+        self._loop = None
+        self._loop_thread = None
+        self._dispatcher = None
+        self._tasks = set()        # 실행 중인 코루틴 핸들러 (종료 시 취소)
+
+    def subscribe(self, topic, handler):
+        self._handlers[topic].append(handler)
+        return handler
+
+    def start(self):
+        """현재 실행 중인 루프에 디스패처를 띄움"""
+        if self._dispatcher is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._queue = asyncio.Queue(self.maxsize)
+        self._dispatcher = self._loop.create_task(self._dispatch_loop())
+
+    async def stop(self):
+        """디스패처와 실행 중인 핸들러 태스크를 모두 취소하고 끝날 때까지 기다림"""
+        tasks = list(self._tasks)
+        if self._dispatcher is not None:
+            tasks.append(self._dispatcher)
+            self._dispatcher = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # -----------------------------------------------------
+    # 발행
+    # -----------------------------------------------------
+    def publish(self, topic, payload=None):
+        """이벤트 발행 (스레드 안전). 루프가 없거나 큐가 가득 차 버렸으면 False"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            print(f"[Event] 루프가 없어 버림: {topic}")
+            return False
+        if threading.get_ident() == self._loop_thread:
+            return self._put(topic, payload)
+        loop.call_soon_threadsafe(self._put, topic, payload)
+        return True
+
+    def _put(self, topic, payload):
+        try:
+            self._queue.put_nowait((topic, payload))
+            return True
+        except asyncio.QueueFull:
+            print(f"[Event] 큐가 가득 차 버림: {topic}")
+            return False
+
+    # -----------------------------------------------------
+    # 처리
+    # -----------------------------------------------------
+    async def _dispatch_loop(self):
+        while True:
+            topic, payload = await self._queue.get()
+            for handler in self._handlers.get(topic, ()):
+                try:
+                    if asyncio.iscoroutinefunction(handler):
+                        task = self._loop.create_task(self._run(topic, handler, payload))
+                        self._tasks.add(task)
+                        task.add_done_callback(self._tasks.discard)
+                    else:
+                        handler(payload)
+                except Exception as e:
+                    print(f"[Event] '{topic}' 처리 에러: {e}")
+
+    @staticmethod
+    async def _run(topic, handler, payload):
+        try:
+            await handler(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[Event] '{topic}' 처리 에러: {e}")
@@ -0,0 +1,129 @@
+## 여러 프레임 일괄 얼굴 등록 (품질 점수 기반)
+## 키 한 번에 한 프레임을 저장하면 흔들림/측면 얼굴 하나가 템플릿이 되어 인식 때 여러 번 재시도하게 된다.
+## 등록 시에는 연속 프레임(burst)을 받아 프레임마다 선명도(라플라시안 분산), 얼굴 크기, 자세(눈/코 랜드마크)로 점수를 매기고
+## 점수가 높은 top-K 프레임만 모아서 한 번에 인코딩하고, 중앙값에서 크게 벗어난 인코딩은 버린다 (갤러리에는 이 묶음을 저장).
+import heapq
+import math
+
+import cv2
+import numpy as np
+
+BLUR_REF = 120.0        # 이 이상의 라플라시안 분산이면 선명도 만점
+SIZE_REF = 160          # 얼굴 높이(px)가 이 이상이면 크기 만점
+MIN_FACE = 80           # 이보다 작은 얼굴은 후보에서 제외
+MAX_YAW = 0.35          # 코 끝이 눈 중심에서 눈 사이 거리의 이 비율만큼 벗어나면 자세 0점
+MAX_ROLL_DEG = 20.0     # 눈을 잇는 선의 기울기 한계
+OUTLIER_DIST = 0.35     # 중앙값 인코딩에서 이보다 먼 인코딩은 버림
+DETECT_SCALE = 0.5      # 검출은 축소 이미지에서 (박스만 원본 좌표로 되돌림)
+
+
+def blur_score(gray_face):
+    """얼굴 영역 선명도 0~1"""
+    return min(1.0, cv2.Laplacian(gray_face, cv2.CV_64F).var() / BLUR_REF)
+
+
+def size_score(box):
+    top, right, bottom, left = box
+    height = bottom - top
+    if height < MIN_FACE:
+        return 0.0
+    return min(1.0, height / SIZE_REF)
+
+
+def pose_score(landmarks):
+    """정면일수록 1 (small 랜드마크: 양쪽 눈 2점씩 + 코 끝 1점)"""
+    try:
+        left = np.mean(landmarks["left_eye"], axis=0)
+        right = np.mean(landmarks["right_eye"], axis=0)
+        nose = np.asarray(landmarks["nose_tip"][0], dtype=np.float64)
+    except (KeyError, IndexError):
+        return 0.0
+    dx, dy = right - left
+    eye_dist = math.hypot(dx, dy)
+    if eye_dist < 1.0:
+        return 0.0
+    yaw = abs(nose[0] - (left[0] + right[0]) / 2) / eye_dist
+    roll = abs(math.degrees(math.atan2(dy, dx)))
+    roll = min(roll, 180.0 - roll)
+    return max(0.0, 1.0 - yaw / MAX_YAW) * max(0.0, 1.0 - roll / MAX_ROLL_DEG)
+
+
+class EnrollmentSession:
+    """burst 프레임을 받아 품질 상위 top_k개만 보관하고, finish()에서 한 번에 인코딩"""
+
+    def __init__(self, face_recognition, top_k=5, min_quality=0.3, margin=0.5):
+        self.fr = face_recognition
+        self.top_k = top_k
+        self.min_quality = min_quality
+        self.margin = margin
+        self.frames = 0           # 받은 프레임 수
+        self.faces = 0            # 얼굴이 잡힌 프레임 수
+        self._heap = []           # (점수, 순번, 얼굴 주변 RGB 조각, 조각 기준 박스) 최소 힙
+        self._count = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def _detect(self, rgb):
+        """가장 큰 얼굴 박스 (top, right, bottom, left) 또는 None"""
+        small = cv2.resize(rgb, (0, 0), fx=DETECT_SCALE, fy=DETECT_SCALE)
+        boxes = self.fr.face_locations(small)
+        if not boxes:
+            return None
+        t, r, b, l = max(boxes, key=lambda bx: (bx[2] - bx[0]) * (bx[1] - bx[3]))
+        s = 1.0 / DETECT_SCALE
+        h, w = rgb.shape[:2]
+        return max(0, int(t * s)), min(w, int(r * s)), min(h, int(b * s)), max(0, int(l * s))
+
+    def add(self, rgb):
+        """RGB 프레임 하나를 평가. 점수 (얼굴이 없으면 None)"""
+        self.frames += 1
+        box = self._detect(rgb)
+        if box is None:
+            return None
+        self.faces += 1
+        top, right, bottom, left = box
+
+        gray = cv2.cvtColor(rgb[top:bottom, left:right], cv2.COLOR_RGB2GRAY)
+        marks = self.fr.face_landmarks(rgb, [box], model="small")
+        score = size_score(box) * pose_score(marks[0] if marks else {}) * blur_score(gray)
+        if score < self.min_quality:
+            return score
+
+        # 인코딩용으로 얼굴 주변만 잘라서 보관 (프레임 전체를 top_k개 들고 있지 않음)
+        h, w = rgb.shape[:2]
+        my, mx = int((bottom - top) * self.margin), int((right - left) * self.margin)
+        y0, x0 = max(0, top - my), max(0, left - mx)
+        crop = np.ascontiguousarray(rgb[y0:min(h, bottom + my), x0:min(w, right + mx)])
+        item = (score, self._count, crop, (top - y0, right - x0, bottom - y0, left - x0))
+        self._count += 1
+        if len(self._heap) < self.top_k:
+            heapq.heappush(self._heap, item)
+        elif score > self._heap[0][0]:
+            heapq.heapreplace(self._heap, item)
+        return score
+
+    def finish(self):
+        """보관된 프레임을 인코딩 -> 인코딩 행렬 (N, 128). 쓸 만한 후보가 없으면 None"""
+        if not self._heap:
+            return None
+        best = sorted(self._heap, reverse=True)
+        encodings = []
+        for _, _, crop, box in best:
+            enc = self.fr.face_encodings(crop, [box])
+            if enc:
+                encodings.append(enc[0])
+        if not encodings:
+            return None
+        encodings = np.asarray(encodings, dtype=np.float64)
+
+        # 중앙값에서 크게 벗어난 인코딩(가려짐, 다른 사람 등) 제거 후 중심/퍼짐 계산
+        median = np.median(encodings, axis=0)
+        keep = np.linalg.norm(encodings - median, axis=1) <= OUTLIER_DIST
+        if keep.any():
+            encodings = encodings[keep]
+        centroid = encodings.mean(axis=0)
+        spread = float(np.linalg.norm(encodings - centroid, axis=1).mean())
+        print(f"[Face] 등록 후보 {self.frames}프레임 중 얼굴 {self.faces}개, "
+              f"상위 {len(best)}개 -> 인코딩 {len(encodings)}개 (점수 {best[0][0]:.2f}~{best[-1][0]:.2f}, 퍼짐 {spread:.3f})")
+        return encodings
@@ -0,0 +1,151 @@
+## 등록된 얼굴 인코딩 갤러리
+## 가족 구성원 여러 명의 128차원 인코딩을 하나의 연속 NumPy 행렬로 메모리에 올려 두고,
+## 파일 수정 시각(mtime)이 바뀌었거나 새로 등록했을 때만 다시 읽는다 (프레임마다 디스크 I/O 없음).
+## 매칭은 행렬 전체(개별 인코딩 + 구성원별 중심)와의 거리 한 번 계산으로 가장 가까운 사람과 거리를 돌려준다.
+## 파일은 버전 번호를 담은 npz 하나 (버전 2부터 구성원별 중심/퍼짐 포함, 버전 1 파일은 읽을 때 계산).
+import os
+import threading
+import time
+import numpy as np
+
+ENCODING_DIM = 128
+FORMAT_VERSION = 2      # 2: 구성원별 중심(centroid)/퍼짐(spread) 포함
+
+
+def _profile(rows):
+    """인코딩 행렬 -> (중심, 중심까지 평균 거리)"""
+    centroid = rows.mean(axis=0)
+    return centroid, float(np.linalg.norm(rows - centroid, axis=1).mean())
+
+
+class FaceGallery:
+    """이름별 얼굴 인코딩 행렬 (face_gallery.npz, 구버전 owner_face.npy 호환)"""
+
+    def __init__(self, path, legacy_path=None, check_interval=1.0, autoload=True):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._names = np.zeros(0, dtype="<U32")
+        self._matrix = np.zeros((0, ENCODING_DIM), dtype=np.float64)
+        self._profiles = {}       # 이름 -> (중심, 퍼짐)
+        self._match_names = self._names
+        self._match_matrix = self._matrix
+        self._mtimes = None
+        self._next_check = 0.0
+        if autoload:
+            self.load()     # autoload=False면 첫 maybe_reload()에서 읽음
+
+    def __len__(self):
+        return len(self._names)
+
+    @property
+    def names(self):
+        return sorted(set(self._names.tolist()))
+
+    def _stat(self):
+        out = []
+        for p in (self.path, self.legacy_path):
+            try:
+                out.append(os.stat(p).st_mtime_ns if p else None)
+            except OSError:
+                out.append(None)
+        return tuple(out)
+
+    def load(self):
+        """파일에서 갤러리를 읽어 행렬로 구성. 등록된 얼굴이 있으면 True"""
+        names, rows, profiles = [], [], {}
+        mtimes = self._stat()
+        try:
+            if mtimes[0] is not None:
+                with np.load(self.path) as data:
+                    version = int(data["version"]) if "version" in data.files else 1
+                    if version > FORMAT_VERSION:
+                        raise ValueError(f"지원하지 않는 갤러리 버전 {version}")
+                    names = data["names"].tolist()
+                    rows = list(np.asarray(data["encodings"], dtype=np.float64).reshape(-1, ENCODING_DIM))
+                    if version >= 2:
+                        centroids = np.asarray(data["centroids"], dtype=np.float64).reshape(-1, ENCODING_DIM)
+                        for person, c, sp in zip(data["people"].tolist(), centroids, data["spreads"].tolist()):
+                            profiles[person] = (c, float(sp))
+            elif mtimes[1] is not None:
+                # 구버전: 주인 한 명의 인코딩 (128,) 또는 (N, 128)
+                legacy = np.load(self.legacy_path).astype(np.float64).reshape(-1, ENCODING_DIM)
+                rows = list(legacy)
+                names = ["owner"] * len(rows)
+        except Exception as e:
+            print(f"[Face] 갤러리 로드 실패: {e}")
+            names, rows, profiles = [], [], {}
+
+        names = np.array(names, dtype="<U32")
+        matrix = np.ascontiguousarray(np.array(rows, dtype=np.float64).reshape(-1, ENCODING_DIM))
+        # 버전 1 파일(중심 정보 없음)은 읽을 때 계산
+        for person in set(names.tolist()) - set(profiles):
+            profiles[person] = _profile(matrix[names == person])
+        with self._lock:
+            self._set(names, matrix, profiles)
+            self._mtimes = mtimes
+        print(f"[Face] 갤러리 로드: {len(names)}개 인코딩, 구성원 {self.names}")
+        return len(names) > 0
+
+    def _set(self, names, matrix, profiles):
+        """(lock 안에서) 갤러리 교체. 매칭 행렬 = 개별 인코딩 + 구성원별 중심"""
+        people = sorted(profiles)
+        self._names = names
+        self._matrix = matrix
+        self._profiles = profiles
+        self._match_names = np.concatenate([names, np.array(people, dtype="<U32")])
+        self._match_matrix = np.ascontiguousarray(
+            np.vstack([matrix] + [profiles[p][0].reshape(1, ENCODING_DIM) for p in people]))
+
+    def maybe_reload(self):
+        """check_interval마다 한 번만 mtime을 확인하고 바뀌었으면 다시 읽음"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        if self._stat() != self._mtimes:
+            self.load()
+
+    def invalidate(self):
+        """다음 maybe_reload에서 즉시 다시 확인하도록 표시"""
+        self._next_check = 0.0
+
+    def enroll(self, name, encodings, replace=False):
+        """name으로 인코딩(1개 또는 여러 개)을 추가(replace=True면 기존 인코딩 교체)하고 파일에 저장"""
+        encodings = np.asarray(encodings, dtype=np.float64).reshape(-1, ENCODING_DIM)
+        if self._mtimes is None:
+            self.load()     # 아직 읽기 전이면 기존 구성원을 잃지 않도록 먼저 읽음
+        with self._lock:
+            keep = self._names != name if replace else np.ones(len(self._names), dtype=bool)
+            names = np.concatenate([self._names[keep], np.array([name] * len(encodings), dtype="<U32")])
+            matrix = np.ascontiguousarray(np.vstack([self._matrix[keep], encodings]))
+            profiles = {p: v for p, v in self._profiles.items() if p in set(names.tolist())}
+            profiles[name] = _profile(matrix[names == name])
+
+            people = sorted(profiles)
+            tmp = self.path + ".tmp.npz"
+            np.savez(tmp, version=np.int32(FORMAT_VERSION), names=names, encodings=matrix,
+                     people=np.array(people, dtype="<U32"),
+                     centroids=np.array([profiles[p][0] for p in people]).reshape(-1, ENCODING_DIM),
+                     spreads=np.array([profiles[p][1] for p in people], dtype=np.float64))
+            os.replace(tmp, self.path)
+            self._set(names, matrix, profiles)
+            self._mtimes = self._stat()
+        print(f"[Face] '{name}' 인코딩 {len(encodings)}개 저장 (총 {len(names)}개, 퍼짐 {profiles[name][1]:.3f})")
+
+    def spread(self, name):
+        """구성원 인코딩들이 중심에서 떨어진 평균 거리 (없으면 None)"""
+        entry = self._profiles.get(name)
+        return None if entry is None else entry[1]
+
+    def match(self, encoding):
+        """가장 가까운 (이름, 거리). 갤러리가 비어 있으면 (None, inf)"""
+        with self._lock:
+            names, matrix = self._match_names, self._match_matrix
+        if len(names) == 0:
+            return None, float("inf")
+        dists = np.linalg.norm(matrix - np.asarray(encoding, dtype=np.float64), axis=1)
+        best = int(np.argmin(dists))
+        return str(names[best]), float(dists[best])
@@ -0,0 +1,141 @@
+## 얼굴 인식 루프용 단계별 검출/추적기
+## 1) 작은 흑백 이미지의 프레임 차이로 움직임이 없으면 건너뛰고
+## 2) OpenCV Haar 검출기는 N프레임마다만 돌리며, 그 사이에는 템플릿 매칭으로 박스를 따라간다.
+## 3) 박스가 몇 프레임 동안 안정적이고 충분히 클 때만 (비싼) face_recognition 인코딩 대상으로 넘긴다.
+## HOG face_locations를 매 프레임 돌리던 것보다 CPU 사용량이 훨씬 적다.
+import cv2
+
+
+class FaceTracker:
+    """움직임 게이트 + 주기적 Haar 검출 + 템플릿 추적"""
+
+    def __init__(self, detect_every=5, idle_detect_every=15, min_face=32, stable_frames=3,
+                 encode_every=3, motion_threshold=3.0, track_min_score=0.6, locate=None):
+        self.detect_every = detect_every            # 추적 중 재검출 주기 (프레임)
+        self.idle_detect_every = idle_detect_every  # 움직임이 없어도 이 주기로는 검출
+        self.min_face = min_face                    # 인코딩할 최소 얼굴 크기 (px, 입력 프레임 기준)
+        self.stable_frames = stable_frames          # 이 프레임 수만큼 안정적이어야 인코딩
+        self.encode_every = encode_every            # 같은 트랙에서 인코딩 재시도 간격
+        self.motion_threshold = motion_threshold    # 64x48 평균 밝기 차이 임계값
+        self.track_min_score = track_min_score
+        # Haar 검출기가 없을 때 쓸 face_locations (얼굴 모델 핸들의 것을 넘겨받아 워커 풀/지연 로딩을 그대로 탐)
+        self.locate = locate
+
+        # OpenCV 5부터 Haar 검출기가 기본 패키지에서 빠졌으므로 없으면 locate(HOG) 검출로 대체
+        self._cascade = None
+        if hasattr(cv2, "CascadeClassifier"):
+            self._cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+        elif locate is None:
+            print("[Face] Haar 검출기도 locate도 없어 얼굴을 검출하지 않습니다.")
+        self.reset()
+
+    def reset(self):
+        self._prev_tiny = None
+        self._box = None          # (x, y, w, h)
+        self._template = None
+        self._stable = 0
+        self._since_detect = 0
+        self._since_encode = self.encode_every
+
+    # -----------------------------------------------------
+    # 내부 단계
+    # -----------------------------------------------------
+    def _motion(self, gray):
+        tiny = cv2.resize(gray, (64, 48), interpolation=cv2.INTER_AREA)
+        prev, self._prev_tiny = self._prev_tiny, tiny
+        if prev is None:
+            return True
+        return float(cv2.absdiff(tiny, prev).mean()) >= self.motion_threshold
+
+    def _detect(self, gray):
+        if self._cascade is None:
+            if self.locate is None:
+                return None
+            faces = [(l, t, r - l, b - t) for t, r, b, l in self.locate(gray)]
+        else:
+            faces = self._cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5,
+                                                   minSize=(self.min_face // 2, self.min_face // 2))
+        if len(faces) == 0:
+            return None
+        return tuple(int(v) for v in max(faces, key=lambda f: f[2] * f[3]))
+
+    def _track(self, gray):
+        x, y, w, h = self._box
+        H, W = gray.shape
+        x0, y0 = max(0, x - w // 2), max(0, y - h // 2)
+        x1, y1 = min(W, x + w + w // 2), min(H, y + h + h // 2)
+        region = gray[y0:y1, x0:x1]
+        if region.shape[0] < h or region.shape[1] < w:
+            return None
+        res = cv2.matchTemplate(region, self._template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, loc = cv2.minMaxLoc(res)
+        if score < self.track_min_score:
+            return None
+        return (x0 + loc[0], y0 + loc[1], w, h)
+
+    @staticmethod
+    def _iou(a, b):
+        ax, ay, aw, ah = a
+        bx, by, bw, bh = b
+        ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+        iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+        inter = ix * iy
+        union = aw * ah + bw * bh - inter
+        return inter / union if union else 0.0
+
+    def _set_box(self, gray, box, refresh_template):
+        if self._box is not None and self._iou(self._box, box) >= 0.5:
+            self._stable += 1
+        else:
+            self._stable = 1
+            self._since_encode = self.encode_every
+        self._box = box
+        if refresh_template or self._template is None:
+            x, y, w, h = box
+            self._template = gray[y:y + h, x:x + w].copy()
+
+    def _lose(self):
+        self._box = None
+        self._template = None
+        self._stable = 0
+
+    # -----------------------------------------------------
+    # 공개 API
+    # -----------------------------------------------------
+    def update(self, frame_bgr):
+        """프레임 하나 처리. 인코딩할 때가 되면 face_recognition 형식 박스 (top, right, bottom, left), 아니면 None"""
+        gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
+        moving = self._motion(gray)
+        self._since_detect += 1
+
+        if self._box is None:
+            # 추적 대상이 없을 때: 움직임이 있거나 유휴 검출 주기가 됐을 때만 검출
+            if not moving and self._since_detect < self.idle_detect_every:
+                return None
+            self._since_detect = 0
+            box = self._detect(gray)
+            if box is None:
+                return None
+            self._set_box(gray, box, refresh_template=True)
+        elif self._since_detect >= self.detect_every:
+            self._since_detect = 0
+            box = self._detect(gray)
+            if box is None:
+                self._lose()
+                return None
+            self._set_box(gray, box, refresh_template=True)
+        else:
+            box = self._track(gray)
+            if box is None:
+                self._lose()
+                return None
+            self._set_box(gray, box, refresh_template=False)
+
+        self._since_encode += 1
+        x, y, w, h = self._box
+        if self._stable < self.stable_frames or min(w, h) < self.min_face:
+            return None
+        if self._since_encode < self.encode_every:
+            return None
+        self._since_encode = 0
+        return (y, x + w, y + h, x)
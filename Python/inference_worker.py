@@ -0,0 +1,334 @@
+## 추론 전용 워커 프로세스 (Whisper / 얼굴 인코딩)
+## 무거운 모델을 메인 프로세스 스레드에서 돌리면 GIL과 코어를 서로 빼앗아 얼굴 인식과 음성 인식이 동시에 느려진다.
+## 모델별로 오래 사는 워커 프로세스를 띄워 모델을 한 번만 읽어 두고, 요청은 워커별 큐로 보낸다.
+## 오디오/프레임 같은 큰 배열은 워커마다 미리 만든 공유 메모리(SharedMemory)에 한 번 복사해서 넘기고 (pickle 없음),
+## 큐로는 모양/자료형과 작은 인자만 보낸다. 결과(텍스트, 128차원 인코딩 등)는 작으므로 그대로 돌려받는다.
+## RemoteWhisper / RemoteFaceRecognition은 기존 WhisperModel / face_recognition 모듈과 같은 방식으로 호출할 수 있는 대역이다.
+## spawn 자식은 부모의 __main__을 다시 import 하므로 (main.py면 모델/카메라/저장소 설정이 워커마다 다시 실행됨)
+## 프로세스를 띄우는 동안만 __main__을 빈 모듈로 바꿔서 워커는 이 모듈만 import 하게 한다.
+## 죽은 워커는 지수 백오프로 다시 띄우고 (모델 로딩 실패가 반복돼도 재시작 폭주 없음), 쉬는 워커를 기다리는 시간에도 상한을 둔다.
+import itertools
+import multiprocessing as mp
+import queue
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from types import ModuleType, SimpleNamespace
+
+import numpy as np
+
+WHISPER = "whisper"
+FACE = "face"
+
+
+# ---------------------------------------------------------
+# 워커 프로세스 쪽
+# ---------------------------------------------------------
+def _load(kind, options):
+    if kind == WHISPER:
+        from faster_whisper import WhisperModel
+        return WhisperModel(options.get("model_size", "small"), device="cpu",
+                            compute_type=options.get("compute_type", "int8"),
+                            cpu_threads=options.get("cpu_threads", 0),
+                            num_workers=options.get("num_workers", 1))
+    if kind == FACE:
+        if options.get("cpu_threads"):
+            import cv2
+            cv2.setNumThreads(options["cpu_threads"])
+        import face_recognition
+        return face_recognition
+    raise ValueError(f"알 수 없는 모델 종류: {kind}")
+
+
+def _run_op(model, op, array, kwargs):
+    if op == "transcribe":
+        segments, info = model.transcribe(array, **kwargs)
+        segs = [(s.text, s.avg_logprob, s.no_speech_prob) for s in segments]
+        return segs, info.language
+    if op in ("face_encodings", "face_locations", "face_landmarks"):
+        result = getattr(model, op)(array, **kwargs)
+        if op == "face_encodings":
+            return [np.asarray(e, dtype=np.float64) for e in result]
+        return result
+    raise ValueError(f"알 수 없는 작업: {op}")
+
+
+def _worker_main(kind, options, shm_name, requests, results):
+    """워커 프로세스 본체: 모델을 읽고 ('ready') 알린 뒤 요청을 하나씩 처리"""
+    # Ctrl+C는 부모가 받아서 close()로 정리함 (워커마다 KeyboardInterrupt 출력이 나지 않도록)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        try:
+            model = _load(kind, options)
+        except Exception as e:
+            results.put((None, False, f"{type(e).__name__}: {e}"))
+            return
+        results.put((None, True, "ready"))
+        while True:
+            req = requests.get()
+            if req is None:
+                return
+            req_id, op, shape, dtype, kwargs = req
+            try:
+                # 공유 메모리를 복사 없이 배열로 봄 (부모는 결과를 받을 때까지 이 영역을 다시 쓰지 않음)
+                array = np.ndarray(shape, dtype=dtype, buffer=shm.buf) if shape is not None else None
+                value = _run_op(model, op, array, kwargs)
+                del array
+                results.put((req_id, True, value))
+            except Exception as e:
+                results.put((req_id, False, f"{type(e).__name__}: {e}"))
+    finally:
+        shm.close()
+
+
+# ---------------------------------------------------------
+# 메인 프로세스 쪽
+# ---------------------------------------------------------
+@contextmanager
+def _minimal_main():
+    """Process.start() 동안 __main__을 빈 모듈로 바꿔 둠 (spawn 준비 데이터에 부모 스크립트 경로가 들어가지 않음)"""
+    saved = sys.modules.get("__main__")
+    sys.modules["__main__"] = ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = saved
+
+
+class _Worker:
+    """워커 프로세스 하나 + 전용 공유 메모리/큐"""
+
+    def __init__(self, ctx, name, kind, options, slot_bytes, results):
+        self.name = name
+        self._args = (ctx, kind, options, slot_bytes, results)
+        self.pending = None        # (req_id, Future) 처리 중인 요청
+        self.restarts = 0          # 연속 재시작 횟수 (오래 살아 있으면 0으로)
+        self.retry_at = None       # 죽은 것을 확인한 뒤 다시 띄울 시각 (monotonic)
+        self.spawn()
+
+    def spawn(self):
+        """공유 메모리/요청 큐/프로세스를 새로 만들어 시작 (비정상 종료 후 같은 객체로 다시 시작할 때도 사용)"""
+        ctx, kind, options, slot_bytes, results = self._args
+        self.shm = shared_memory.SharedMemory(create=True, size=slot_bytes)
+        self.requests = ctx.Queue()
+        self.process = ctx.Process(target=_worker_main, name=self.name, daemon=True,
+                                   args=(kind, options, self.shm.name, self.requests, results))
+        with _minimal_main():
+            self.process.start()
+        self.spawned_at = time.monotonic()
+
+    def release(self):
+        """죽은 프로세스의 공유 메모리 정리 (다시 띄우기 전까지)"""
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def close(self):
+        try:
+            self.requests.put(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=3)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.release()
+
+
+class InferencePool:
+    """같은 모델을 읽은 워커 프로세스 num_procs개. submit()은 쉬는 워커에 요청을 넣고 Future를 돌려줌"""
+
+    RESTART_BASE_SEC = 1.0     # 첫 재시작 대기 (이후 두 배씩)
+    RESTART_MAX_SEC = 60.0     # 재시작 대기 상한
+    RESTART_RESET_SEC = 60.0   # 이만큼 살아 있으면 재시작 횟수 초기화
+
+    def __init__(self, kind, num_procs=1, slot_bytes=8 * 1024 * 1024, options=None, start_timeout=600.0,
+                 acquire_timeout=30.0):
+        self.kind = kind
+        self.num_procs = num_procs
+        self.slot_bytes = slot_bytes
+        self.options = dict(options or {})
+        self.start_timeout = start_timeout
+        self.acquire_timeout = acquire_timeout   # 쉬는 워커를 기다리는 최대 시간 (넘으면 TimeoutError)
+
+        self._ctx = mp.get_context("spawn")   # Windows와 같은 방식 (부모의 스레드/모델 상태를 물려받지 않음)
+        self._results = self._ctx.Queue()
+        self._ids = itertools.count(1)
+        self._free = queue.Queue()            # 쉬는 워커
+        self._lock = threading.Lock()
+        self._workers = []
+        self._by_id = {}                      # req_id -> 워커
+        self._closed = False
+        self._reader = None
+
+    # -----------------------------------------------------
+    # 시작/종료
+    # -----------------------------------------------------
+    def start(self):
+        """워커를 띄우고 모두 모델을 읽을 때까지 기다림 (하나라도 실패하면 RuntimeError)"""
+        started = time.perf_counter()
+        self._workers = [_Worker(self._ctx, f"{self.kind}-worker-{i}", self.kind, self.options,
+                                 self.slot_bytes, self._results)
+                         for i in range(self.num_procs)]
+        for _ in self._workers:
+            try:
+                _, ok, msg = self._results.get(timeout=self.start_timeout)
+            except queue.Empty:
+                ok, msg = False, "모델 로딩 시간 초과"
+            if not ok:
+                self.close()
+                raise RuntimeError(f"{self.kind} 워커 시작 실패: {msg}")
+        for worker in self._workers:
+            self._free.put(worker)
+        self._reader = threading.Thread(target=self._read_results, name=f"{self.kind}-results", daemon=True)
+        self._reader.start()
+        print(f"[Worker] {self.kind} 워커 {self.num_procs}개 준비 ({time.perf_counter() - started:.1f}s, {self.options})")
+        return self
+
+    def close(self):
+        self._closed = True
+        for worker in self._workers:
+            worker.close()
+            if worker.pending is not None:
+                worker.pending[1].set_exception(RuntimeError(f"{self.kind} 워커 종료"))
+        self._workers = []
+
+    # -----------------------------------------------------
+    # 요청
+    # -----------------------------------------------------
+    def submit(self, op, array=None, **kwargs):
+        """array를 쉬는 워커의 공유 메모리에 복사하고 요청 전송 -> concurrent Future"""
+        if self._closed:
+            raise RuntimeError(f"{self.kind} 워커가 종료되었습니다")
+        shape = dtype = None
+        if array is not None:
+            array = np.ascontiguousarray(array)
+            if array.nbytes > self.slot_bytes:
+                raise ValueError(f"입력이 공유 메모리보다 큼 ({array.nbytes} > {self.slot_bytes} bytes)")
+            shape, dtype = array.shape, array.dtype.str
+
+        try:
+            worker = self._free.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise TimeoutError(f"{self.kind} 워커가 {self.acquire_timeout:.0f}초 동안 응답하지 않습니다") from None
+        fut = Future()
+        req_id = next(self._ids)
+        with self._lock:
+            # 종료됐거나 재시작 대기 중인 워커: 요청을 넣으면 처리되지 않으므로 바로 실패
+            usable = not self._closed and worker.retry_at is None and worker.process.is_alive()
+            if usable:
+                if array is not None:
+                    np.ndarray(shape, dtype=dtype, buffer=worker.shm.buf)[...] = array
+                worker.pending = (req_id, fut)
+                self._by_id[req_id] = worker
+        if not usable:
+            self._free.put(worker)
+            raise RuntimeError(f"{self.kind} 워커가 종료되어 재시작을 기다리는 중입니다")
+        worker.requests.put((req_id, op, shape, dtype, kwargs))
+        return fut
+
+    def call(self, op, array=None, timeout=None, **kwargs):
+        return self.submit(op, array, **kwargs).result(timeout)
+
+    def _finish(self, worker, req_id, ok, value):
+        with self._lock:
+            if worker.pending is None or worker.pending[0] != req_id:
+                return
+            _, fut = worker.pending
+            worker.pending = None
+            self._by_id.pop(req_id, None)
+        # 결과를 넘기기 전에 워커를 돌려놓음 (공유 메모리는 이제 다음 요청이 써도 됨)
+        self._free.put(worker)
+        if ok:
+            fut.set_result(value)
+        else:
+            fut.set_exception(RuntimeError(f"{self.kind} 추론 실패: {value}"))
+
+    def _read_results(self):
+        next_check = time.monotonic() + 1.0
+        while not self._closed:
+            # 결과가 계속 들어와도 1초마다 한 번은 워커 생존 확인
+            if time.monotonic() >= next_check:
+                self._check_alive()
+                next_check = time.monotonic() + 1.0
+            try:
+                req_id, ok, value = self._results.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            with self._lock:
+                worker = self._by_id.get(req_id)
+            if worker is not None:
+                self._finish(worker, req_id, ok, value)
+
+    def _check_alive(self):
+        """죽은 워커의 진행 중 요청은 실패 처리하고, 지수 백오프 뒤 같은 객체로 다시 시작"""
+        now = time.monotonic()
+        for worker in self._workers:
+            if self._closed:
+                return
+            if worker.retry_at is None and worker.process.is_alive():
+                if worker.restarts and now - worker.spawned_at >= self.RESTART_RESET_SEC:
+                    worker.restarts = 0
+                continue
+
+            delay = None
+            with self._lock:
+                pending, worker.pending = worker.pending, None
+                if pending is not None:
+                    self._by_id.pop(pending[0], None)
+                if worker.retry_at is None:
+                    delay = min(self.RESTART_MAX_SEC, self.RESTART_BASE_SEC * 2 ** worker.restarts)
+                    worker.retry_at = now + delay
+                    worker.release()
+            if pending is not None:
+                pending[1].set_exception(RuntimeError(f"{self.kind} 워커가 비정상 종료되었습니다"))
+                self._free.put(worker)
+
+            if delay is not None:
+                print(f"[Worker] {worker.name} 종료됨 (exit {worker.process.exitcode}) -> {delay:.1f}초 뒤 다시 시작")
+            elif now >= worker.retry_at:
+                # 같은 객체로 다시 시작하므로 쉬는 워커 큐에 들어 있던 참조도 그대로 유효
+                # (준비 알림은 결과 큐로 오며, 그 전에 들어온 요청은 모델 로딩 후 처리됨)
+                worker.restarts += 1
+                worker.spawn()
+                worker.retry_at = None
+
+
+# ---------------------------------------------------------
+# 기존 호출 방식과 같은 대역
+# ---------------------------------------------------------
+class RemoteWhisper:
+    """WhisperModel.transcribe(audio, ...)와 같은 모양으로 워커에 위임"""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def transcribe(self, audio, **kwargs):
+        segs, language = self.pool.call("transcribe", np.asarray(audio, dtype=np.float32), **kwargs)
+        segments = [SimpleNamespace(text=t, avg_logprob=lp, no_speech_prob=ns) for t, lp, ns in segs]
+        return iter(segments), SimpleNamespace(language=language)
+
+
+class RemoteFaceRecognition:
+    """face_recognition 모듈의 face_locations/face_landmarks/face_encodings를 워커에 위임"""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def face_locations(self, img, number_of_times_to_upsample=1, model="hog"):
+        return self.pool.call("face_locations", img, number_of_times_to_upsample=number_of_times_to_upsample,
+                              model=model)
+
+    def face_landmarks(self, img, face_locations=None, model="large"):
+        return self.pool.call("face_landmarks", img, face_locations=face_locations, model=model)
+
+    def face_encodings(self, img, known_face_locations=None, num_jitters=1, model="small"):
+        return self.pool.call("face_encodings", img, known_face_locations=known_face_locations,
+                              num_jitters=num_jitters, model=model)
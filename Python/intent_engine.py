@@ -0,0 +1,190 @@
+## 음성 명령 인텐트 매칭 엔진
+## COMMANDS 키워드를 시작 시 한 번 정규화(공백/문장부호 제거, 영어 소문자화, 조사 제거)해서
+## Aho-Corasick 오토마톤으로 컴파일하고, 텍스트를 한 번 훑어 가장 알맞은 명령과 점수를 돌려준다.
+## 정확히 일치하는 키워드가 없으면 자모 단위 편집 거리(상한 있음)로 근사 매칭을 시도한다.
+## 부정("켜지 마", "don't")이나 상태 질문("켜져 있어?", "is the light on?")은 정규화 전에 걸러서 명령으로 보지 않는다.
+import re
+import unicodedata
+from collections import deque
+
+# 한국어 조사/군더더기 (어절 끝에서 제거)
+KO_PARTICLES = ("을", "를", "은", "는", "이", "가", "도")
+KO_FILLERS = {"좀", "그", "저기", "혹시"}
+# 영어 군더더기 단어
+EN_FILLERS = {"the", "a", "an", "please", "my", "can", "you", "could", "would", "hey"}
+# 일본어 목적격 조사 (히라가나 'を'는 단어 내부에 거의 쓰이지 않음)
+JA_PARTICLES = ("を",)
+
+_TOKEN_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+# 부정 표현: 있으면 명령 아님 ("불 끄지 마", "켜지 말아줘", "안 켜", "don't turn on", "消さないで")
+NEGATION_RE = re.compile(r"지\s*마|지\s*말|않|(^|\s)안\s|(^|\s)못\s|\bdon'?t\b|\bdo not\b|\bnot\b|\bnever\b|ないで|するな")
+# 질문 표현: 요청형(QUESTION_REQUEST_RE)이 아니면 명령 아님 ("불 켜져 있어?", "is the fan on", "電気ついてる?")
+QUESTION_RE = re.compile(r"[?？]|있어|있니|있나|있는지|됐어|됐니|인가|^\s*(is|are|was|were|did|does)\b|ですか|ますか|てる|ている")
+# 물음표가 붙어도 부탁하는 말이면 명령 ("불 켜줄래?", "can you turn on the light?", "つけてくれる?")
+QUESTION_REQUEST_RE = re.compile(r"줄래|줘|주세요|주실래|줄\s*수|^\s*(can|could|would|will)\s+you\b|\bplease\b|ください|くれ|ちょうだい")
+
+
+def _is_hangul(ch):
+    return "가" <= ch <= "힣"
+
+
+def normalize(text):
+    """매칭용 정규화: NFKC + 소문자화, 문장부호/공백/조사/군더더기 제거 후 이어 붙임"""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    out = []
+    for tok in _TOKEN_RE.split(text):
+        if not tok or tok in EN_FILLERS or tok in KO_FILLERS:
+            continue
+        if len(tok) >= 2 and _is_hangul(tok[-2]) and tok.endswith(KO_PARTICLES):
+            tok = tok[:-1]
+        for p in JA_PARTICLES:
+            tok = tok.replace(p, "")
+        out.append(tok)
+    return "".join(out)
+
+
+def guard(text):
+    """명령으로 보면 안 되는 문장이면 이유("negation"/"question"), 아니면 None"""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    if NEGATION_RE.search(text):
+        return "negation"
+    if QUESTION_RE.search(text) and not QUESTION_REQUEST_RE.search(text):
+        return "question"
+    return None
+
+
+def to_jamo(text):
+    """한글 음절을 초/중/종성으로 분해 ('켜'와 '꺼'처럼 한 음절 차이도 편집 거리 2가 되도록)"""
+    out = []
+    for ch in text:
+        if _is_hangul(ch):
+            code = ord(ch) - 0xAC00
+            out.append(chr(0x1100 + code // 588))
+            out.append(chr(0x1161 + (code % 588) // 28))
+            if code % 28:
+                out.append(chr(0x11A7 + code % 28))
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def substring_distance(pattern, text, max_dist):
+    """text의 임의 부분 문자열과 pattern 사이 최소 편집 거리 (max_dist 초과 시 max_dist + 1)"""
+    m = len(pattern)
+    prev = list(range(m + 1))
+    best = prev[m]
+    for ch in text:
+        cur = [0] * (m + 1)   # 부분 문자열은 어디서든 시작 가능 -> 첫 칸은 0
+        for j in range(1, m + 1):
+            cost = 0 if pattern[j - 1] == ch else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+        best = min(best, cur[m])
+        if best == 0:
+            return 0
+        prev = cur
+    return best if best <= max_dist else max_dist + 1
+
+
+class IntentEngine:
+    """COMMANDS 테이블용 다국어 키워드 매처 (시작 시 한 번 빌드)"""
+
+    FUZZY_MIN_LEN = 4     # 이보다 짧은 (자모 기준) 키워드는 근사 매칭 제외
+    FUZZY_MIN_SCORE = 0.85  # 근사 매칭 최소 점수 ('불켜'/'불꺼'처럼 자모 하나 차이로 뜻이 바뀌는 짧은 키워드는 정확 일치만)
+
+    def __init__(self, commands, fuzzy_min_score=FUZZY_MIN_SCORE):
+        self.commands = commands
+        self.fuzzy_min_score = fuzzy_min_score
+        self._keywords = []   # (정규화 키워드, 명령 dict)
+        seen = set()
+        for cmd in commands:
+            for kw in cmd["kws"]:
+                norm = normalize(kw)
+                if norm and (norm, cmd["cmd"], cmd["lang"]) not in seen:
+                    seen.add((norm, cmd["cmd"], cmd["lang"]))
+                    self._keywords.append((norm, cmd))
+        self._build_automaton()
+        self._fuzzy = [(to_jamo(norm), cmd) for norm, cmd in self._keywords]
+
+    # -----------------------------------------------------
+    # Aho-Corasick 오토마톤
+    # -----------------------------------------------------
+    def _build_automaton(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for idx, (norm, _) in enumerate(self._keywords):
+            state = 0
+            for ch in norm:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(idx)
+
+        q = deque(self._goto[0].values())
+        while q:
+            state = q.popleft()
+            for ch, nxt in self._goto[state].items():
+                q.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _exact(self, norm_text):
+        """한 번의 순회로 일치하는 키워드 중 가장 긴 것(같으면 마지막 위치) 선택"""
+        best = None   # (길이, 끝 위치, 키워드 인덱스)
+        state = 0
+        for pos, ch in enumerate(norm_text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for idx in self._out[state]:
+                cand = (len(self._keywords[idx][0]), pos, idx)
+                if best is None or cand > best:
+                    best = cand
+        return None if best is None else self._keywords[best[2]][1]
+
+    # -----------------------------------------------------
+    # 근사 매칭
+    # -----------------------------------------------------
+    def _fuzzy_match(self, norm_text):
+        text = to_jamo(norm_text)
+        results = {}   # 명령 코드 -> (점수, 명령 dict)
+        for pattern, cmd in self._fuzzy:
+            if len(pattern) < self.FUZZY_MIN_LEN:
+                continue
+            max_dist = 1 if len(pattern) < 10 else 2
+            dist = substring_distance(pattern, text, max_dist)
+            if dist > max_dist:
+                continue
+            score = 1.0 - dist / len(pattern)
+            if score < self.fuzzy_min_score:
+                continue
+            if cmd["cmd"] not in results or score > results[cmd["cmd"]][0]:
+                results[cmd["cmd"]] = (score, cmd)
+        if not results:
+            return None, 0.0
+        ranked = sorted(results.values(), key=lambda r: r[0], reverse=True)
+        # 서로 다른 명령이 같은 점수로 겹치면 (예: 'fan of' -> on/off) 판단 보류
+        if len(ranked) > 1 and ranked[0][0] == ranked[1][0]:
+            return None, 0.0
+        return ranked[0][1], ranked[0][0]
+
+    def match(self, text):
+        """(명령 dict 또는 None, 점수 0~1) 반환. 정확 일치는 1.0, 부정/질문 문장은 (None, 0.0)"""
+        if guard(text) is not None:
+            return None, 0.0
+        norm_text = normalize(text)
+        if not norm_text:
+            return None, 0.0
+        cmd = self._exact(norm_text)
+        if cmd is not None:
+            return cmd, 1.0
+        return self._fuzzy_match(norm_text)
@@ -0,0 +1,241 @@
+## Java 명령 서버(39186)와의 단일 지속 연결 관리
+## 명령마다 소켓을 새로 열고 닫는 대신 asyncio 스트림 하나로 연결을 유지하며 끊기면 자동으로 다시 붙는다.
+## 보내는 명령은 쓰기 큐에 모았다가 한 번에 전송하고, 받은 줄은 Message로 파싱해 on_line 콜백으로 넘긴다 (콜백은 이벤트 루프에서 호출됨).
+## 같은 명령의 연속 전송은 타이머 스레드 대신 monotonic 시계로 걸러낸다 (디바운스).
+## 조회 명령(REQ_TEMP 등)은 요청 ID를 붙여 보내고, 같은 ID가 붙은 응답이 오면 해당 Future를 바로 완료시킨다.
+## send()/request_future()는 어느 스레드에서 불러도 되며, 실제 처리는 루프로 넘겨서 한다.
+## 연결될 때마다 subscribe에 적은 종류의 중계를 'SUBSCRIBE 종류'로 요청한다 (센서 줄은 구독한 연결에만 옴).
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from line_protocol import parse_message, read_lines
+
+
+class JavaLink:
+    """명령 포트 지속 연결 (자동 재연결 + 배치 쓰기 큐 + 수신 콜백)"""
+
+    def __init__(self, host, port, on_line, debounce_sec=1.5, reconnect_sec=1.0, stale_sec=2.0, subscribe=()):
+        self.host = host
+        self.port = port
+        self.on_line = on_line
+        self.subscribe = tuple(subscribe)   # 연결 직후 구독할 중계 종류 (예: "SENSOR")
+        self.debounce_sec = debounce_sec
+        self.reconnect_sec = reconnect_sec
+        self.stale_sec = stale_sec          # 연결이 없어 이보다 오래 못 보낸 명령은 버림
+
+        self._loop = None
+        self._loop_thread = None
+        self._writer = None
+        self._wake = None
+        self._tasks = []
+        self._outbox = deque()      # (넣은 시각, 줄)
+        self._last_sent = {}        # 명령 -> 마지막 전송 시각 (디바운스)
+
+        # 요청/응답 상관관계: 요청 ID -> (응답 종류, 명령, Future)
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._req_ids = itertools.count(1)
+
+    @property
+    def connected(self):
+        return self._writer is not None
+
+    def start(self):
+        """실행 중인 이벤트 루프에 연결/쓰기 태스크를 띄움"""
+        if self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._wake = asyncio.Event()
+        self._tasks = [
+            self._loop.create_task(self._connection_loop()),
+            self._loop.create_task(self._writer_loop()),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _call(self, fn, *args):
+        """루프 스레드면 바로, 아니면 루프에 넘겨서 fn 실행"""
+        if threading.get_ident() == self._loop_thread:
+            fn(*args)
+        else:
+            self._loop.call_soon_threadsafe(fn, *args)
+
+    # -----------------------------------------------------
+    # 송신
+    # -----------------------------------------------------
+    def send(self, cmd, debounce=True):
+        """명령 한 줄을 쓰기 큐에 넣음 (스레드 안전). 런타임이 시작 전이면 False"""
+        if self._loop is None or self._loop.is_closed():
+            print(f"[TCP] Failed to send: {cmd}")
+            return False
+        self._call(self._enqueue, cmd, debounce)
+        return True
+
+    def _enqueue(self, cmd, debounce):
+        now = time.monotonic()
+        if debounce and now - self._last_sent.get(cmd, -1e9) < self.debounce_sec:
+            print(f"[TCP] 중복 명령 무시: {cmd}")
+            return
+        self._last_sent[cmd] = now
+        self._outbox.append((now, cmd))
+        self._wake.set()
+
+    def _drop_stale(self):
+        """stale_sec 넘게 못 보낸 명령을 버리고, 조회 요청이면 바로 실패 처리"""
+        now = time.monotonic()
+        while self._outbox and now - self._outbox[0][0] >= self.stale_sec:
+            _, line = self._outbox.popleft()
+            print(f"[TCP] Failed to send: {line}")
+            _, _, rid = line.rpartition(" #")
+            with self._pending_lock:
+                entry = self._pending.pop("#" + rid, None) if rid.isdigit() else None
+            if entry is not None and not entry[2].done():
+                entry[2].set_exception(ConnectionError(f"{entry[1]} 전송 실패"))
+
+    async def _writer_loop(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            self._drop_stale()
+            writer = self._writer
+            if writer is None or not self._outbox:
+                if self._outbox:
+                    # 연결을 기다리는 동안에도 오래된 명령은 제때 버림
+                    self._loop.call_later(self.stale_sec, self._wake.set)
+                continue
+            # 쌓인 명령을 한 번에 묶어서 전송
+            batch = list(self._outbox)
+            self._outbox.clear()
+            payload = "".join(line + "\n" for _, line in batch).encode()
+            try:
+                writer.write(payload)
+                await writer.drain()
+                for _, line in batch:
+                    print(f"[TCP] Sent: {line}")
+            except (OSError, RuntimeError) as e:
+                print(f"[TCP] 전송 실패, 재연결 대기: {e}")
+                self._drop(writer)
+                # 방금 보낸 명령은 재연결 후 다시 시도 (stale_sec가 지나면 _drop_stale에서 버림)
+                self._outbox.extendleft(reversed(batch))
+
+    # -----------------------------------------------------
+    # 요청 / 응답
+    # -----------------------------------------------------
+    def request_future(self, cmd, reply_kind, timeout=3.0, share=True):
+        """'cmd #id'를 보내고, 'reply_kind:값 #id' 응답의 값 문자열로 완료되는 Future 반환
+
+        share=True면 같은 명령이 이미 응답 대기 중일 때 그 Future를 같이 씀.
+        응답에 ID가 없으면(이전 버전 Java) 같은 종류를 기다리는 가장 오래된 요청을 완료시킨다.
+        타임아웃은 루프의 call_later로 걸어 두므로 별도 타이머 스레드가 없다.
+        """
+        with self._pending_lock:
+            if share:
+                for kind, pending_cmd, fut in self._pending.values():
+                    if pending_cmd == cmd and kind == reply_kind:
+                        return fut
+            rid = f"#{next(self._req_ids)}"
+            fut = Future()
+            self._pending[rid] = (reply_kind, cmd, fut)
+
+        if not self.send(f"{cmd} {rid}", debounce=False):
+            with self._pending_lock:
+                self._pending.pop(rid, None)
+            fut.set_exception(ConnectionError(f"{cmd} 전송 실패"))
+            return fut
+        self._call(self._arm_timeout, rid, timeout)
+        return fut
+
+    def _arm_timeout(self, rid, timeout):
+        self._loop.call_later(timeout, self._timeout, rid)
+
+    def _timeout(self, rid):
+        with self._pending_lock:
+            entry = self._pending.pop(rid, None)
+        if entry is not None and not entry[2].done():
+            entry[2].set_exception(TimeoutError())
+
+    async def arequest(self, cmd, reply_kind, timeout=3.0):
+        """루프 안에서 쓰는 조회: 응답 값 문자열, 실패/타임아웃이면 None"""
+        try:
+            return await asyncio.wrap_future(self.request_future(cmd, reply_kind, timeout))
+        except Exception as e:
+            print(f"[TCP] {cmd} 응답 없음: {str(e) or '타임아웃'}")
+            return None
+
+    def request(self, cmd, reply_kind, timeout=3.0):
+        """루프 밖 스레드용 블로킹 조회 (루프 스레드에서 부르면 안 됨)"""
+        try:
+            return self.request_future(cmd, reply_kind, timeout).result(timeout=timeout + 1.0)
+        except Exception as e:
+            print(f"[TCP] {cmd} 응답 없음: {str(e) or '타임아웃'}")
+            return None
+
+    def _resolve(self, msg):
+        """대기 중인 요청의 응답이면 Future를 완료시키고 True"""
+        if not self._pending or msg.kind is None:
+            return False
+        with self._pending_lock:
+            if msg.rid is not None:
+                entry = self._pending.get(msg.rid)
+                if entry is None or entry[0] != msg.kind:
+                    return False
+                self._pending.pop(msg.rid)
+            else:
+                match = next((k for k, v in self._pending.items() if v[0] == msg.kind), None)
+                if match is None:
+                    return False
+                entry = self._pending.pop(match)
+        fut = entry[2]
+        if not fut.done():
+            fut.set_result(msg.arg)
+        return True
+
+    # -----------------------------------------------------
+    # 연결 / 수신
+    # -----------------------------------------------------
+    async def _connection_loop(self):
+        while True:
+            try:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), 3)
+            except (OSError, asyncio.TimeoutError):
+                await asyncio.sleep(self.reconnect_sec)
+                continue
+
+            print(f"[TCP] Java 명령 서버 연결됨 ({self.host}:{self.port})")
+            if self.subscribe:
+                # 쓰기 큐보다 먼저 보냄 (디바운스/오래된 명령 정리 대상이 아님)
+                writer.write("".join(f"SUBSCRIBE {kind}\n" for kind in self.subscribe).encode())
+            self._writer = writer
+            self._wake.set()
+            try:
+                await self._read_loop(reader)
+            except OSError as e:
+                print(f"[TCP] 수신 에러: {e}")
+            finally:
+                self._drop(writer)
+            print("[TCP] Java 명령 서버 연결 끊김")
+            await asyncio.sleep(self.reconnect_sec)
+
+    async def _read_loop(self, reader):
+        # 읽기 경계에서 잘린 줄/UTF-8 문자는 다음 읽기와 이어 붙여서 처리
+        async for line in read_lines(reader):
+            try:
+                msg = parse_message(line)
+                if self._resolve(msg):
+                    continue
+                self.on_line(msg)
+            except Exception as e:
+                print(f"[TCP] 수신 처리 에러 '{line}': {e}")
+
+    def _drop(self, writer):
+        if self._writer is writer:
+            self._writer = None
+        writer.close()
@@ -0,0 +1,87 @@
+## Java/GUI 소켓 공용 줄 단위 프로토콜
+## recv 경계와 상관없이 '\n'까지를 한 줄로 모으고 (읽기 사이에 남은 조각은 다음 읽기로 이어 붙임),
+## UTF-8은 증분 디코더로 풀어서 멀티바이트 문자가 읽기 경계에서 잘려도 예외가 나지 않는다.
+## 한 줄이 max_line을 넘으면 다음 줄바꿈까지 버려서 버퍼가 끝없이 커지지 않는다.
+## parse_message()는 'KIND[:| ]인자 [#요청ID]' 줄을 Message로 나눠서, 받는 쪽은 kind로 dict 조회만 하면 된다.
+import codecs
+import re
+from collections import namedtuple
+
+MAX_LINE = 4096        # 한 줄 최대 길이 (문자)
+READ_CHUNK = 4096      # 한 번에 읽는 바이트 수
+
+_MESSAGE_RE = re.compile(r"([A-Za-z0-9_]+)\s*:?\s*(.*)", re.S)
+_RID_RE = re.compile(r"\s#(\d+)$")
+
+# kind: 대문자 명령/이벤트 이름 (형식이 맞지 않으면 None), arg: 나머지 문자열, rid: '#id' 또는 None, raw: 원본 줄
+Message = namedtuple("Message", "kind arg rid raw")
+
+
+def parse_message(line):
+    """'CURRENT_TEMP:23.5 #3' -> Message('CURRENT_TEMP', '23.5', '#3', 원본)"""
+    body, rid = line, None
+    m = _RID_RE.search(line)
+    if m:
+        body, rid = line[:m.start()], "#" + m.group(1)
+    m = _MESSAGE_RE.fullmatch(body.strip())
+    if m is None:
+        return Message(None, body.strip(), rid, line)
+    return Message(m.group(1).upper(), m.group(2).strip(), rid, line)
+
+
+class LineDecoder:
+    """바이트 청크를 받아 완성된 줄 목록을 돌려주는 증분 디코더"""
+
+    def __init__(self, max_line=MAX_LINE):
+        self.max_line = max_line
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""
+        self._discarding = False   # 너무 긴 줄을 다음 줄바꿈까지 버리는 중
+
+    def feed(self, data):
+        """새 바이트를 넣고 이번에 완성된 (공백 제거, 빈 줄 제외) 줄 목록 반환"""
+        *complete, rest = (self._partial + self._decoder.decode(data)).split("\n")
+        lines = []
+        for line in complete:
+            if self._discarding:
+                self._discarding = False
+                continue
+            self._accept(line, lines)
+        if len(rest) > self.max_line:
+            print(f"[Line] {self.max_line}자를 넘는 줄 버림")
+            rest = ""
+            self._discarding = True
+        self._partial = rest
+        return lines
+
+    def finish(self):
+        """연결 종료 시 줄바꿈 없이 남은 마지막 줄까지 반환"""
+        rest = self._partial + self._decoder.decode(b"", final=True)
+        self._partial = ""
+        lines = []
+        if not self._discarding:
+            self._accept(rest, lines)
+        self._discarding = False
+        return lines
+
+    def _accept(self, line, out):
+        line = line.strip()
+        if not line:
+            return
+        if len(line) > self.max_line:
+            print(f"[Line] {self.max_line}자를 넘는 줄 버림")
+            return
+        out.append(line)
+
+
+async def read_lines(reader, max_line=MAX_LINE):
+    """asyncio StreamReader에서 줄을 하나씩 내보내는 비동기 제너레이터 (EOF면 남은 줄까지 내보내고 끝)"""
+    decoder = LineDecoder(max_line)
+    while True:
+        data = await reader.read(READ_CHUNK)
+        if not data:
+            for line in decoder.finish():
+                yield line
+            return
+        for line in decoder.feed(data):
+            yield line
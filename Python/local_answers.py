@@ -0,0 +1,222 @@
+## 로컬 우선 답변 (네트워크 없이 바로 답할 수 있는 질문)
+## 기기 명령 매칭 다음, Gemini 호출 전에 거쳐서 시간/날짜/실내 온습도/도어락 상태/기기 상태 질문은
+## 프로세스 안의 상태(센서 저장소, 기기 상태)로 한국어/영어/일본어 템플릿 답변을 만든다.
+## 해당하지 않는 질문만 None을 돌려서 LLM으로 넘긴다.
+## 상태 질문("불 켜져 있어?")은 is_state_question()으로 명령 매칭/조기 감지보다 먼저 걸러 기기를 건드리지 않게 한다.
+import re
+import threading
+import time
+import unicodedata
+from datetime import datetime
+
+LANGS = ("ko", "en", "ja")
+
+# 기기 명령/이벤트 -> (기기, 상태)
+DEVICE_EVENTS = {
+    "LED_ON": ("LED", "on"), "LED_OFF": ("LED", "off"),
+    "RGB_ON": ("LED", "on"), "RGB_OFF": ("LED", "off"),
+    "FAN_ON": ("FAN", "on"), "FAN_OFF": ("FAN", "off"),
+    "UNLOCK": ("DOOR", "unlocked"), "UNLOCKED": ("DOOR", "unlocked"), "LOCKED": ("DOOR", "locked"),
+}
+
+# 질문 판별 키워드 (_compact() 후 문자열에서 부분 일치로 찾으므로 공백 없이 적음)
+TIME_KWS = ("몇시", "현재시간", "지금시간", "whattime", "timeisit", "currenttime", "thetime", "何時", "なんじ", "今の時間")
+# 짧은 단어는 다른 단어 안에서도 걸리므로 ("date" -> "update", "문" -> "문제") 질문에 쓰이는 더 긴 형태로 적음
+DATE_KWS = ("며칠", "몇일", "날짜", "무슨요일", "몇월", "whatday", "whatdate", "thedatetoday", "datetoday", "todaysdate",
+            "whatsthedate", "whatisthedate", "dayisit", "dayoftheweek", "何日", "日付", "何曜日")
+INDOOR_KWS = ("실내", "집안", "집", "방", "indoor", "inside", "room", "house", "home", "室内", "部屋", "家")
+TEMP_KWS = ("온도", "기온", "temperature", "temp", "温度", "気温")
+HUMI_KWS = ("습도", "humidity", "humid", "湿度")
+OUTDOOR_KWS = ("날씨", "바깥", "밖", "외부", "weather", "outside", "outdoor", "天気", "外")
+DOOR_KWS = ("현관", "대문", "문이", "문은", "문잠", "문열", "문닫", "문상태", "도어", "door", "ドア", "玄関")
+DOOR_STATE_KWS = ("잠겼", "잠겨", "잠금", "열려", "열렸", "닫혀", "상태", "locked", "status", "state",
+                  "鍵", "閉ま", "開いて", "状態")
+# "open"은 "open the door" 명령에도 들어가므로 질문 형태("is the door open", "door open?")일 때만 상태 질문
+DOOR_OPEN_KWS = ("open",)
+DEVICE_KWS = {"LED": ("불", "조명", "전등", "light", "lamp", "電気", "ライト"),
+              "FAN": ("선풍기", "팬", "fan", "扇風機", "ファン")}
+DEVICE_STATE_KWS = ("켜져", "꺼져", "켜있", "꺼있", "상태", "status", "state", "ison", "isoff", "areon", "areoff",
+                    "ついて", "消えて", "状態")
+SUMMARY_KWS = ("기기상태", "장치상태", "집상태", "devicestatus", "homestatus", "機器の状態", "家の状態")
+
+WEEKDAYS = {
+    "ko": ("월요일", "화요일", "수요일", "목요일", "금요일", "토요일", "일요일"),
+    "en": ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"),
+    "ja": ("月曜日", "火曜日", "水曜日", "木曜日", "金曜日", "土曜日", "日曜日"),
+}
+MONTHS_EN = ("January", "February", "March", "April", "May", "June", "July",
+             "August", "September", "October", "November", "December")
+
+DEVICE_NAMES = {
+    "ko": {"LED": "조명은", "FAN": "선풍기는"},
+    "en": {"LED": "The light", "FAN": "The fan"},
+    "ja": {"LED": "電気", "FAN": "扇風機"},
+}
+STATE_WORDS = {
+    "ko": {"on": "켜져 있습니다", "off": "꺼져 있습니다", None: "상태를 아직 모릅니다"},
+    "en": {"on": "is on", "off": "is off", None: "state is unknown"},
+    "ja": {"on": "ついています", "off": "消えています", None: "状態はまだ分かりません"},
+}
+
+
+_NON_WORD_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def _compact(text):
+    """키워드 검사용: NFKC + 소문자화 후 공백/문장부호만 제거 (조사는 남김: '온도'의 '도'가 잘리지 않도록)"""
+    return _NON_WORD_RE.sub("", unicodedata.normalize("NFKC", text).casefold())
+
+
+def _has(text, kws):
+    return any(k in text for k in kws)
+
+
+def _asked_devices(q):
+    """기기 상태를 묻는 문장이면 물어본 기기 목록 (_compact() 된 문자열 기준, 아니면 빈 목록)"""
+    asked = [dev for dev, kws in DEVICE_KWS.items() if _has(q, kws)]
+    if asked and (_has(q, DEVICE_STATE_KWS) or q.startswith(("is", "are"))):
+        return asked
+    return []
+
+
+def _asked_door(text, q):
+    """도어락 상태를 묻는 문장이면 True (q는 text를 _compact() 한 문자열)"""
+    if not _has(q, DOOR_KWS):
+        return False
+    if _has(q, DOOR_STATE_KWS):
+        return True
+    asking = q.startswith(("is", "are")) or text.rstrip().endswith(("?", "？"))
+    return asking and _has(q, DOOR_OPEN_KWS)
+
+
+def is_state_question(text):
+    """기기/도어락 상태 질문이면 True ('불 켜져 있어?'가 LED_ON 명령으로 실행되지 않도록 명령 매칭 전에 확인)"""
+    q = _compact(text)
+    return bool(q) and (_has(q, SUMMARY_KWS) or _asked_door(text, q) or bool(_asked_devices(q)))
+
+
+class DeviceState:
+    """기기별 마지막으로 알려진 상태 (보낸 명령 + Java가 중계한 명령/도어 이벤트로 갱신)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = {}     # 기기 -> (상태, monotonic 시각)
+
+    def note(self, event):
+        """명령/이벤트 이름을 반영. 기기 상태 이벤트였으면 True"""
+        entry = DEVICE_EVENTS.get(event)
+        if entry is None:
+            return False
+        with self._lock:
+            self._state[entry[0]] = (entry[1], time.monotonic())
+        return True
+
+    def get(self, device):
+        entry = self._state.get(device)
+        return None if entry is None else entry[0]
+
+
+class LocalAnswers:
+    """템플릿 질문을 로컬 상태로 답변 (해당 없으면 None)"""
+
+    def __init__(self, sensor_store, device_state, sensor_max_age=10.0, now_fn=datetime.now):
+        self.sensor_store = sensor_store
+        self.device_state = device_state
+        self.sensor_max_age = sensor_max_age
+        self.now_fn = now_fn
+
+    def answer(self, text, lang="ko"):
+        """(인텐트 이름, 답변) 또는 None"""
+        lang = lang if lang in LANGS else "ko"
+        q = _compact(text)
+        if not q:
+            return None
+
+        temp_q, humi_q = _has(q, TEMP_KWS), _has(q, HUMI_KWS)
+        if (temp_q or humi_q) and _has(q, INDOOR_KWS) and not _has(q, OUTDOOR_KWS):
+            return "indoor", self._indoor(lang, temp_q, humi_q)
+        if _has(q, SUMMARY_KWS):
+            return "devices", self._devices(lang, ("DOOR", "LED", "FAN"))
+        if _asked_door(text, q):
+            return "door", self._devices(lang, ("DOOR",))
+        asked = _asked_devices(q)
+        if asked:
+            return "devices", self._devices(lang, asked)
+        if _has(q, TIME_KWS):
+            return "time", self._time(lang)
+        if _has(q, DATE_KWS):
+            return "date", self._date(lang)
+        return None
+
+    # -----------------------------------------------------
+    # 답변 템플릿
+    # -----------------------------------------------------
+    def _time(self, lang):
+        now = self.now_fn()
+        h12 = now.hour % 12 or 12
+        if lang == "en":
+            return f"It's {h12}:{now.minute:02d} {'AM' if now.hour < 12 else 'PM'}."
+        if lang == "ja":
+            return f"今は{'午前' if now.hour < 12 else '午後'}{h12}時{now.minute}分です。"
+        return f"지금은 {'오전' if now.hour < 12 else '오후'} {h12}시 {now.minute}분입니다."
+
+    def _date(self, lang):
+        now = self.now_fn()
+        wd = WEEKDAYS[lang][now.weekday()]
+        if lang == "en":
+            return f"Today is {wd}, {MONTHS_EN[now.month - 1]} {now.day}."
+        if lang == "ja":
+            return f"今日は{now.month}月{now.day}日、{wd}です。"
+        return f"오늘은 {now.month}월 {now.day}일 {wd}입니다."
+
+    def _indoor(self, lang, want_temp, want_humi):
+        temp = self.sensor_store.get("TEMP", max_age=self.sensor_max_age) if want_temp else None
+        humi = self.sensor_store.get("HUMI", max_age=self.sensor_max_age) if want_humi else None
+        if temp is None and humi is None:
+            return {"ko": "실내 센서 값을 아직 받지 못했습니다.",
+                    "en": "I don't have a recent indoor sensor reading yet.",
+                    "ja": "室内センサーの値をまだ受け取っていません。"}[lang]
+        parts = []
+        if lang == "en":
+            if temp is not None:
+                parts.append(f"the temperature is {temp:.1f} degrees")
+            if humi is not None:
+                parts.append(f"the humidity is {humi:.0f} percent")
+            return "Indoors, " + " and ".join(parts) + "."
+        if lang == "ja":
+            if temp is not None:
+                parts.append(f"温度は{temp:.1f}度")
+            if humi is not None:
+                parts.append(f"湿度は{humi:.0f}パーセント")
+            return "室内の" + "、".join(parts) + "です。"
+        if temp is not None:
+            parts.append(f"온도는 {temp:.1f}도")
+        if humi is not None:
+            parts.append(f"습도는 {humi:.0f}퍼센트")
+        return "실내 " + ", ".join(parts) + "입니다."
+
+    def _door(self, lang):
+        state = self.device_state.get("DOOR")
+        return {
+            "ko": {"locked": "문은 잠겨 있습니다.", "unlocked": "문이 열려 있습니다."},
+            "en": {"locked": "The door is locked.", "unlocked": "The door is unlocked."},
+            "ja": {"locked": "ドアは施錠されています。", "unlocked": "ドアは開いています。"},
+        }[lang].get(state, {"ko": "도어락 상태를 아직 모릅니다.",
+                            "en": "I don't know the door lock state yet.",
+                            "ja": "ドアの状態はまだ分かりません。"}[lang])
+
+    def _devices(self, lang, devices):
+        out = []
+        for dev in devices:
+            if dev == "DOOR":
+                out.append(self._door(lang))
+                continue
+            name = DEVICE_NAMES[lang][dev]
+            state = STATE_WORDS[lang][self.device_state.get(dev)]
+            if lang == "en":
+                out.append(f"{name} {state}.")
+            elif lang == "ja":
+                out.append(f"{name}は{state}。")
+            else:
+                out.append(f"{name} {state}.")
+        return " ".join(out)
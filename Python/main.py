@@ -2,24 +2,42 @@
 ## GUI와 연동하여 스마트홈 제어, whisper를 이용한 음성인식(STT), 얼굴인식, LLM 질의응답 수행 및 구글 TTS 출력
 ## 주요 라이브러리: faster-whisper, face_recognition, google-generativeai, sounddevice, playsound, opencv-python
 ## 부득이하게 성능 문제로 인해 CPU 모드로 동작 (Whisper int8, Gemini-2.5-flash 모델 사용)
-import socket
+## 시작 순서: 네트워크 리스너/명령 경로를 먼저 띄우고, 무거운 모델(Whisper, dlib, Gemini)은 백그라운드에서 로딩
 import time
-import threading
+STARTUP_T0 = time.perf_counter()   # 시작 단계별 시간 측정 기준
+import asyncio
+import signal
 import os
 import sys
-import urllib.parse
 import numpy as np
-import sounddevice as sd
-import requests
-import cv2
-import face_recognition
-import google.generativeai as genai
 from pathlib import Path
-from playsound import playsound
-from faster_whisper import WhisperModel
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from stt_stream import StreamingTranscriber
+from stt_policy import DecodingPolicy
+from audio_recorder import AudioBuffer, AudioRecorder
+from intent_engine import IntentEngine
+from tts_cache import TTSCache, fetch_google_tts
+from java_link import JavaLink
+from event_bus import EventBus
+from automation import AutomationDispatcher, Rule, evaluate
+from line_protocol import parse_message, read_lines
+from sensor_store import SensorStore
+from telemetry_store import TelemetryStore
+from face_gallery import FaceGallery
+from camera_service import CameraService
+from audio_player import AudioPlayer, PRIORITY_ALERT, PRIORITY_COMMAND, PRIORITY_NORMAL, PRIORITY_CHAT
+from warmup import LazyModel, StageTimer
+from tracing import Tracer
+from inference_worker import InferencePool, RemoteWhisper, RemoteFaceRecognition, WHISPER, FACE
+from answer_cache import AnswerCache, SentenceSplitter, split_sentences
+from context_provider import ContextProvider, make_session
+from local_answers import LocalAnswers, DeviceState, DEVICE_EVENTS, LANGS as LOCAL_LANGS, is_state_question
 from dotenv import load_dotenv
 
+# 시작 단계별 소요 시간 기록 (모든 모델이 준비되면 한 번에 출력)
+startup = StageTimer(STARTUP_T0)
+startup.mark("imports")
+
 # ---------------------------------------------------------
 # [설정] API 키 및 모델 설정
 # ---------------------------------------------------------
@@ -43,8 +61,11 @@ if not GEMINI_API_KEY:
 else:
     print("[System] API Key Loaded.")
 
+# 지연 시간 기록 설정 (key.env 또는 환경 변수로 켬)
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH")                    # 지정하면 단계 기록을 JSON 줄로 주기적으로 덧붙임
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))    # 0보다 크면 이 비율로 핫 루프에 cProfile
+
 # Gemini 모델 설정
-genai.configure(api_key=GEMINI_API_KEY)
 GEN_CONFIG = {
     "temperature": 0.7,
     "top_p": 0.95,
@@ -52,14 +73,58 @@ GEN_CONFIG = {
     "max_output_tokens": 1000,
 }
 
-try:
+def load_gemini():
+    """Gemini 클라이언트 생성 (google.generativeai 임포트가 느려서 백그라운드에서 실행)"""
+    import google.generativeai as genai
+    genai.configure(api_key=GEMINI_API_KEY)
     # 요청하신 대로 2.5-flash 모델 유지
-    gemini_model = genai.GenerativeModel(
-        model_name="gemini-2.5-flash", 
+    return genai.GenerativeModel(
+        model_name="gemini-2.5-flash",
         generation_config=GEN_CONFIG
     )
-except Exception as e:
-    print(f"[Error] 모델 초기화 실패: {e}")
+
+# 추론 워커 프로세스 설정 (프로세스 수가 0이면 기존처럼 메인 프로세스 스레드에서 실행)
+WHISPER_PROCS = 1          # Whisper 워커 프로세스 수
+WHISPER_CPU_THREADS = 4    # 워커당 CTranslate2 연산 스레드 수 (faster-whisper cpu_threads)
+WHISPER_NUM_WORKERS = 1    # 워커당 동시 디코딩 수 (faster-whisper num_workers)
+WHISPER_SIZE = "small"     # 기본 Whisper 모델
+WHISPER_FAST_SIZE = None   # 짧은 명령 전용 작은 모델 (예: "base", None이면 기본 모델 하나만 사용)
+FACE_PROCS = 1             # 얼굴 인코딩 워커 프로세스 수
+FACE_CPU_THREADS = 1       # 얼굴 워커의 OpenCV 스레드 수
+FACE_SLOT_BYTES = 1920 * 1080 * 3   # 얼굴 워커 공유 메모리 (최대 프레임 크기)
+inference_pools = []       # 종료 시 정리할 워커 풀
+
+def load_face_models():
+    """face_recognition(dlib) 모듈과 모델 파일 로딩 (FACE_PROCS > 0이면 워커 프로세스에서)"""
+    # 카메라/추적기/등록이 쓰는 OpenCV도 여기서 미리 import (시작 경로에서는 빼고, 첫 얼굴 요청 때 지연이 없도록)
+    import cv2
+    if FACE_PROCS > 0:
+        pool = InferencePool(FACE, FACE_PROCS, slot_bytes=FACE_SLOT_BYTES,
+                             options={"cpu_threads": FACE_CPU_THREADS}).start()
+        inference_pools.append(pool)
+        return RemoteFaceRecognition(pool)
+    import face_recognition
+    return face_recognition
+
+def load_whisper(size=WHISPER_SIZE):
+    """faster-whisper 모델 로딩 (WHISPER_PROCS > 0이면 워커 프로세스에서, 오디오는 공유 메모리로 전달)"""
+    options = {"model_size": size, "compute_type": "int8",
+               "cpu_threads": WHISPER_CPU_THREADS, "num_workers": WHISPER_NUM_WORKERS}
+    if WHISPER_PROCS > 0:
+        pool = InferencePool(WHISPER, WHISPER_PROCS, slot_bytes=MAX_RECORD_SEC * SAMPLE_RATE * 4,
+                             options=options).start()
+        inference_pools.append(pool)
+        return RemoteWhisper(pool)
+    from faster_whisper import WhisperModel
+    return WhisperModel(options["model_size"], device="cpu", compute_type=options["compute_type"],
+                        cpu_threads=WHISPER_CPU_THREADS, num_workers=WHISPER_NUM_WORKERS)
+
+# 무거운 모델: main()에서 리스너를 띄운 뒤 백그라운드 로딩 (그 전에 쓰면 첫 사용 시 로딩)
+gemini_model = LazyModel("Gemini", load_gemini, timer=startup)
+face_models = LazyModel("FaceRec", load_face_models, timer=startup)
+whisper_model = LazyModel("Whisper", load_whisper, timer=startup)
+whisper_fast_model = (LazyModel("WhisperFast", lambda: load_whisper(WHISPER_FAST_SIZE), timer=startup)
+                      if WHISPER_FAST_SIZE else None)
 
 # ---------------------------------------------------------
 # [설정] 네트워크 및 시스템 상수
@@ -70,15 +135,47 @@ VOICE_SERVER_PORT = 40191 # 음성 트리거 포트
 DOOR_EVENT_PORT = 39189   # 도어락 이벤트 포트
 
 SAMPLE_RATE = 16000       # 마이크 샘플링 레이트
+MAX_RECORD_SEC = 30       # 최대 녹음 길이 (STOP_RECORDING이 오지 않아도 여기서 멈춤)
 
-# 상태 플래그
-g_is_registering = False   # 얼굴 등록 모드 여부
-g_is_recognizing = False   # 얼굴 인식 활성화 여부
-g_command_lock = False     # 명령 중복 방지 락
+TTS_CACHE_DIR = os.path.join(current_dir, "tts_cache")  # 합성 음성 캐시 폴더
+SENSOR_STALE_SEC = 10.0   # 센서 값이 이보다 오래되면 자바에 직접 조회
+TELEMETRY_DIR = os.path.join(current_dir, "telemetry")  # 센서 기록 파일 (원본/분/시간 요약, 고정 크기)
+TELEMETRY_FLUSH_SEC = 60.0  # 센서 기록 파일을 디스크에 반영하는 간격
 
-# 중복 실행 방지용 타임스탬프 (스마트 케어 실행 시간)
-g_last_smart_care_time = 0 
-g_indoor_temp = None       # 자바에서 받아온 실내 온도
+FACE_GALLERY_PATH = os.path.join(current_dir, "face_gallery.npz")  # 가족 얼굴 인코딩 갤러리
+LEGACY_FACE_PATH = os.path.join(current_dir, "owner_face.npy")     # 구버전 단일 주인 얼굴
+FACE_TOLERANCE = 0.45     # 얼굴 거리 임계값 (작을수록 엄격)
+ENROLL_BURST_FRAMES = 30  # 등록 시 연속으로 평가할 프레임 수
+ENROLL_TOP_K = 5          # 그중 품질 상위 몇 장을 인코딩해 저장할지
+ENROLL_MIN_FRAMES = 3     # 품질 기준을 넘은 프레임이 이보다 적으면 다시 촬영
+FACE_FPS = 15             # 얼굴 인식 루프 최대 처리 속도 (CPU 점유 제한)
+CAMERA_IDLE_SEC = 60.0    # 마지막 사용 후 카메라를 열어 둘 시간 (다음 요청 때 바로 사용)
+FACE_REQUEST_SEC = 10.0   # REQ_FACE_UNLOCK 후 얼굴 인식을 유지하는 시간
+FACE_COOLDOWN_SEC = 10.0  # 문이 열린 뒤 얼굴 인식 요청을 무시하는 시간
+UNLOCK_COALESCE_SEC = 5.0 # 한 번 문을 열 때 이어지는 신호(UNLOCK 전송, Java 도어 이벤트, 연속 신호)를 하나로 합치는 시간
+SMART_CARE_COOLDOWN_SEC = 10.0  # 스마트 케어(온도 조회 + 제어) 최소 실행 간격
+DOOR_RECONNECT_SEC = 3.0  # 도어락 이벤트 포트 재연결 간격
+WEATHER_TTL_SEC = 600.0   # 날씨 정보 유효 시간 (지나면 이전 값을 쓰면서 뒤에서 갱신)
+TRACE_CAPACITY = 4096     # 메모리에 보관할 최근 단계 기록 수
+TRACE_FLUSH_SEC = 300.0   # 단계 기록 파일 내보내기 간격
+WEATHER_REFRESH_SEC = 300.0  # 날씨 주기적 갱신 간격
+
+# 블로킹 작업 전용 실행기 (스레드 수 제한: 이벤트가 몰려도 스레드가 늘지 않음)
+stt_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stt")    # Whisper 마무리 디코딩
+face_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="face")  # 카메라 프레임 처리/얼굴 인코딩/등록
+io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="io")      # Gemini, 날씨 조회 등 네트워크 I/O
+
+# 이벤트 버스: 리스너/전사 스레드에서 온 이벤트를 이벤트 루프 한 곳에서 처리
+bus = EventBus()
+
+# 자동화 디스패처: 문 열림 이벤트 병합 + 동작(UNLOCK 전송, 스마트 케어)별 중복 제거
+automation = AutomationDispatcher()
+
+# 음성/얼굴 파이프라인 단계별 지연 시간 (최근 TRACE_CAPACITY개, 종료 시 p50/p95 출력)
+tracer = Tracer(capacity=TRACE_CAPACITY, profile_rate=PROFILE_SAMPLE_RATE)
+
+# 런타임 상태 (이벤트 루프 스레드에서만 읽고 씀)
+face_state = {'recognizing': False, 'registering': False, 'timer': None}
 
 # ---------------------------------------------------------
 # [Data] 명령어 및 매핑 데이터
@@ -110,480 +207,831 @@ COMMANDS = [
 # Whisper 프롬프트용 키워드 조합
 ALL_KEYWORDS = ", ".join([kw for cmd in COMMANDS for kw in cmd['kws']])
 
-# 영문 도시명 -> 한글 변환 매핑 (IP Geolocation 대응)
-CITY_MAP = {
-    "Seoul": "서울", "Busan": "부산", "Incheon": "인천", "Daegu": "대구",
-    "Daejeon": "대전", "Gwangju": "광주", "Suwon": "수원", "Ulsan": "울산",
-    "Jeonju": "전주", "Jeju": "제주", "Seongnam": "성남", "Goyang": "고양",
-    "Yongin": "용인", "Cheongju": "청주", "Cheonan": "천안", "Pohang": "포항",
-    # 필요 시 추가
-}
+# 인텐트 매칭 엔진 (시작 시 한 번 컴파일) 및 근사 매칭 최소 점수
+intent_engine = IntentEngine(COMMANDS)
+INTENT_MIN_SCORE = 0.8
+
+# 자주 쓰는 고정 안내 문구 (시작 시 TTS 캐시에 미리 합성)
+MSG_LOOK_AT_CAMERA = "카메라를 봐주세요."
+MSG_WELCOME = "주인님, 어서 오세요. 문을 엽니다."
+MSG_DOOR_OPENED = "문이 열렸습니다."
+MSG_NO_FACE_DATA = "등록된 얼굴 데이터가 없습니다."
+MSG_CARE_COLD = "춥네요. 난방기를 켜드릴게요."
+MSG_CARE_HOT = "덥네요. 에어컨을 켜드릴게요."
+MSG_ERROR = "죄송합니다. 처리 중 오류가 발생했습니다."
+
+FIXED_PHRASES = [(cmd["msg"], cmd["lang"]) for cmd in COMMANDS] + [
+    (msg, "ko") for msg in (
+        MSG_LOOK_AT_CAMERA, MSG_WELCOME, MSG_DOOR_OPENED, MSG_NO_FACE_DATA,
+        MSG_CARE_COLD, MSG_CARE_HOT, MSG_ERROR,
+        "얼굴 등록을 시작합니다.", "카메라를 찾을 수 없습니다.", "얼굴이 등록되었습니다.",
+        "얼굴이 감지되지 않았습니다.", "취소되었습니다.",
+    )
+]
 
 # ---------------------------------------------------------
 # [Util] 유틸리티 함수
 # ---------------------------------------------------------
 
-def get_current_location():
-    """IP 기반 현재 위치(도시) 조회"""
-    try:
-        res = requests.get("https://ipinfo.io/json", timeout=3)
-        city_eng = res.json().get("city", "Seoul")
-        return CITY_MAP.get(city_eng, city_eng)
-    except:
-        return "서울" # Fallback
-
-## gemini 자체로는 날씨 정보를 받아오지 못하여 크롤링으로 대체(네이버 날씨)
-def get_realtime_weather():
-    """네이버 날씨 크롤링 (현재 위치 기준)"""
-    try:
-        city = get_current_location()
-        url = f"https://search.naver.com/search.naver?query={city}+날씨"
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-        
-        res = requests.get(url, headers=headers, timeout=5)
-        soup = BeautifulSoup(res.text, 'html.parser')
-        
-        temp = soup.find('div', {'class': 'temperature_text'}).text.strip().replace("현재 온도", "")
-        status = soup.find('span', {'class': 'weather before_slash'}).text
-        
-        return f"{city} 날씨: 기온 {temp}, 상태 {status}"
-    except Exception as e:
-        print(f"[Weather] 조회 실패: {e}")
-        return "날씨 정보 조회 불가"
+# POP 보드 센서 최신값/최근 기록 (Java가 명령 포트로 중계하는 SENSOR 줄로 갱신)
+sensor_store = SensorStore()
 
-def ask_gemini(text, lang="ko"):
-    """Gemini API 호출 및 응답 생성"""
-    try:
-        print(f"[Gemini] Query: {text} (Lang: {lang})")
-        
-        context_info = ""
-        weather_kws = ["날씨", "weather", "天気", "tenki"]
-        
-        # 날씨 키워드 감지 시 컨텍스트 주입
-        if any(w in text.lower() for w in weather_kws):
-            weather_data = get_realtime_weather()
-            print(f"[Gemini] Context Injected: {weather_data}")
-            context_info = f"참고 정보: {weather_data}"
-
-        # 언어 설정 정의 위치 수정
-        lang_instruction = {
-            "ko": "한국어로 간결하게 답변.",
-            "en": "Answer briefly in English.",
-            "ja": "日本語で簡潔に答えて。"
-        }.get(lang, "한국어로 답변.")
-
-        prompt = f"""
+# 센서 장기 기록 (같은 SENSOR 줄로 갱신, 추세/기간 질문용 구간 조회)
+telemetry = TelemetryStore(TELEMETRY_DIR)
+
+# 기기(LED/선풍기/도어락)의 마지막으로 알려진 상태 (보낸 명령 + Java가 중계한 명령/도어 이벤트로 갱신)
+device_state = DeviceState()
+
+# 시간/날짜/실내 온습도/기기 상태 질문은 Gemini 없이 로컬 상태로 바로 답변
+local_answers = LocalAnswers(sensor_store, device_state, sensor_max_age=SENSOR_STALE_SEC)
+
+# Whisper 디코딩 프로필: 짧은 명령은 greedy + 집 언어 고정 (+ 작은 모델), 긴 질문은 전체 beam + 언어 감지
+stt_policy = DecodingPolicy(
+    command_prompt=f"Commands: {ALL_KEYWORDS}",
+    fast_model=whisper_fast_model.get if whisper_fast_model is not None else None,
+)
+
+# 위치/날씨 컨텍스트: 메모리 값을 바로 쓰고 갱신은 백그라운드에서 (HTTP 연결은 공용 세션으로 재사용)
+http_session = make_session()
+context = ContextProvider(http_session, weather_ttl=WEATHER_TTL_SEC, refresh_sec=WEATHER_REFRESH_SEC,
+                          executor=io_executor)
+
+# 언어별 지시문과 고정 프롬프트 머리말 (질문마다 다시 만들지 않음)
+LANG_INSTRUCTIONS = {
+    "ko": "한국어로 간결하게 답변.",
+    "en": "Answer briefly in English.",
+    "ja": "日本語で簡潔に答えて。"
+}
+PROMPT_HEADERS = {
+    lang: f"""
         역할: 스마트홈 AI 비서.
         지침: 서론 없이 핵심만 1~2문장으로 답변할 것.
-        언어설정: {lang_instruction}
+        언어설정: {instruction}"""
+    for lang, instruction in LANG_INSTRUCTIONS.items()
+}
+
+# 같은 질문의 답변 캐시 (정규화한 질문 + 언어 기준, 날씨는 짧게/상식은 길게/실내 상태는 저장 안 함)
+answer_cache = AnswerCache()
+
+def build_prompt(text, lang="ko"):
+    """고정 머리말 + 이번 질문에 필요한 참고 정보만 붙여서 프롬프트 구성"""
+    context_info = ""
+    weather_kws = ["날씨", "weather", "天気", "tenki"]
+
+    # 날씨 키워드 감지 시 컨텍스트 주입 (백그라운드에서 받아 둔 값, 네트워크 대기 없음)
+    if any(w in text.lower() for w in weather_kws):
+        weather_data = context.weather()
+        print(f"[Gemini] Context Injected: {weather_data}")
+        context_info = f"참고 정보: {weather_data}"
+
+    # 실내 센서 값 (메모리에서 바로 읽음)
+    indoor = sensor_store.snapshot(max_age=SENSOR_STALE_SEC)
+    if "TEMP" in indoor and "HUMI" in indoor:
+        context_info += f"\n        실내 센서: 온도 {indoor['TEMP']:.1f}°C, 습도 {indoor['HUMI']:.0f}%"
+
+    header = PROMPT_HEADERS.get(lang, PROMPT_HEADERS["ko"])
+    return f"""{header}
         {context_info}
         사용자 질문: {text}
         """
-        
-        response = gemini_model.generate_content(prompt)
-        return response.text.strip()
-    except Exception as e:
-        print(f"[Gemini] Error: {e}")
-        return "죄송합니다. 처리 중 오류가 발생했습니다."
 
-def speak_answer(text, lang="ko"):
-    """Google TTS를 이용한 음성 출력"""
+def ask_gemini(text, lang="ko", on_sentence=None):
+    """Gemini API 호출 및 응답 생성 (캐시 우선, 스트리밍 생성)
+
+    on_sentence(문장)은 문장이 완성될 때마다 호출되므로 첫 문장부터 바로 TTS를 시작할 수 있다.
+    """
+    cached = answer_cache.get(text, lang)
+    if cached is not None:
+        print(f"[Gemini] 캐시 응답 사용: {text}")
+        if on_sentence:
+            for sentence in split_sentences(cached):
+                on_sentence(sentence)
+        return cached
+
+    spoken = []
+    def emit(sentences):
+        for sentence in sentences:
+            spoken.append(sentence)
+            if on_sentence:
+                on_sentence(sentence)
+
     try:
-        enc_text = urllib.parse.quote(text)
-        url = f"https://translate.google.com/translate_tts?ie=UTF-8&q={enc_text}&tl={lang}&client=tw-ob"
-        res = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-        
-        filename = "temp_voice.mp3"
-        with open(filename, 'wb') as f:
-            f.write(res.content)
-            
-        playsound(filename)
-        if os.path.exists(filename):
-            os.remove(filename)
+        print(f"[Gemini] Query: {text} (Lang: {lang})")
+        prompt = build_prompt(text, lang)
+
+        started = time.monotonic()
+        splitter = SentenceSplitter()
+        for chunk in gemini_model.get().generate_content(prompt, stream=True):
+            try:
+                part = chunk.text
+            except ValueError:
+                continue   # 텍스트가 없는 조각 (종료 사유만 담긴 마지막 조각 등)
+            sentences = splitter.feed(part)
+            if sentences and not spoken:
+                print(f"[Gemini] 첫 문장 {time.monotonic() - started:.2f}초")
+            emit(sentences)
+        emit(splitter.flush())
     except Exception as e:
-        print(f"[TTS] Error: {e}")
+        print(f"[Gemini] Error: {e}")
+        if not spoken:
+            emit([MSG_ERROR])
+            return MSG_ERROR
+        return " ".join(spoken)   # 중간에 끊긴 답변은 캐시하지 않음
+
+    answer = " ".join(spoken)
+    intent = answer_cache.put(text, lang, answer)
+    if intent:
+        print(f"[Gemini] 답변 캐시 저장 ({intent})")
+    return answer
+
+# TTS 캐시: 고정 문구는 main()에서 백그라운드로 미리 합성
+tts_cache = TTSCache(TTS_CACHE_DIR, fetch_fn=lambda text, lang: fetch_google_tts(text, lang, session=http_session))
+
+# 음성 출력 워커: 재생은 전용 스레드에서 순서대로 처리 (호출 측은 기다리지 않음)
+audio_player = AudioPlayer(tts_cache.get_audio)
+
+def speak_answer(text, lang="ko", priority=PRIORITY_NORMAL, barge_in=False, trace=None):
+    """Google TTS 음성 출력 요청 (재생 큐에 넣고 바로 반환, 완료 대기는 반환값의 wait())"""
+    return audio_player.say(text, lang, priority=priority, barge_in=barge_in, trace=trace)
 
 ## java 서버로 TCP 명령 전송 함수
 def send_command_to_java(cmd):
-    """Java 서버로 TCP 명령 전송"""
-    global g_command_lock
-    g_command_lock = True
-    
-    # 락 해제 타이머
-    threading.Timer(1.5, lambda: globals().update(g_command_lock=False)).start()
-
-    for _ in range(3): # 최대 3회 재시도
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.settimeout(2)
-                s.connect((JAVA_SERVER_IP, CMD_PORT))
-                s.sendall((cmd + "\n").encode())
-            print(f"[TCP] Sent: {cmd}")
-            return True
-        except:
-            time.sleep(0.5)
-    print(f"[TCP] Failed to send: {cmd}")
-    return False
+    """Java 서버로 TCP 명령 전송 (지속 연결의 쓰기 큐 사용, 1.5초 내 같은 명령은 무시, 어느 스레드에서나 호출 가능)"""
+    sent = java_link.send(cmd)
+    if sent:
+        device_state.note(cmd)
+    return sent
 
 # ---------------------------------------------------------
 # [New Feature] 스마트 케어 루틴 (온도 제어)
 # ---------------------------------------------------------
-def run_smart_care_routine():
-    """문이 열릴 때 실내 온도를 확인하고 적절한 조치를 취함"""
-    global g_indoor_temp, g_last_smart_care_time
-    
-    # 🔥 [수정] 쿨타임을 10초로 늘려 무한 반복 방지
-    if time.time() - g_last_smart_care_time < 10.0:
+# 문이 열릴 때 평가하는 규칙 (위에서부터 맞는 규칙 모두 실행, 같은 명령은 한 번만 전송)
+CARE_RULES = [
+    Rule("cold", "TEMP", "<=", 18.0, "FAN_ON", MSG_CARE_COLD),
+    Rule("hot", "TEMP", ">=", 26.0, "FAN_ON", MSG_CARE_HOT),
+]
+
+# 센서 저장소 값이 없거나 오래됐을 때 Java에 직접 묻는 조회 (센서 -> (요청, 응답 종류))
+CARE_QUERIES = {
+    "TEMP": ("REQ_TEMP", "CURRENT_TEMP"),
+}
+
+async def read_care_sensor(key):
+    """센서 스트림으로 받아 둔 최신값 (네트워크 왕복 없음), 없으면 Java에 직접 조회 (최대 3초)"""
+    value = sensor_store.get(key, max_age=SENSOR_STALE_SEC)
+    if value is not None:
+        print(f"[SmartCare] 센서 저장소의 최신 {key} 사용")
+        return value
+    query = CARE_QUERIES.get(key)
+    if query is None:
+        return None
+    # 요청 ID로 내 응답만 받고, 도착 즉시 반환
+    print(f"[SmartCare] {key} 체크 시작... 자바에게 요청 전송")
+    started = time.monotonic()
+    reply = await java_link.arequest(*query, timeout=3.0)
+    if reply is None:
+        return None
+    try:
+        value = float(reply)
+    except ValueError:
+        print(f"[SmartCare] 잘못된 {key} 응답: {reply}")
+        return None
+    print(f"[SmartCare] {time.monotonic() - started:.2f}초 만에 {key} 수신 성공!")
+    return value
+
+async def run_smart_care_routine():
+    """문이 열릴 때 규칙에 필요한 센서값을 한 번씩 읽고 CARE_RULES를 한 번 평가"""
+    if not automation.once("smart_care", SMART_CARE_COOLDOWN_SEC):
         print("[SmartCare] 최근 실행되어 건너뜁니다.")
         return
 
-    g_last_smart_care_time = time.time()
-    
-    print("[SmartCare] 온도 체크 시작... 자바에게 요청 전송")
-    
-    # 1. 자바에게 온도 물어보기
-    g_indoor_temp = None
-    if not send_command_to_java("REQ_TEMP"):
-        print("[SmartCare] 자바 서버 연결 실패 (명령 전송 불가)")
-        return
-    
-    # 2. 답변 올 때까지 대기 (0.2초 * 15회 = 3초 대기)
-    for i in range(15):
-        time.sleep(0.2)
-        if g_indoor_temp is not None:
-            print(f"[SmartCare] {i*0.2:.1f}초 만에 온도 수신 성공!")
-            break
-    
-    # 3. 온도에 따른 판단 및 제어
-    if g_indoor_temp is not None:
-        print(f"[SmartCare] 측정된 실내 온도: {g_indoor_temp}°C")
-        
-        if g_indoor_temp <= 18.0:
-            msg = f"실내 온도가 {g_indoor_temp}도입니다. 춥네요. 난방기를 켜드릴게요."
-            speak_answer(msg, "ko")
-            send_command_to_java("FAN_ON")
-            
-        elif g_indoor_temp >= 26.0:
-            msg = f"실내 온도가 {g_indoor_temp}도입니다. 덥네요. 에어컨을 켜드릴게요."
-            speak_answer(msg, "ko")
-            send_command_to_java("FAN_ON")
-        else:
-            print("[SmartCare] 온도가 적당함")
-            
-    else:
+    readings = {}
+    for key in dict.fromkeys(rule.sensor for rule in CARE_RULES):
+        readings[key] = await read_care_sensor(key)
+
+    indoor_temp = readings.get("TEMP")
+    if indoor_temp is None:
         # 끝까지 온도가 안 들어왔을 때
-        print("[SmartCare] ❌ 온도 수신 실패 (타임아웃)")
+        print("[SmartCare] ❌ 온도 수신 실패 (연결 끊김 또는 타임아웃)")
         print("   👉 팁: 자바 프로그램을 껐다가 다시 켰는지 확인해주세요.")
+        return
+    print(f"[SmartCare] 측정된 실내 온도: {indoor_temp}°C")
+
+    matched = evaluate(CARE_RULES, readings)
+    if not matched:
+        print("[SmartCare] 온도가 적당함")
+        return
+    for command in dict.fromkeys(rule.command for rule in matched):
+        send_command_to_java(command)
+    # 온도 문장과 고정 안내 문구를 나눠 말해서 고정 문구는 캐시에서 바로 재생
+    speak_answer(f"실내 온도가 {indoor_temp}도입니다.", "ko")
+    for rule in matched:
+        print(f"[SmartCare] 규칙 '{rule.name}' 적용 ({rule.sensor} {rule.op} {rule.threshold} -> {rule.command})")
+        speak_answer(rule.message, "ko")
+
+def unlock_door(source):
+    """문 열기 (얼굴/음성): UNLOCK은 병합 시간 안에 한 번만 보내고 문 열림 이벤트 발행 (어느 스레드에서나 호출 가능)"""
+    if automation.once("UNLOCK", UNLOCK_COALESCE_SEC):
+        send_command_to_java("UNLOCK")
+    else:
+        print(f"[Auto] UNLOCK 중복 전송 생략 ({source})")
+    bus.publish("door.unlocked", source)
 
 # ---------------------------------------------------------
 # [Logic] 얼굴 인식 및 등록
 # ---------------------------------------------------------
-def start_face_registration():
-    global g_is_registering
-    g_is_registering = True 
-    print("[Face] 등록 모드 시작")
+# 등록된 얼굴 인코딩 (런타임 시작 때 한 번 로드, 파일 변경 시에만 다시 로드)
+face_gallery = FaceGallery(FACE_GALLERY_PATH, legacy_path=LEGACY_FACE_PATH, autoload=False)
+
+# 카메라 공용 캡처 서비스 (등록/인식이 같은 장치와 프레임 버퍼를 공유)
+camera = CameraService(0, "DSHOW", idle_sec=CAMERA_IDLE_SEC)
+
+# cv2를 쓰는 얼굴 경로 함수들은 cv2를 함수 안에서 import (모듈 import 때는 OpenCV를 읽지 않음, 보통 load_face_models가 미리 읽어 둠)
+def capture_enrollment(seq, frame):
+    """(face_executor) ENROLL_BURST_FRAMES장을 연속으로 받아 품질 상위 프레임을 한 번에 인코딩 -> (프레임 번호, 인코딩 또는 None)"""
+    import cv2
+    from face_enroll import EnrollmentSession
+    session = EnrollmentSession(face_models.get(), top_k=ENROLL_TOP_K)
+    while session.frames < ENROLL_BURST_FRAMES:
+        seq, got = camera.latest(seq, out=frame)
+        if got is None: break
+        score = session.add(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        label = "no face" if score is None else f"quality {score:.2f}"
+        cv2.putText(frame, f"Capturing {session.frames}/{ENROLL_BURST_FRAMES} ({label})", (50, 50),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+        cv2.imshow('Face Registration', frame)
+        cv2.waitKey(1)
+    if len(session) < ENROLL_MIN_FRAMES:
+        print(f"[Face] 품질 좋은 프레임 부족 ({len(session)}/{ENROLL_MIN_FRAMES})")
+        return seq, None
+    return seq, session.finish()
+
+def start_face_registration(name="owner"):
+    """얼굴 등록 창 (face_executor에서 실행되는 블로킹 루프)"""
+    import cv2
+    print(f"[Face] 등록 모드 시작 ({name})")
     speak_answer("얼굴 등록을 시작합니다.", "ko")
-    
-    cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-    if not cap.isOpened():
+
+    if not camera.acquire():
         speak_answer("카메라를 찾을 수 없습니다.", "ko")
-        g_is_registering = False
         return
 
+    # 화면 표시용 버퍼 (글자를 그려야 하므로 링 버퍼 뷰 대신 이 버퍼에 복사)
+    frame = np.empty(camera.frame_shape(), dtype=np.uint8)
+    seq = 0
     while True:
-        ret, frame = cap.read()
-        if not ret: break
-        
-        cv2.putText(frame, "Press 's' to Save, 'q' to Quit", (50, 50), 
+        seq, got = camera.latest(seq, out=frame)
+        if got is None: break
+
+        cv2.putText(frame, "Press 's' to Capture, 'q' to Quit", (50, 50),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
         cv2.imshow('Face Registration', frame)
-        
+
         key = cv2.waitKey(1) & 0xFF
-        if key == ord('s'): 
+        if key == ord('s'):
             try:
-                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                boxes = face_recognition.face_locations(rgb)
-                if boxes:
-                    enc = face_recognition.face_encodings(rgb, boxes)[0]
-                    np.save("owner_face.npy", enc)
+                seq, encodings = capture_enrollment(seq, frame)
+                if encodings is not None:
+                    face_gallery.enroll(name, encodings, replace=True)
+                    face_gallery.invalidate()
                     print("[Face] 데이터 저장 완료")
                     speak_answer("얼굴이 등록되었습니다.", "ko")
                     break
-                else: 
+                else:
                     speak_answer("얼굴이 감지되지 않았습니다.", "ko")
             except Exception as e:
                 print(f"[Face] 등록 에러: {e}")
         elif key == ord('q'):
             speak_answer("취소되었습니다.", "ko")
             break
-            
-    cap.release()
+
+    camera.release()
     cv2.destroyAllWindows()
-    g_is_registering = False
 
-# 얼굴 인식 스레드 함수
-def run_face_recognition():
-    global g_is_recognizing
-    print("[Face] 인식 스레드 대기 중...")
-    
-    video_capture = None
-    last_unlock_ts = 0
-    
-    while True:
-        now = time.time()
-        cooldown_active = (now - last_unlock_ts < 10)
-        
-        # 인식 비활성화 상태거나 쿨타임 중이면 대기
-        if not g_is_recognizing or g_is_registering or cooldown_active:
-            if video_capture:
-                video_capture.release()
-                video_capture = None
-            time.sleep(1)
-            continue
-            
-        # 카메라 초기화
-        if video_capture is None:
-            video_capture = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-            if not video_capture.isOpened():
-                print("[Face] 카메라 오픈 실패")
-                g_is_recognizing = False
-                continue
-            print("[Face] 인식 시작")
-            
-        # 등록된 얼굴 데이터 로드
+async def on_face_register(name):
+    """REGISTER_FACE 처리: 진행 중인 인식을 멈추고 등록 창을 face_executor에서 실행"""
+    if face_state['registering']:
+        print("[Face] 이미 등록 중입니다.")
+        return
+    face_state['registering'] = True
+    face_state['recognizing'] = False
+    try:
+        await asyncio.get_running_loop().run_in_executor(face_executor, start_face_registration, name)
+    finally:
+        face_state['registering'] = False
+
+def recognize_frame(tracker, frame_seq, trace=None):
+    """(face_executor) 최신 프레임 하나 처리 -> (프레임 번호, (이름, 거리) 또는 None)"""
+    with tracer.profile():
+        return _recognize_frame(tracker, frame_seq, trace or tracer.start("face"))
+
+def _recognize_frame(tracker, frame_seq, trace):
+    import cv2
+    frame_seq, frame = camera.latest(frame_seq)
+    if frame is None:
+        return frame_seq, None
+    trace.record("first_frame", trace.elapsed(), once=True)
+    started = time.perf_counter()
+
+    # 등록된 얼굴 데이터 확인 (파일이 바뀌었을 때만 다시 로드)
+    face_gallery.maybe_reload()
+
+    # 성능 최적화를 위한 리사이징
+    small_frame = cv2.resize(frame, (0, 0), fx=0.4, fy=0.4)
+
+    # 움직임 게이트 + 주기적 검출/추적: 얼굴이 안정적으로 잡혔을 때만 인코딩
+    face_box = tracker.update(small_frame)
+    started = _record(trace, "detect", started)
+    if face_box is None:
+        return frame_seq, None
+    rgb_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
+    encodings = face_models.get().face_encodings(rgb_frame, [face_box])
+    started = _record(trace, "encode", started)
+    if not encodings:
+        return frame_seq, None
+    result = face_gallery.match(encodings[0])
+    _record(trace, "match", started)
+    return frame_seq, result
+
+def _record(trace, stage, started):
+    now = time.perf_counter()
+    trace.record(stage, now - started)
+    return now
+
+def stop_face_recognition():
+    face_state['recognizing'] = False
+    face_state['timer'] = None
+
+async def run_face_recognition(_=None):
+    """REQ_FACE_UNLOCK 처리: FACE_REQUEST_SEC 동안 얼굴 인식 (프레임 처리는 face_executor에서)"""
+    if automation.since("unlock") < FACE_COOLDOWN_SEC:
+        print("[Face] 최근 문이 열려 건너뜁니다.")
+        return
+    if face_state['registering']:
+        print("[Face] 등록 중이라 인식하지 않습니다.")
+        return
+    speak_answer(MSG_LOOK_AT_CAMERA, "ko", priority=PRIORITY_COMMAND, barge_in=True)
+    trace = tracer.start("face")
+    # 어느 경로로 끝나든 trace는 끝난 이유(단계 이름)로 한 번 마감 (인증 없이 인식 시간이 끝나면 시간 초과)
+    status = "timeout"
+    try:
+        # dlib 모델이 아직 로딩 중이면 요청을 버리지 않고 준비될 때까지 기다림 (인식 시간은 준비된 뒤부터 셈)
+        if not face_models.ready:
+            print("[Face] 얼굴 모델 로딩 대기 중...")
+            try:
+                await face_models.wait()
+            except RuntimeError as e:
+                print(f"[Face] {e}")
+                speak_answer(MSG_ERROR, "ko", priority=PRIORITY_ALERT)
+                status = "model_fail"
+                return
+            trace.mark("model_wait", restart=True)
+
+        # 인식 유지 시간: 요청이 다시 오면 타이머만 새로 걸고 진행 중인 인식을 그대로 이어감
+        loop = asyncio.get_running_loop()
+        if face_state['timer'] is not None:
+            face_state['timer'].cancel()
+        face_state['timer'] = loop.call_later(FACE_REQUEST_SEC, stop_face_recognition)
+        if face_state['recognizing']:
+            status = "dup"
+            return
+        face_state['recognizing'] = True
+
+        # 카메라 사용 시작 (이미 열려 있으면 바로 최신 프레임 사용)
+        if not await loop.run_in_executor(face_executor, camera.acquire):
+            print("[Face] 카메라 오픈 실패")
+            face_state['recognizing'] = False
+            status = "camera_fail"
+            return
+        trace.mark("camera_open")
         try:
-            owner_encoding = np.load("owner_face.npy")
-        except:
-            speak_answer("등록된 얼굴 데이터가 없습니다.", "ko")
-            g_is_recognizing = False
-            continue
+            await loop.run_in_executor(face_executor, face_gallery.maybe_reload)
+            if len(face_gallery) == 0:
+                speak_answer(MSG_NO_FACE_DATA, "ko", priority=PRIORITY_ALERT)
+                status = "no_face_data"
+                return
 
-        ret, frame = video_capture.read()
-        if not ret: continue
-
-        # 성능 최적화를 위한 리사이징
-        small_frame = cv2.resize(frame, (0, 0), fx=0.4, fy=0.4)
-        rgb_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
-        
-        face_locs = face_recognition.face_locations(rgb_frame)
-        if face_locs:
-            encodings = face_recognition.face_encodings(rgb_frame, face_locs)
-            for enc in encodings:
-                match = face_recognition.compare_faces([owner_encoding], enc, tolerance=0.45)
-                if True in match:
-                    print("[Face] 인증 성공 -> 잠금 해제")
-                    
-                    # 1. 환영 인사
-                    speak_answer("주인님, 어서 오세요. 문을 엽니다.", "ko")
-                    
-                    # 2. 스마트 케어 실행 (쿨타임 적용됨)
-                    run_smart_care_routine()
-                    
-                    # 3. 문 열기 명령
-                    send_command_to_java("UNLOCK")
-                    
-                    last_unlock_ts = time.time()
-                    g_is_recognizing = False
-                    break
-                    
-    if video_capture: video_capture.release()
+            print("[Face] 인식 시작")
+            from face_tracker import FaceTracker
+            tracker = FaceTracker(locate=face_models.get().face_locations)
+            frame_seq = 0
+            frame_interval = 1.0 / FACE_FPS
+            next_frame_ts = 0.0
+            while face_state['recognizing']:
+                # 프레임 속도 제한
+                wait = next_frame_ts - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                next_frame_ts = loop.time() + frame_interval
+
+                frame_seq, result = await loop.run_in_executor(face_executor, recognize_frame, tracker, frame_seq, trace)
+                if result is None:
+                    continue
+                name, distance = result
+                if distance <= FACE_TOLERANCE:
+                    print(f"[Face] 인증 성공 ({name}, 거리 {distance:.3f}) -> 잠금 해제")
 
-threading.Thread(target=run_face_recognition, daemon=True).start()
+                    # 1. 문 열기 명령 (음성 재생을 기다리지 않고 바로 전송, 스마트 케어는 문 열림 이벤트에서 한 번)
+                    unlock_door("face")
+                    trace.finish("unlock")
+
+                    # 2. 환영 인사
+                    speak_answer(MSG_WELCOME, "ko", priority=PRIORITY_COMMAND)
+                    break
+        finally:
+            # 장치는 카메라 서비스가 유휴 시간 동안 열어 둠
+            camera.release()
+            face_state['recognizing'] = False
+            if face_state['timer'] is not None:
+                face_state['timer'].cancel()
+                face_state['timer'] = None
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        trace.finish(status)
 
 # ---------------------------------------------------------
 # [Network] 서버 리스너
 # ---------------------------------------------------------
-def gui_command_listener():
-    """Java GUI 명령 수신"""
-    global g_is_recognizing, g_indoor_temp
-    while True:
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.connect((JAVA_SERVER_IP, CMD_PORT))
-                while True:
-                    data = s.recv(1024).decode()
-                    if not data: break
-                    
-                    cmds = data.split('\n')
-                    for cmd in cmds:
-                        cmd = cmd.strip()
-                        if not cmd: continue
-                        
-                        print(f"[GUI Recv] {cmd}")
-
-                        # 자바에서 보내준 온도 데이터 수신 (CURRENT_TEMP:24.5)
-                        if cmd.startswith("CURRENT_TEMP:"):
-                            try:
-                                temp_str = cmd.split(":")[1]
-                                g_indoor_temp = float(temp_str)
-                            except: pass
-
-                        elif cmd == "REQ_FACE_UNLOCK":
-                            speak_answer("카메라를 봐주세요.", "ko")
-                            g_is_recognizing = True
-                            threading.Timer(10, lambda: globals().update(g_is_recognizing=False)).start()
-                        elif cmd == "REGISTER_FACE":
-                            threading.Thread(target=start_face_registration).start()
-        except:
-            time.sleep(3)
-
-threading.Thread(target=gui_command_listener, daemon=True).start()
+def on_sensor_line(msg):
+    # 센서 스트림 (1초마다 들어오므로 로그 없이 저장소에만 반영)
+    values = sensor_store.ingest_line(msg.raw)
+    if values:
+        telemetry.append(values)
+
+def on_register_face(msg):
+    # REGISTER_FACE [이름] : 이름이 없으면 주인(owner)으로 등록
+    bus.publish("face.register", msg.arg or "owner")
+
+# 명령 포트 메시지 종류 -> 처리 함수
+# (CURRENT_TEMP 같은 조회 응답은 java_link에서 요청별 Future로 바로 전달되므로 여기 오지 않음)
+GUI_HANDLERS = {
+    "SENSOR": on_sensor_line,
+    "REQ_FACE_UNLOCK": lambda msg: bus.publish("face.request"),
+    "REGISTER_FACE": on_register_face,
+    # GUI에서 직접 누른 기기 명령도 상태에 반영 (로컬 답변용)
+    **{kind: (lambda msg: device_state.note(msg.kind)) for kind in DEVICE_EVENTS},
+}
+
+def handle_gui_command(msg):
+    """Java GUI 명령 수신 (명령 포트 지속 연결에서 파싱된 Message가 이벤트 버스를 거쳐 호출)"""
+    if msg.kind != "SENSOR":
+        print(f"[GUI Recv] {msg.raw}")
+    handler = GUI_HANDLERS.get(msg.kind)
+    if handler is not None:
+        handler(msg)
+
+# 명령 포트(39186)와의 단일 지속 연결: 명령 송신과 GUI 명령 수신을 함께 처리 (main()에서 시작)
+java_link = JavaLink(JAVA_SERVER_IP, CMD_PORT, on_line=lambda msg: bus.publish("gui.line", msg),
+                     subscribe=("SENSOR",))   # 센서 원본 줄은 구독한 이 연결에만 중계됨
+
+# 도어락 이벤트 종류 -> 이벤트 버스 토픽
+DOOR_EVENTS = {
+    "UNLOCKED": "door.unlocked",
+}
 
 # 연결 유지 및 키패드 문 열림 감지 리스너
-def door_event_listener():
+async def door_event_listener():
     """도어락 상태 모니터링 (키패드 오픈 감지)"""
-    global g_last_smart_care_time
-    while True: 
+    while True:
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.connect((JAVA_SERVER_IP, DOOR_EVENT_PORT))
-                while True:
-                    data = s.recv(1024).decode()
-                    if not data: break
-                    
-                    # 문 열림 신호가 왔을 때
-                    if "UNLOCKED" in data:
-                        # 🔥 [수정] 쿨타임 10초 적용 (최근 얼굴인식/음성으로 연 게 아닐 때만 실행)
-                        if time.time() - g_last_smart_care_time > 10.0:
-                            print("[Door] Keypad/Manual Unlock Detected")
-                            speak_answer("문이 열렸습니다.", "ko")
-                            
-                            # 키패드로 열었을 때도 스마트 케어(온도 체크) 실행
-                            run_smart_care_routine()
-        except:
-            time.sleep(3)
-
-threading.Thread(target=door_event_listener, daemon=True).start()
+            reader, writer = await asyncio.open_connection(JAVA_SERVER_IP, DOOR_EVENT_PORT)
+        except OSError:
+            await asyncio.sleep(DOOR_RECONNECT_SEC)
+            continue
+        try:
+            # 줄 단위로 정확히 한 번씩 처리 (읽기 경계에서 잘린 이벤트도 이어 붙임)
+            async for line in read_lines(reader):
+                kind = parse_message(line).kind
+                device_state.note(kind)
+                topic = DOOR_EVENTS.get(kind)
+                if topic is not None:
+                    bus.publish(topic)
+        except OSError:
+            pass
+        finally:
+            writer.close()
+        await asyncio.sleep(DOOR_RECONNECT_SEC)
+
+async def on_door_unlocked(source=None):
+    """문 열림 (source: "face"/"voice", 도어락 포트 이벤트는 None): UNLOCK_COALESCE_SEC 안의 신호는 한 번만 처리"""
+    event = automation.coalesce("unlock", source or "door", UNLOCK_COALESCE_SEC)
+    if event is None:
+        return
+    # 얼굴/음성으로 연 뒤 Java가 다시 알려 주는 UNLOCKED는 위에서 병합되므로, 도어 이벤트로 창이 열렸으면 키패드/수동
+    if event.source == "door":
+        print("[Door] Keypad/Manual Unlock Detected")
+        speak_answer(MSG_DOOR_OPENED, "ko", priority=PRIORITY_COMMAND)
+
+    # 어떤 방법으로 열었든 스마트 케어(온도 체크)는 병합된 이벤트마다 한 번
+    await run_smart_care_routine()
 
 # ---------------------------------------------------------
 # [Voice] 음성 인식 및 처리
 # ---------------------------------------------------------
-print("[System] Whisper 모델 로딩 중...")
-whisper_model = WhisperModel("small", device="cpu", compute_type="int8")
-print("[System] 준비 완료")
+recording_state = {'active': False, 'recorder': None, 'transcriber': None, 'opening': None}
 
-recording_state = {'active': False, 'stream': None, 'chunks': []}
+def match_command(text):
+    """텍스트에서 COMMANDS 키워드를 찾아 명령 dict 반환 (없으면 None, 조기 감지도 이 함수를 씀)"""
+    # 기기 상태 질문("불 켜져 있어?", "is the fan on?")은 명령이 아니라 로컬 답변으로
+    if is_state_question(text):
+        return None
+    cmd, score = intent_engine.match(text)
+    if cmd is None or score < INTENT_MIN_SCORE:
+        return None
+    if score < 1.0:
+        print(f"[Intent] 근사 매칭: '{text}' -> {cmd['cmd']} (score {score:.2f})")
+    return cmd
 
-# 녹음 스레드 함수
-def record_audio_thread():
-    """백그라운드 녹음 스레드"""
-    global recording_state
-    while recording_state['active']:
-        try:
-            if recording_state['stream']:
-                chunk, _ = recording_state['stream'].read(SAMPLE_RATE // 10)
-                if chunk is not None:
-                    recording_state['chunks'].append(chunk)
-        except: break
+def execute_command(cmd, trace=None):
+    """기기 명령 실행: 제어 명령을 먼저 보내고 안내 음성 출력 (전사 스레드에서도 호출됨)"""
+    print(f"[Intent] Command Detected: {cmd['cmd']}")
+    # 음성으로 '문 열어' 했을 때도 문 열림 이벤트로 스마트 케어 실행
+    if cmd["cmd"] == "UNLOCK":
+        unlock_door("voice")
+    else:
+        send_command_to_java(cmd["cmd"])
+    if trace is not None:
+        trace.mark("tcp_send")
+    speak_answer(cmd["msg"], cmd["lang"], priority=PRIORITY_COMMAND, trace=trace)
 
 # 녹음 시작
-def start_recording():
+async def start_recording(_=None):
     if recording_state['active']: return
-    
+
     print("[Voice] 녹음 시작")
+    # 사용자가 말하기 시작하면 재생 중인 안내는 끊음 (마이크에 TTS가 섞이지 않도록)
+    audio_player.cancel()
     recording_state['active'] = True
-    recording_state['chunks'] = []
-    
+
+    # Whisper가 아직 로딩 중이어도 녹음은 바로 시작 (디코딩 작업은 모델이 준비될 때까지 전사기 큐에서 대기)
+    if not whisper_model.ready:
+        print("[Voice] Whisper 로딩 중 - 녹음 후 준비되면 인식합니다.")
+
+    # 마이크 콜백이 미리 할당된 버퍼에 바로 쓰고, 전사기는 같은 버퍼를 복사 없이 읽으며 발화 구간별로 미리 디코딩
+    buffer = AudioBuffer(SAMPLE_RATE, max_sec=MAX_RECORD_SEC)
+    trace = tracer.start("voice")
+
+    def on_early_command(cmd):
+        # 조기 감지: 감지 시점부터 첫 소리까지를 응답 시간으로 봄
+        trace.mark("early_intent", restart=True)
+        execute_command(cmd, trace)
+
+    transcriber = StreamingTranscriber(
+        whisper_model.get,
+        buffer,
+        initial_prompt=f"Commands: {ALL_KEYWORDS}",
+        beam_size=5,
+        match_fn=match_command,      # 녹음 중 greedy 부분 디코딩으로 명령 조기 감지
+        on_command=on_early_command,
+        policy=stt_policy,           # 구간 길이/SNR/집 언어로 beam, 언어, 프롬프트, 모델 선택
+    )
+    transcriber.trace = trace
+    recorder = AudioRecorder(buffer, on_audio=transcriber.on_audio)
+
+    # PortAudio 스트림 열기는 장치에 따라 수백 ms까지 걸리므로 이벤트 루프 밖에서 (카메라 acquire와 같은 방식)
+    # 여는 중에 녹음 종료가 오면 stop_and_process가 opening이 끝나기를 기다렸다가 닫음
+    opening = asyncio.get_running_loop().run_in_executor(io_executor, recorder.start)
+    recording_state['recorder'] = recorder
+    recording_state['transcriber'] = transcriber
+    recording_state['opening'] = opening
     try:
-        recording_state['stream'] = sd.InputStream(channels=1, samplerate=SAMPLE_RATE, dtype=np.float32)
-        recording_state['stream'].start()
-        threading.Thread(target=record_audio_thread, daemon=True).start()
+        await opening
     except Exception as e:
         print(f"[Voice] Mic Error: {e}")
-        recording_state['active'] = False
+        if recording_state['transcriber'] is transcriber:
+            recording_state.update(active=False, recorder=None, transcriber=None)
+            transcriber.finish()
+            trace.finish("mic_fail")
+    finally:
+        if recording_state['opening'] is opening:
+            recording_state['opening'] = None
 
 # 녹음 종료 및 처리
-def stop_and_process():
+async def stop_and_process(_=None):
     if not recording_state['active']: return
-    
+
     print("[Voice] 녹음 종료 및 분석")
     recording_state['active'] = False
-    time.sleep(0.2) # 버퍼 플러시 대기
-    
-    if recording_state['stream']:
-        recording_state['stream'].stop()
-        recording_state['stream'].close()
-        recording_state['stream'] = None
 
-    if not recording_state['chunks']: return
+    transcriber = recording_state['transcriber']
+    recording_state['transcriber'] = None
+    # 녹음 시간은 따로 남기고, 응답 시간은 녹음 종료 시점부터 셈
+    trace = transcriber.trace if transcriber is not None else tracer.start("voice")
+    trace.mark("recording", restart=True)
+
+    # 스트림 정지 후에는 콜백이 더 오지 않으므로 별도 플러시 대기 없음
+    recorder = recording_state['recorder']
+    recording_state['recorder'] = None
+    opening, recording_state['opening'] = recording_state['opening'], None
+    if opening is not None:
+        # 아직 스트림을 여는 중: 다 열린 뒤 닫아야 이후 콜백이 전사 마무리와 겹치지 않음 (열기 실패는 시작 쪽에서 출력)
+        await asyncio.wait([opening])
+    if recorder:
+        recorder.stop()
+    trace.mark("record_stop")
+
+    if transcriber is None:
+        trace.finish("no_session")
+        return
+    loop = asyncio.get_running_loop()
+    if len(transcriber.buffer) == 0:
+        try:
+            await loop.run_in_executor(stt_executor, transcriber.finish)
+        finally:
+            trace.finish("empty")
+        return
 
-    # 오디오 데이터 병합 및 정규화
-    audio_data = np.concatenate(recording_state['chunks'], axis=0)
-    max_val = np.max(np.abs(audio_data))
-    if max_val > 0: audio_data = audio_data / max_val * 0.9
-    
-    # Whisper 처리를 위해 임시 파일 저장
-    temp_wav = "temp_req.wav"
-    import soundfile as sf
-    sf.write(temp_wav, audio_data, SAMPLE_RATE)
-    
     try:
-        # STT 수행
-        segments, info = whisper_model.transcribe(
-            temp_wav, 
-            beam_size=5, 
-            vad_filter=True, 
-            initial_prompt=f"Commands: {ALL_KEYWORDS}"
-        )
-        text = " ".join([s.text for s in segments]).strip()
-        lang = info.language
-        
+        # STT 마무리: 녹음 중 이미 디코딩된 구간 + 남은 꼬리 구간 (임시 파일 없이 메모리에서 처리)
+        text, lang = await loop.run_in_executor(stt_executor, transcriber.finish)
+        # 언어를 고정하지 않고 감지한 결과만 반영 (고정 언어로 디코딩한 결과는 같은 언어만 되돌아옴)
+        if text:
+            stt_policy.observe(transcriber.detected_language)
+        lang = lang or "ko"
+        trace.mark("stt_finish")
+
         print(f"[STT] Result: '{text}' (Lang: {lang})")
-        
+
+        # 조기 감지 단계에서 이미 명령을 실행한 경우
+        if transcriber.command is not None:
+            return
+
         if text:
-            for cmd in COMMANDS:
-                if any(kw in text.lower() for kw in cmd["kws"]):
-                    print(f"[Intent] Command Detected: {cmd['cmd']}")
-                    speak_answer(cmd["msg"], cmd["lang"])
-                    
-                    # 음성으로 '문 열어' 했을 때도 스마트 케어 실행
-                    if cmd["cmd"] == "UNLOCK":
-                        run_smart_care_routine()
-                    
-                    send_command_to_java(cmd["cmd"])
-                    return
+            cmd = match_command(text)
+            trace.mark("intent")
+            if cmd:
+                execute_command(cmd, trace)
+                return
+
+            # 로컬 답변 (시간/날짜/실내 온습도/기기 상태는 네트워크 없이 바로)
+            local = local_answers.answer(text, lang)
+            if local is not None:
+                intent, answer = local
+                print(f"[Local] {intent}: {answer}")
+                trace.mark("local_answer")
+                speak_answer(answer, lang if lang in LOCAL_LANGS else "ko", priority=PRIORITY_CHAT, trace=trace)
+                return
 
             # LLM 질의 (Gemini)
-            answer = ask_gemini(text, lang)
+            # 스트리밍으로 받은 답변을 문장 단위로 바로 재생 큐에 넣음 (재생 중에 다음 문장 합성을 미리 받음)
+            def say_sentence(sentence):
+                speak_answer(sentence, lang, priority=PRIORITY_CHAT, trace=trace)
+            answer = await loop.run_in_executor(io_executor, ask_gemini, text, lang, say_sentence)
+            trace.mark("gemini")
             print(f"[Gemini] Answer: {answer}")
-            speak_answer(answer, lang)
         else:
             print("[Voice] 음성 미감지")
-            
+
     except Exception as e:
         print(f"[Voice] Analysis Error: {e}")
     finally:
-        if os.path.exists(temp_wav): os.remove(temp_wav)
+        # 이후 재생 단계(tts_fetch, first_audio, playback)는 끝난 trace에 늦게 붙음
+        trace.finish()
+
+# 음성 트리거 메시지 종류 -> 이벤트 버스 토픽
+VOICE_EVENTS = {
+    "START_RECORDING": "voice.start",
+    "STOP_RECORDING": "voice.stop",
+}
 
-def voice_trigger_server():
-    """GUI의 음성 버튼 이벤트 수신"""
+async def handle_voice_trigger(reader, writer):
+    """GUI의 음성 버튼 이벤트 수신 (연결 하나에 여러 줄이 와도 모두 처리)"""
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            s.bind(("127.0.0.1", VOICE_SERVER_PORT))
-            s.listen(5)
-            while True:
-                conn, _ = s.accept()
-                data = conn.recv(1024).decode().strip()
-                if data == "START_RECORDING":
-                    start_recording()
-                elif data == "STOP_RECORDING":
-                    stop_and_process()
-                conn.close()
-    except Exception as e:
+        async for line in read_lines(reader):
+            topic = VOICE_EVENTS.get(parse_message(line).kind)
+            if topic is not None:
+                bus.publish(topic)
+            else:
+                print(f"[VoiceServer] 알 수 없는 명령: {line}")
+    except OSError as e:
         print(f"[VoiceServer] Error: {e}")
-
-threading.Thread(target=voice_trigger_server, daemon=True).start()
+    finally:
+        writer.close()
 
 # ---------------------------------------------------------
-# Main Loop
+# [Runtime] 이벤트 연결 및 실행
 # ---------------------------------------------------------
-print("\n" + "="*40)
-print("   Smart Home AI Assistant v1.0")
-print("   Modules: Whisper, Gemini, FaceRec")
-print("="*40 + "\n")
-
-try:
-    while True: time.sleep(1)
-except KeyboardInterrupt:
-    print("\n[System] Shutting down...")
\ No newline at end of file
+bus.subscribe("gui.line", handle_gui_command)
+bus.subscribe("door.unlocked", on_door_unlocked)
+bus.subscribe("face.request", run_face_recognition)
+bus.subscribe("face.register", on_face_register)
+bus.subscribe("voice.start", start_recording)
+bus.subscribe("voice.stop", stop_and_process)
+
+async def refresh_context():
+    """위치/날씨를 시작 직후 한 번, 이후 WEATHER_REFRESH_SEC마다 백그라운드 갱신"""
+    while True:
+        context.refresh_async()
+        await asyncio.sleep(context.refresh_sec)
+
+async def flush_traces():
+    """TRACE_EXPORT_PATH가 있으면 TRACE_FLUSH_SEC마다 새 단계 기록을 파일로 내보냄"""
+    if not TRACE_EXPORT_PATH:
+        return
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(TRACE_FLUSH_SEC)
+        try:
+            await loop.run_in_executor(io_executor, tracer.export_jsonl, TRACE_EXPORT_PATH)
+        except OSError as e:
+            print(f"[Trace] 내보내기 실패: {e}")
+
+async def flush_telemetry():
+    """TELEMETRY_FLUSH_SEC마다 센서 기록 memmap을 디스크에 반영 (갑자기 꺼져도 잃는 기록을 이 간격으로 제한)"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(TELEMETRY_FLUSH_SEC)
+        try:
+            await loop.run_in_executor(io_executor, telemetry.flush)
+        except OSError as e:
+            print(f"[Telemetry] 저장 실패: {e}")
+
+async def report_startup():
+    """모든 모델 로딩이 끝나면 (실패 포함) 시작 단계별 시간 출력"""
+    for model in (whisper_model, face_models, gemini_model):
+        try:
+            await model.wait()
+        except RuntimeError:
+            pass
+    startup.mark("models ready")
+    startup.report()
+
+async def run_runtime():
+    """리스너/버스를 띄우고 종료 신호까지 대기, 끝나면 순서대로 정리"""
+    startup.mark("module init")
+    loop = asyncio.get_running_loop()
+    stop_event = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: Ctrl+C는 asyncio.run이 KeyboardInterrupt로 처리
+
+    bus.start()
+    java_link.start()
+    audio_player.start()
+    tts_cache.prewarm(FIXED_PHRASES)
+    door_task = loop.create_task(door_event_listener())
+    try:
+        voice_server = await asyncio.start_server(handle_voice_trigger, "127.0.0.1", VOICE_SERVER_PORT)
+    except OSError as e:
+        print(f"[VoiceServer] Error: {e}")
+        voice_server = None
+    startup.mark("listeners")
+
+    # 명령 경로가 준비된 뒤 무거운 모델을 백그라운드에서 로딩 (로딩 중 요청은 각 모델 준비까지 대기)
+    for model in (whisper_model, face_models, gemini_model):
+        model.start()
+    if whisper_fast_model is not None:
+        whisper_fast_model.start()
+    face_executor.submit(face_gallery.maybe_reload)
+    report_task = loop.create_task(report_startup())
+    context_task = loop.create_task(refresh_context())
+    trace_task = loop.create_task(flush_traces())
+    telemetry_task = loop.create_task(flush_telemetry())
+
+    print("\n" + "="*40)
+    print("   Smart Home AI Assistant v1.0")
+    print("   Modules: Whisper, Gemini, FaceRec")
+    print("="*40 + "\n")
+
+    try:
+        await stop_event.wait()
+    finally:
+        print("\n[System] Shutting down...")
+        if voice_server is not None:
+            voice_server.close()
+        background = (door_task, report_task, context_task, trace_task, telemetry_task)
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        await bus.stop()
+        await java_link.stop()
+        if recording_state['recorder'] is not None:
+            recording_state['recorder'].stop()
+        audio_player.cancel()
+        for executor in (stt_executor, face_executor, io_executor):
+            executor.shutdown(wait=False, cancel_futures=True)
+        for pool in inference_pools:
+            pool.close()
+        telemetry.close()
+        tracer.report()
+        if automation.counts:
+            print(f"[Auto] 이벤트 병합/중복 제거: {dict(automation.counts)}")
+        if stt_policy.counts:
+            print(f"[STT] 디코딩 프로필 사용 횟수: {dict(stt_policy.counts)}")
+        if TRACE_EXPORT_PATH:
+            tracer.export_jsonl(TRACE_EXPORT_PATH)
+        if PROFILE_SAMPLE_RATE > 0:
+            tracer.dump_profile(os.path.join(current_dir, "profile.pstats"))
+
+def main():
+    try:
+        asyncio.run(run_runtime())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,26 @@
+import os
+import sys
 import cv2
 import face_recognition
 import numpy as np
+from face_gallery import FaceGallery
+from face_enroll import EnrollmentSession
+
+BURST_FRAMES = 30   # 's'를 누르면 연속으로 평가할 프레임 수
+TOP_K = 5           # 그중 품질 상위 몇 장을 저장할지
+MIN_FRAMES = 3      # 품질 기준을 넘은 프레임이 이보다 적으면 다시 촬영
+
+# 등록할 이름 (기본: owner) -> python register_face.py [이름]
+name = sys.argv[1] if len(sys.argv) > 1 else "owner"
+base_dir = os.path.dirname(os.path.abspath(__file__))
+gallery = FaceGallery(os.path.join(base_dir, "face_gallery.npz"),
+                      legacy_path=os.path.join(base_dir, "owner_face.npy"))
 
 # 웹캠 켜기
 video_capture = cv2.VideoCapture(0)
 
-print("📸 [얼굴 등록 모드]")
-print("카메라를 바라보고 키보드의 's' 키를 누르면 저장됩니다.")
+print(f"📸 [얼굴 등록 모드] {name}")
+print("카메라를 바라보고 키보드의 's' 키를 누르면 2초 정도 연속 촬영 후 저장됩니다.")
 print("('q'를 누르면 취소)")
 
 while True:
@@ -17,23 +31,23 @@ while True:
 
     key = cv2.waitKey(1) & 0xFF
     
-    # 's' 누르면 저장
+    # 's' 누르면 연속 촬영 후 품질 좋은 프레임들로 저장
     if key == ord('s'):
-        rgb_frame = frame[:, :, ::-1] # 색상 변환
-        
-        # 얼굴 찾기
-        boxes = face_recognition.face_locations(rgb_frame)
-        
-        if len(boxes) == 0:
-            print("❌ 얼굴을 못 찾겠어요. 정면을 봐주세요!")
+        session = EnrollmentSession(face_recognition, top_k=TOP_K)
+        while session.frames < BURST_FRAMES:
+            ret, frame = video_capture.read()
+            if not ret: break
+            session.add(np.ascontiguousarray(frame[:, :, ::-1])) # 색상 변환
+            cv2.imshow('Register Face', frame)
+            cv2.waitKey(1)
+
+        encodings = session.finish() if len(session) >= MIN_FRAMES else None
+        if encodings is None:
+            print("❌ 얼굴을 못 찾겠어요. 정면을 보고 움직이지 말아 주세요!")
         else:
-            # 얼굴 특징 추출
-            encodings = face_recognition.face_encodings(rgb_frame, boxes)
-            owner_encoding = encodings[0]
-            
-            # 파일로 저장
-            np.save("owner_face.npy", owner_encoding)
-            print("✅ 얼굴 저장 완료! (owner_face.npy 생성됨)")
+            # 갤러리 파일에서 이 사람의 인코딩 교체 (실행 중인 main.py는 파일 변경을 감지해 다시 로드)
+            gallery.enroll(name, encodings, replace=True)
+            print(f"✅ 얼굴 저장 완료! (인코딩 {len(encodings)}개, face_gallery.npz 갱신됨)")
             break
 
     elif key == ord('q'):
@@ -41,4 +55,4 @@ while True:
         break
 
 video_capture.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+cv2.destroyAllWindows()
@@ -0,0 +1,92 @@
+## POP 보드 센서값 저장소
+## Java가 명령 포트로 중계해 주는 'SENSOR GAS=.. TEMP=.. HUMI=.. PM1=.. PM25=.. PM10=.. PIR=..' 줄을 받아
+## 항목별 최신값(수신 시각 포함)과 최근 기록 링 버퍼를 유지한다. 읽기는 네트워크 왕복 없이 O(1).
+import threading
+import time
+import numpy as np
+
+METRICS = ("GAS", "METHAN", "TEMP", "HUMI", "PM1", "PM25", "PM10", "PIR")
+
+
+def parse_sensor_line(line):
+    """'SENSOR KEY=VAL ...' -> {KEY: float}. SENSOR 줄이 아니면 None"""
+    parts = line.split()
+    if not parts or parts[0] != "SENSOR":
+        return None
+    values = {}
+    for part in parts[1:]:
+        key, sep, val = part.partition("=")
+        if not sep:
+            continue
+        try:
+            values[key.upper()] = float(val)
+        except ValueError:
+            pass
+    return values
+
+
+class SensorStore:
+    """스레드 안전한 센서 최신값 + 항목별 링 버퍼"""
+
+    def __init__(self, history=600, metrics=METRICS):
+        self.history_size = history
+        self._lock = threading.Lock()
+        self._latest = {}    # 항목 -> (값, monotonic 시각)
+        self._ring_val = {m: np.zeros(history, dtype=np.float32) for m in metrics}
+        self._ring_ts = {m: np.zeros(history, dtype=np.float64) for m in metrics}
+        self._ring_pos = {m: 0 for m in metrics}
+        self._ring_count = {m: 0 for m in metrics}
+
+    def update(self, values, ts=None):
+        """{항목: 값} 반영 (ts는 time.time() 기준, 기록용)"""
+        now = time.monotonic()
+        wall = time.time() if ts is None else ts
+        with self._lock:
+            for key, val in values.items():
+                self._latest[key] = (val, now)
+                if key not in self._ring_val:
+                    continue
+                pos = self._ring_pos[key]
+                self._ring_val[key][pos] = val
+                self._ring_ts[key][pos] = wall
+                self._ring_pos[key] = (pos + 1) % self.history_size
+                self._ring_count[key] = min(self._ring_count[key] + 1, self.history_size)
+
+    def ingest_line(self, line):
+        """SENSOR 줄이면 반영하고 파싱한 {항목: 값} 반환 (아니면 None)"""
+        values = parse_sensor_line(line)
+        if not values:
+            return None
+        self.update(values)
+        return values
+
+    def latest(self, metric):
+        """(값, 경과 초) 또는 (None, None)"""
+        entry = self._latest.get(metric)
+        if entry is None:
+            return None, None
+        return entry[0], time.monotonic() - entry[1]
+
+    def get(self, metric, max_age=None):
+        """최신값. max_age(초)보다 오래됐으면 None (호출 측이 직접 조회하도록)"""
+        val, age = self.latest(metric)
+        if val is None or (max_age is not None and age > max_age):
+            return None
+        return val
+
+    def snapshot(self, max_age=None):
+        """신선한 항목만 모은 {항목: 값}"""
+        now = time.monotonic()
+        with self._lock:
+            return {k: v for k, (v, t) in self._latest.items() if max_age is None or now - t <= max_age}
+
+    def history(self, metric, n=None):
+        """최근 기록 (시각 배열, 값 배열)을 오래된 순으로 복사해서 반환"""
+        with self._lock:
+            count = self._ring_count.get(metric, 0)
+            if n is not None:
+                count = min(count, n)
+            if count == 0:
+                return np.zeros(0), np.zeros(0, dtype=np.float32)
+            idx = (self._ring_pos[metric] - count + np.arange(count)) % self.history_size
+            return self._ring_ts[metric][idx], self._ring_val[metric][idx]
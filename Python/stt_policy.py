@@ -0,0 +1,86 @@
+## Whisper 디코딩 프로필 선택
+## 0.8초짜리 "불 꺼"와 10초짜리 질문을 같은 설정(beam 5, 언어 감지, 명령어 전체 프롬프트)으로 디코딩하지 않도록
+## 지금까지의 발화 길이, 말소리 에너지(잡음 바닥 대비 SNR), 최근 발화 언어로 프로필을 고른다.
+## 녹음이 끝나기 전의 구간은 발화 전체 길이를 아직 모르므로 short로 보지 않는다 (긴 질문의 앞부분일 수 있음).
+##  - short : 녹음이 끝난 짧은 명령 -> greedy, 언어 고정, 명령어 프롬프트 (작은 모델이 있으면 그 모델)
+##  - medium: 보통 길이 -> 작은 beam, 명령어 프롬프트
+##  - long  : 긴 질문 -> 전체 beam, 명령어 편향 없는 프롬프트, 언어는 자동 감지 (다른 언어로 물어도 알아챔)
+##  - noisy : SNR이 낮으면 길이와 상관없이 전체 beam + Whisper VAD
+## 같은 언어가 연속으로 pin_after번 나오면 집 언어로 보고 short/medium에서는 언어 감지를 건너뛴다.
+## observe()에는 언어를 고정하지 않고 디코딩한 결과(조기 감지 greedy, long/noisy)만 넣어야 한다.
+## 고정한 언어로 디코딩한 결과를 넣으면 같은 언어만 되돌아와 다른 언어가 나와도 고정이 풀리지 않는다.
+## 고른 프로필은 로그로 남기고 프로필별 사용 횟수를 세어, 실제 데이터로 정확도/지연을 조정할 수 있게 한다.
+import math
+import threading
+from collections import Counter, namedtuple
+
+Profile = namedtuple("Profile", "name model beam_size language initial_prompt vad_filter")
+
+
+class DecodingPolicy:
+    """(구간 길이, 에너지, 언어 이력) -> Profile"""
+
+    SHORT_SEC = 2.0          # 이보다 짧으면 short
+    LONG_SEC = 6.0           # 이보다 길면 long
+    NOISY_SNR_DB = 10.0      # 잡음 바닥 대비 이보다 낮으면 noisy
+
+    def __init__(self, command_prompt=None, question_prompt=None, fast_model=None,
+                 household_language=None, pin_after=3):
+        self.command_prompt = command_prompt      # 명령 키워드 프롬프트 (짧은 발화용)
+        self.question_prompt = question_prompt    # 긴 질문용 프롬프트 (None이면 프롬프트 없음)
+        self.fast_model = fast_model              # 짧은 발화용 작은 모델을 돌려주는 함수 (없으면 기본 모델)
+        self.pin_after = pin_after
+
+        self._lock = threading.Lock()
+        self._fixed = household_language is not None
+        self.household_language = household_language   # 확정된 집 언어 (None이면 아직 모름)
+        self._streak_lang = None
+        self._streak = 0
+        self.counts = Counter()
+
+    # -----------------------------------------------------
+    # 언어 이력
+    # -----------------------------------------------------
+    def observe(self, language):
+        """언어 감지 결과 하나를 반영 (연속 pin_after번 같으면 집 언어로 확정, 다른 언어가 나오면 해제)"""
+        if not language or self._fixed:
+            return
+        with self._lock:
+            if language == self._streak_lang:
+                self._streak += 1
+            else:
+                self._streak_lang, self._streak = language, 1
+                if self.household_language not in (None, language):
+                    print(f"[STT] 집 언어 해제 ({self.household_language} -> {language} 감지)")
+                    self.household_language = None
+            if self.household_language is None and self._streak >= self.pin_after:
+                self.household_language = language
+                print(f"[STT] 집 언어 확정: {language} (짧은 발화는 언어 감지 생략)")
+
+    # -----------------------------------------------------
+    # 프로필 선택
+    # -----------------------------------------------------
+    def choose(self, duration, rms, noise_floor, utterance_language=None, final=True):
+        """구간 하나의 디코딩 프로필
+
+        duration: 지금까지의 발화 길이(초), final: 녹음이 끝나 duration이 발화 전체 길이인지
+        utterance_language: 같은 발화의 앞 구간에서 감지한 언어
+        """
+        snr_db = 20.0 * math.log10(max(rms, 1e-9) / max(noise_floor, 1e-9))
+        pinned = utterance_language or self.household_language
+
+        if snr_db < self.NOISY_SNR_DB:
+            profile = Profile("noisy", None, 5, utterance_language, self.command_prompt, True)
+        elif duration < self.SHORT_SEC and final:
+            profile = Profile("short", self.fast_model, 1, pinned, self.command_prompt, False)
+        elif duration <= self.LONG_SEC:
+            profile = Profile("medium", None, 3, pinned, self.command_prompt, False)
+        else:
+            profile = Profile("long", None, 5, utterance_language, self.question_prompt, True)
+
+        with self._lock:
+            self.counts[profile.name] += 1
+        print(f"[STT] 디코딩 프로필 {profile.name}: {duration:.1f}s, SNR {snr_db:.0f}dB, "
+              f"beam {profile.beam_size}, 언어 {profile.language or '자동'}"
+              f"{', 작은 모델' if profile.model is not None else ''}")
+        return profile
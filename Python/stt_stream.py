@@ -0,0 +1,291 @@
+## Whisper 스트리밍 전사 모듈
+## 녹음기가 채우는 오디오 버퍼를 복사 없이 읽으며, 에너지 기반 VAD로 말이 끊기는 지점(끝점)을 찾아
+## 백그라운드 스레드에서 미리 디코딩한다. 녹음 종료 시에는 아직 디코딩되지 않은 꼬리 구간만 처리하면 된다.
+## 임시 wav 파일 없이 float32 배열을 faster-whisper에 바로 넘긴다.
+## 짧은 발화는 녹음 중에 greedy 디코딩으로 기기 명령 키워드를 먼저 찾아(조기 인텐트 감지),
+## 명령이면 즉시 콜백을 호출하고 beam search 전체 디코딩은 생략한다.
+## 조기 감지는 VAD 끝점(말 뒤 침묵)에서만, 처음부터 끝점까지 전체를 디코딩해 판단한다.
+## 한국어는 질문/부정 어미가 맨 뒤에 오므로("불 켜져 있어?", "불 켜지 마") 말하는 도중의 앞부분 "불 켜"로 실행하면 안 된다.
+import queue
+import threading
+import time
+from contextlib import nullcontext
+import numpy as np
+
+
+class StreamingTranscriber:
+    """녹음과 동시에 발화 구간 단위로 Whisper 디코딩을 진행하는 전사기"""
+
+    FRAME_MS = 30            # VAD 판단 프레임 길이
+    ENDPOINT_MS = 450        # 이만큼 조용하면 구간 끝으로 판단
+    MIN_SPEECH_MS = 240      # 이보다 짧은 소리는 잡음으로 간주
+    PAD_MS = 200             # 구간 앞뒤 여유
+    MAX_SEGMENT_SEC = 20     # 쉬지 않고 말해도 이 길이에서 강제로 자름 (Whisper 30초 창 이내)
+    MIN_RMS = 0.004          # 절대 최소 에너지 임계값
+
+    # 조기 인텐트 감지 (끝점까지 greedy 디코딩)
+    SPOT_MAX_SEC = 4.0       # 이보다 긴 발화는 명령이 아닌 질문으로 보고 감지 중단
+    SPOT_MIN_LOGPROB = -0.7  # 세그먼트 평균 로그 확률 하한
+    SPOT_MAX_NO_SPEECH = 0.4 # 무음 확률 상한 (프롬프트 환각 방지)
+
+    def __init__(self, model, buffer, initial_prompt=None, beam_size=5,
+                 match_fn=None, on_command=None, policy=None):
+        # model: WhisperModel 또는 모델을 돌려주는 함수 (지연 로딩 중이면 디코딩 스레드에서 준비될 때까지 기다림)
+        # buffer: 녹음기가 채우는 AudioBuffer (len(), view(), peak 제공)
+        self.model = model
+        self.buffer = buffer
+        self.sample_rate = sample_rate = buffer.sample_rate
+        self.initial_prompt = initial_prompt
+        self.beam_size = beam_size
+        # policy: stt_policy.DecodingPolicy (있으면 구간마다 beam/언어/프롬프트/모델을 고르고, 없으면 위 고정 설정)
+        self.policy = policy
+
+        # match_fn(text) -> 명령 dict 또는 None, on_command(cmd)는 감지 즉시 디코딩 스레드에서 호출됨
+        self.match_fn = match_fn
+        self.on_command = on_command
+        self.command = None
+        self.command_text = ""
+        self._spot_max = int(sample_rate * self.SPOT_MAX_SEC)
+        self._spot_pending = False
+        self._heard_speech = False
+
+        self._frame = int(sample_rate * self.FRAME_MS / 1000)
+        self._pad = int(sample_rate * self.PAD_MS / 1000)
+        self._endpoint_frames = self.ENDPOINT_MS // self.FRAME_MS
+        self._min_speech_frames = self.MIN_SPEECH_MS // self.FRAME_MS
+        self._max_segment = int(sample_rate * self.MAX_SEGMENT_SEC)
+
+        # VAD 상태 (on_audio 호출 스레드에서만 갱신)
+        self._vad_pos = 0            # VAD가 검사한 위치
+        self._committed = 0          # 디코딩 큐에 넘긴 위치
+        self._speech_start = None
+        self._speech_frames = 0
+        self._silence_frames = 0
+        self._noise_floor = self.MIN_RMS
+        self._speech_since_commit = False
+
+        # 단계 시간 기록용 tracing.Trace (있으면 오디오 준비/Whisper 시간을 남김)
+        self.trace = None
+
+        # 디코딩 결과
+        self.language = None             # 이 발화의 이후 구간에 쓸 언어 (첫 구간 결과)
+        self.detected_language = None    # 언어를 고정하지 않고 디코딩했을 때 Whisper가 감지한 언어 (집 언어 판단용)
+        self._finished = False           # finish() 호출 뒤면 발화 전체 길이가 확정됨
+        self._texts = []
+        self._jobs = queue.Queue()
+        self._worker = threading.Thread(target=self._decode_loop, daemon=True)
+        self._worker.start()
+
+    # -----------------------------------------------------
+    # 입력
+    # -----------------------------------------------------
+    def on_audio(self):
+        """녹음 콜백에서 호출: 버퍼에 새로 들어온 구간의 끝점을 검사 (끝점이면 조기 감지 후 구간 디코딩 예약)"""
+        self._run_vad()
+
+    def _run_vad(self):
+        total = len(self.buffer)
+        while self._vad_pos + self._frame <= total:
+            frame = self.buffer.view(self._vad_pos, self._vad_pos + self._frame)
+            rms = float(np.sqrt(np.mean(frame * frame)))
+            threshold = max(self.MIN_RMS, self._noise_floor * 3.0)
+
+            if rms >= threshold:
+                if self._speech_start is None:
+                    self._speech_start = self._vad_pos
+                self._speech_frames += 1
+                self._silence_frames = 0
+            else:
+                # 조용한 프레임으로 잡음 바닥을 천천히 추적
+                self._noise_floor = 0.95 * self._noise_floor + 0.05 * rms
+                if self._speech_start is not None:
+                    self._silence_frames += 1
+
+            self._vad_pos += self._frame
+
+            if self._speech_start is None:
+                continue
+            if self._speech_frames >= self._min_speech_frames:
+                self._speech_since_commit = True
+                self._heard_speech = True
+
+            seg_len = self._vad_pos - self._committed
+            if self._silence_frames >= self._endpoint_frames:
+                if self._speech_frames >= self._min_speech_frames:
+                    end = self._vad_pos - (self._silence_frames * self._frame) + self._pad
+                    # 조기 감지를 같은 구간의 beam search보다 먼저 큐에 넣음 (명령이면 구간 디코딩은 생략됨)
+                    self._maybe_spot(end)
+                    self._commit(end)
+                else:
+                    self._reset_speech()
+            elif seg_len >= self._max_segment:
+                self._commit(self._vad_pos)
+
+    def _reset_speech(self):
+        self._speech_start = None
+        self._speech_frames = 0
+        self._silence_frames = 0
+
+    def _commit(self, end):
+        """[committed, end) 구간을 디코딩 큐에 넘김"""
+        end = min(end, len(self.buffer))
+        start = max(self._committed, (self._speech_start or self._committed) - self._pad)
+        if end > start:
+            self._jobs.put(("segment", start, end))
+        self._committed = end
+        self._speech_since_commit = False
+        self._reset_speech()
+
+    # -----------------------------------------------------
+    # 디코딩
+    # -----------------------------------------------------
+    def _maybe_spot(self, end):
+        """VAD 끝점 end까지가 명령 후보 길이면 처음부터 end까지의 greedy 디코딩을 예약 (한 번에 하나만 대기)"""
+        if self.match_fn is None or self.command is not None or self._spot_pending:
+            return
+        if not self._heard_speech or end > self._spot_max:
+            return
+        self._spot_pending = True
+        self._jobs.put(("spot", 0, end))
+
+    def _decode_loop(self):
+        while True:
+            job = self._jobs.get()
+            try:
+                if job is None:
+                    return
+                kind, start, end = job
+                # 이미 명령으로 처리된 발화면 남은 디코딩은 생략
+                if self.command is not None:
+                    continue
+                if kind == "spot":
+                    self._spot(self.buffer.view(start, end))
+                    continue
+                text = self._decode(self.buffer.view(start, end))
+                if text:
+                    self._texts.append(text)
+                    print(f"[STT] 구간 디코딩 {start / self.sample_rate:.1f}~{end / self.sample_rate:.1f}s: '{text}'")
+            except Exception as e:
+                print(f"[STT] 구간 디코딩 에러: {e}")
+            finally:
+                if job is not None and job[0] == "spot":
+                    self._spot_pending = False
+                self._jobs.task_done()
+
+    def _model(self):
+        return self.model() if callable(self.model) else self.model
+
+    def _normalize(self, audio):
+        # 녹음기가 누적한 최대값으로 정규화 (구간 전체를 다시 훑지 않음, 복사는 이 곱셈 한 번)
+        peak = self.buffer.peak
+        if peak <= 0 or len(audio) == 0:
+            return None
+        return audio * (0.9 / peak)
+
+    def _record(self, stage, started):
+        if self.trace is not None:
+            self.trace.record(stage, time.perf_counter() - started)
+        return time.perf_counter()
+
+    def _profile(self):
+        return self.trace.tracer.profile() if self.trace is not None else nullcontext()
+
+    def _decode(self, audio):
+        started = time.perf_counter()
+        raw = audio
+        audio = self._normalize(audio)
+        if audio is None:
+            return ""
+
+        model, stage = self._model(), "whisper"
+        options = dict(beam_size=self.beam_size, vad_filter=True,
+                       language=self.language, initial_prompt=self.initial_prompt)
+        if self.policy is not None:
+            # 구간 길이가 아니라 지금까지의 발화 길이로 판단 (쉬었다 말한 긴 질문의 짧은 구간이 short가 되지 않도록)
+            profile = self.policy.choose(len(self.buffer) / self.sample_rate, float(np.sqrt(np.mean(raw * raw))),
+                                         self._noise_floor, self.language, final=self._finished)
+            options = dict(beam_size=profile.beam_size, vad_filter=profile.vad_filter,
+                           language=profile.language, initial_prompt=profile.initial_prompt)
+            if profile.model is not None:
+                model = profile.model()
+            stage = f"whisper_{profile.name}"   # 프로필별 지연 시간을 따로 모음
+        started = self._record("audio_prep", started)
+
+        with self._profile():
+            segments, info = model.transcribe(audio, **options)
+            text = " ".join([s.text for s in segments]).strip()
+        self._record(stage, started)
+        # 첫 구간에서 감지한 언어를 고정해 이후 구간의 언어 감지 비용을 줄임
+        if self.language is None and text:
+            self.language = info.language
+        if options["language"] is None and text:
+            self.detected_language = info.language
+        return text
+
+    def _spot(self, audio):
+        """끝점까지의 발화 전체를 greedy 디코딩해 명령 키워드를 찾고, 충분히 확실하면 즉시 콜백 호출"""
+        started = time.perf_counter()
+        audio = self._normalize(audio)
+        if audio is None:
+            return
+
+        # 정책이 있으면 작은 모델로, 언어는 고정하지 않고 감지 (집 언어와 다른 짧은 명령도 알아채도록)
+        model, language = self._model(), self.language
+        if self.policy is not None:
+            language = self.detected_language
+            if self.policy.fast_model is not None:
+                model = self.policy.fast_model()
+        segments, info = model.transcribe(
+            audio,
+            beam_size=1,
+            temperature=0.0,
+            without_timestamps=True,
+            condition_on_previous_text=False,
+            vad_filter=False,
+            language=language,
+            initial_prompt=self.initial_prompt,
+        )
+        segments = list(segments)
+        self._record("whisper_spot", started)
+        text = " ".join([s.text for s in segments]).strip()
+        if not text:
+            return
+
+        confident = all(
+            s.avg_logprob >= self.SPOT_MIN_LOGPROB and s.no_speech_prob <= self.SPOT_MAX_NO_SPEECH
+            for s in segments
+        )
+        cmd = self.match_fn(text)
+        if cmd is None or not confident:
+            return
+
+        print(f"[STT] 조기 명령 감지: '{text}' -> {cmd['cmd']}")
+        self.command = cmd
+        self.command_text = text
+        if self.language is None:
+            self.language = info.language
+        if language is None:
+            self.detected_language = info.language
+        if self.on_command:
+            self.on_command(cmd)
+
+    def finish(self):
+        """녹음 종료 시 호출: 남은 꼬리 구간을 디코딩하고 (텍스트, 언어) 반환
+
+        조기 감지로 명령이 처리된 경우 self.command가 설정되고, beam search 디코딩은 생략된다.
+        """
+        total = len(self.buffer)
+        self._finished = True
+        # 짧은 발화는 beam search 전에 greedy로 한 번 더 명령 여부 확인 (명령이면 아래 꼬리 디코딩은 건너뜀)
+        if self.match_fn is not None and self.command is None and self._heard_speech and total <= self._spot_max:
+            self._spot_pending = True
+            self._jobs.put(("spot", 0, total))
+        # 아직 아무 구간도 넘기지 않았다면(조용한 마이크 등) 전체를 한 번에 디코딩
+        pending_speech = self._speech_since_commit or self._speech_start is not None or self._committed == 0
+        if self._committed < total and pending_speech:
+            self._commit(total)
+        self._jobs.put(None)
+        self._jobs.join()
+        if self.command is not None:
+            return self.command_text, self.language
+        return " ".join(self._texts).strip(), self.language
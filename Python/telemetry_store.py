@@ -0,0 +1,284 @@
+## 센서 기록 저장소 (memmap 고정 크기 열 파일 + 분/시간 단위 요약)
+## SensorStore는 최신값과 최근 10분 정도만 메모리에 두므로, 추세 기반 자동화나 "오늘 오후에 더웠어?" 같은 질문에 쓸 기록이 없다.
+## 1초마다 오는 SENSOR 값을 단계별 파일 세 개에 나눠 쌓는다.
+##  - raw    : 시각 + GAS/TEMP/HUMI/PM1/PM25/PM10/PIR 원본 (최근 2일)
+##  - minute : 1분 단위 평균/최소/최대 + 표본 수 (최근 30일)
+##  - hour   : 1시간 단위 평균/최소/최대 + 표본 수 (최근 5년)
+## 파일마다 헤더 뒤에 열(column)을 하나씩 용량만큼 이어 붙인 고정 크기 링 버퍼라 디스크/메모리 사용량이 처음 만든 크기에서 늘지 않고,
+## 조회는 필요한 열만 np.memmap으로 보고 searchsorted로 구간 경계를 찾아 그 범위만 읽는다 (Python 루프 없음).
+## 분/시간 요약은 현재 구간 누적값을 메모리에 두었다가 구간이 바뀔 때 한 줄씩 기록한다 (종료 시 진행 중인 구간은 버림).
+import math
+import os
+import threading
+import time
+import zlib
+
+import numpy as np
+
+FIELDS = ("GAS", "TEMP", "HUMI", "PM1", "PM25", "PM10", "PIR")
+STATS = ("mean", "min", "max")
+
+MAGIC = b"SMTL"
+FORMAT_VERSION = 1
+HEADER_BYTES = 64
+
+RAW_COLUMNS = [("ts", "<f8")] + [(f, "<f4") for f in FIELDS]
+ROLLUP_COLUMNS = [("ts", "<f8"), ("n", "<u4")] + [(f"{f}_{s}", "<f4") for f in FIELDS for s in STATS]
+
+# 단계 이름 -> (열 구성, 용량(줄), 한 줄이 덮는 초)
+TIERS = {
+    "raw": (RAW_COLUMNS, 2 * 24 * 3600, 1),
+    "minute": (ROLLUP_COLUMNS, 30 * 24 * 60, 60),
+    "hour": (ROLLUP_COLUMNS, 5 * 365 * 24, 3600),
+}
+
+# 헤더: 매직, 버전, 용량, 다음 쓸 위치, 저장된 줄 수, 열 구성 해시
+_HEADER = np.dtype([("magic", "S4"), ("version", "<u4"), ("capacity", "<u8"), ("head", "<u8"),
+                    ("count", "<u8"), ("layout", "<u8")])
+
+
+def _layout_hash(columns, capacity):
+    return zlib.crc32(repr((columns, capacity)).encode("utf-8"))
+
+
+class _Ring:
+    """헤더 + 열별 연속 영역으로 된 고정 크기 memmap 링 버퍼 (파일 하나)"""
+
+    def __init__(self, path, columns, capacity):
+        self.path = path
+        self.columns = columns
+        self.capacity = capacity
+        size = HEADER_BYTES + sum(np.dtype(dt).itemsize * capacity for _, dt in columns)
+        layout = _layout_hash(columns, capacity)
+
+        fresh = not os.path.exists(path)
+        if not fresh and not self._compatible(path, size, layout):
+            # 열 구성/용량이 바뀐 옛 파일은 옆으로 치우고 새로 시작
+            os.replace(path, path + ".old")
+            print(f"[Telemetry] 형식이 다른 기록 파일을 {os.path.basename(path)}.old로 옮기고 새로 만듭니다.")
+            fresh = True
+        if fresh:
+            with open(path, "wb") as f:
+                f.truncate(size)   # 희소 파일: 실제 디스크는 쓴 만큼만
+
+        self._mm = np.memmap(path, dtype=np.uint8, mode="r+", shape=(size,))
+        self.header = self._mm[:_HEADER.itemsize].view(_HEADER)
+        if fresh:
+            self.header[0] = (MAGIC, FORMAT_VERSION, capacity, 0, 0, layout)
+        self.cols = {}
+        offset = HEADER_BYTES
+        for name, dt in columns:
+            nbytes = np.dtype(dt).itemsize * capacity
+            self.cols[name] = self._mm[offset:offset + nbytes].view(dt)
+            offset += nbytes
+
+    @staticmethod
+    def _compatible(path, size, layout):
+        try:
+            if os.path.getsize(path) != size:
+                return False
+            header = np.fromfile(path, dtype=_HEADER, count=1)
+        except OSError:
+            return False
+        return (len(header) == 1 and header["magic"][0] == MAGIC and header["version"][0] == FORMAT_VERSION
+                and header["layout"][0] == layout)
+
+    def __len__(self):
+        return int(self.header["count"][0])
+
+    def last_ts(self):
+        count = len(self)
+        if count == 0:
+            return -math.inf
+        return float(self.cols["ts"][(int(self.header["head"][0]) - 1) % self.capacity])
+
+    def append(self, row):
+        """row: {열 이름: 값} (없는 열은 NaN/0)"""
+        head = int(self.header["head"][0])
+        for name, col in self.cols.items():
+            col[head] = row.get(name, np.nan if col.dtype.kind == "f" else 0)
+        self.header["head"] = (head + 1) % self.capacity
+        self.header["count"] = min(len(self) + 1, self.capacity)
+
+    def _segments(self):
+        """오래된 순서의 연속 구간 목록 [(시작, 끝)] (링이 한 바퀴 돌았으면 두 조각)"""
+        count, head = len(self), int(self.header["head"][0])
+        if count < self.capacity:
+            return [(0, count)]
+        return [(head, self.capacity), (0, head)]
+
+    def range(self, start, end, names):
+        """start <= ts < end 인 줄의 {열 이름: 배열} (시각 오름차순, 복사본)"""
+        ts = self.cols["ts"]
+        parts = []
+        for lo, hi in self._segments():
+            # 각 조각 안에서는 시각이 정렬되어 있으므로 이진 탐색으로 잘라냄
+            i = lo + np.searchsorted(ts[lo:hi], start, side="left")
+            j = lo + np.searchsorted(ts[lo:hi], end, side="left")
+            if j > i:
+                parts.append((i, j))
+        return {name: np.concatenate([self.cols[name][i:j] for i, j in parts]) if parts
+                else np.zeros(0, dtype=self.cols[name].dtype) for name in ("ts",) + tuple(names)}
+
+    def flush(self):
+        self._mm.flush()
+
+    def close(self):
+        self._mm.flush()
+        self.cols, self.header, self._mm = {}, None, None   # 참조가 모두 없어지면 매핑 해제
+
+
+class _Bucket:
+    """진행 중인 요약 구간 하나의 필드별 누적값"""
+
+    def __init__(self, period):
+        self.period = period
+        self.start = None
+        self._reset()
+
+    def _reset(self):
+        k = len(FIELDS)
+        self.n = 0
+        self.sum = np.zeros(k)
+        self.weight = np.zeros(k)
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+
+    def add(self, ts, mean, lo, hi, n=1):
+        """값 벡터 (NaN은 빠진 필드) 누적. 구간이 바뀌었으면 끝난 구간의 요약 줄을 돌려줌"""
+        start = math.floor(ts / self.period) * self.period
+        row = None
+        if self.start is not None and start != self.start:
+            row = self.row()
+            self._reset()
+        self.start = start
+        ok = ~np.isnan(mean)
+        self.n += n
+        self.sum[ok] += mean[ok] * n
+        self.weight[ok] += n
+        self.min[ok] = np.minimum(self.min[ok], lo[ok])
+        self.max[ok] = np.maximum(self.max[ok], hi[ok])
+        return row
+
+    def row(self):
+        """현재 누적값 -> 요약 줄 (누적된 값이 없으면 None)"""
+        if self.start is None or self.n == 0:
+            return None
+        has = self.weight > 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(has, self.sum / self.weight, np.nan)
+        lo = np.where(has, self.min, np.nan)
+        hi = np.where(has, self.max, np.nan)
+        row = {"ts": self.start, "n": self.n}
+        for i, f in enumerate(FIELDS):
+            row[f"{f}_mean"], row[f"{f}_min"], row[f"{f}_max"] = mean[i], lo[i], hi[i]
+        return row
+
+
+def _vector(row, stat):
+    return np.array([row[f"{f}_{stat}"] for f in FIELDS], dtype=np.float64)
+
+
+class TelemetryStore:
+    """SENSOR 값 기록 (raw/minute/hour 링 파일) + 구간 조회"""
+
+    def __init__(self, directory, tiers=TIERS):
+        self.directory = directory
+        self.tiers = tiers
+        self._lock = threading.Lock()
+        self._rings = None            # 첫 기록/조회 때 파일을 열거나 만듦
+        self._minute = _Bucket(tiers["minute"][2])
+        self._hour = _Bucket(tiers["hour"][2])
+        self.dropped = 0              # 시각이 거꾸로 가서 버린 값 수
+
+    def _open(self):
+        if self._rings is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._rings = {name: _Ring(os.path.join(self.directory, f"{name}.bin"), columns, capacity)
+                           for name, (columns, capacity, _) in self.tiers.items()}
+            raw = self._rings["raw"]
+            print(f"[Telemetry] 기록 파일 열기: {self.directory} (원본 {len(raw)}줄)")
+        return self._rings
+
+    # -----------------------------------------------------
+    # 기록
+    # -----------------------------------------------------
+    def append(self, values, ts=None):
+        """{필드: 값} 한 번 기록 (ts는 time.time() 기준). 기록했으면 True"""
+        ts = time.time() if ts is None else ts
+        vec = np.array([values.get(f, np.nan) for f in FIELDS], dtype=np.float64)
+        if np.isnan(vec).all():
+            return False
+        with self._lock:
+            rings = self._open()
+            raw = rings["raw"]
+            if ts <= raw.last_ts():
+                # 조회가 시각 정렬을 전제로 하므로 시계가 거꾸로 간 값은 버림
+                self.dropped += 1
+                return False
+            raw.append({"ts": ts, **{f: vec[i] for i, f in enumerate(FIELDS)}})
+            minute = self._minute.add(ts, vec, vec, vec)
+            if minute is not None:
+                rings["minute"].append(minute)
+                hour = self._hour.add(minute["ts"], _vector(minute, "mean"), _vector(minute, "min"),
+                                      _vector(minute, "max"), n=minute["n"])
+                if hour is not None:
+                    rings["hour"].append(hour)
+        return True
+
+    def flush(self):
+        """memmap 변경 내용을 디스크에 반영 (주기적으로 호출)"""
+        with self._lock:
+            if self._rings is not None:
+                for ring in self._rings.values():
+                    ring.flush()
+
+    def close(self):
+        with self._lock:
+            if self._rings is not None:
+                for ring in self._rings.values():
+                    ring.close()
+                self._rings = None
+
+    # -----------------------------------------------------
+    # 조회
+    # -----------------------------------------------------
+    def pick_tier(self, start, end):
+        """구간 길이와 보관 기간에 맞는 가장 촘촘한 단계 (2시간 이하 raw, 2일 이하 minute, 그 이상 hour)"""
+        now = time.time()
+        for name, max_span in (("raw", 2 * 3600), ("minute", 2 * 24 * 3600)):
+            _, capacity, period = self.tiers[name]
+            if end - start <= max_span and start >= now - capacity * period:
+                return name
+        return "hour"
+
+    def query(self, start, end, fields=FIELDS, tier=None):
+        """start <= ts < end 기록 -> (단계 이름, {열 이름: 배열}). raw는 필드 이름, 요약 단계는 '필드_mean/min/max'와 n"""
+        tier = tier or self.pick_tier(start, end)
+        names = list(fields) if tier == "raw" else ["n"] + [f"{f}_{s}" for f in fields for s in STATS]
+        with self._lock:
+            return tier, self._open()[tier].range(start, end, names)
+
+    def series(self, field, start, end, tier=None):
+        """(시각 배열, 값 배열): raw면 원본, 요약 단계면 구간 평균 (값이 없는 줄은 제외)"""
+        tier, cols = self.query(start, end, (field,), tier)
+        values = cols[field] if tier == "raw" else cols[f"{field}_mean"]
+        ok = ~np.isnan(values)
+        return cols["ts"][ok], values[ok]
+
+    def summary(self, field, start, end, tier=None):
+        """구간 전체의 {mean, min, max, count} (기록이 없으면 None)"""
+        tier, cols = self.query(start, end, (field,), tier)
+        if tier == "raw":
+            values = cols[field][~np.isnan(cols[field])]
+            if len(values) == 0:
+                return None
+            return {"mean": float(values.mean()), "min": float(values.min()), "max": float(values.max()),
+                    "count": int(len(values))}
+        mean = cols[f"{field}_mean"]
+        ok = ~np.isnan(mean)
+        if not ok.any():
+            return None
+        n = cols["n"][ok].astype(np.float64)
+        return {"mean": float(np.average(mean[ok], weights=n)), "min": float(cols[f"{field}_min"][ok].min()),
+                "max": float(cols[f"{field}_max"][ok].max()), "count": int(n.sum())}
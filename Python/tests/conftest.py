@@ -0,0 +1,5 @@
+## 테스트 공용 설정: Python/ 폴더의 모듈을 패키지 없이 바로 import 할 수 있게 경로 추가
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,24 @@
+## answer_cache: 질문 인텐트 분류 (영어 키워드는 단어 단위로만)
+import pytest
+
+from answer_cache import DEFAULT_INTENT, classify
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("what's the news today", "time"),
+    ("what should I do now?", "time"),
+    ("오늘 뭐 하지", "time"),
+    ("will it rain tomorrow", "weather"),
+    ("오늘 날씨 어때", "weather"),
+    ("what's the indoor temperature", "live"),
+    ("do you know who wrote hamlet", "fact"),
+    ("why is snow white", "fact"),
+    ("how fast is a train", "fact"),
+    ("今日は何をする", "time"),
+])
+def test_classify(text, intent):
+    assert classify(text)[0] == intent
+
+
+def test_default_intent_has_long_ttl():
+    assert classify("do you know the capital of France") == DEFAULT_INTENT
@@ -0,0 +1,98 @@
+## automation: 문 열림 이벤트 병합, 동작 키 중복 제거, 선언형 규칙 평가 (가짜 시계)
+import math
+
+from automation import AutomationDispatcher, Rule, evaluate
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _dispatcher():
+    clock = _Clock()
+    return AutomationDispatcher(clock=clock), clock
+
+
+def test_coalesce_merges_events_inside_window():
+    auto, clock = _dispatcher()
+    event = auto.coalesce("unlock", "face", 5.0)
+    assert event is not None and event.source == "face"
+    clock.now += 1.0
+    assert auto.coalesce("unlock", "door", 5.0) is None
+    clock.now += 3.9
+    assert auto.coalesce("unlock", "door", 5.0) is None
+    assert event.sources == ["face", "door", "door"]
+    assert auto.counts["unlock.dispatched"] == 1
+    assert auto.counts["unlock.coalesced"] == 2
+
+
+def test_coalesce_opens_new_window_after_expiry():
+    auto, clock = _dispatcher()
+    first = auto.coalesce("unlock", "door", 5.0)
+    clock.now += 5.0
+    second = auto.coalesce("unlock", "door", 5.0)
+    assert second is not None and second is not first
+    assert second.sources == ["door"]
+    # 병합 창은 첫 이벤트 기준으로 고정 (병합된 이벤트가 창을 늘리지 않음)
+    clock.now += 4.0
+    assert auto.coalesce("unlock", "voice", 5.0) is None
+    clock.now += 1.0
+    assert auto.coalesce("unlock", "voice", 5.0) is not None
+
+
+def test_coalesce_kinds_are_independent():
+    auto, _ = _dispatcher()
+    assert auto.coalesce("unlock", "door", 5.0) is not None
+    assert auto.coalesce("motion", "pir", 5.0) is not None
+
+
+def test_since_counts_merged_events():
+    auto, clock = _dispatcher()
+    assert auto.since("unlock") == math.inf
+    auto.coalesce("unlock", "face", 5.0)
+    clock.now += 2.0
+    auto.coalesce("unlock", "door", 5.0)
+    clock.now += 1.5
+    assert auto.since("unlock") == 1.5
+
+
+def test_once_blocks_repeats_within_ttl():
+    auto, clock = _dispatcher()
+    assert auto.once("UNLOCK", 3.0)
+    clock.now += 2.9
+    assert not auto.once("UNLOCK", 3.0)
+    assert auto.once("smart_care", 3.0)       # 키마다 따로
+    clock.now += 0.1
+    assert auto.once("UNLOCK", 3.0)
+    assert auto.counts["UNLOCK.deduped"] == 1
+
+
+def test_once_deduped_call_does_not_extend_ttl():
+    auto, clock = _dispatcher()
+    assert auto.once("smart_care", 10.0)
+    clock.now += 9.0
+    assert not auto.once("smart_care", 10.0)
+    clock.now += 1.0
+    assert auto.once("smart_care", 10.0)
+
+
+RULES = [
+    Rule("cold", "TEMP", "<=", 18.0, "HEAT_ON", "춥습니다"),
+    Rule("hot", "TEMP", ">=", 28.0, "FAN_ON", "덥습니다"),
+    Rule("gas", "GAS", ">", 300, "FAN_ON", "가스 감지"),
+]
+
+
+def test_evaluate_returns_matching_rules_in_order():
+    assert [r.name for r in evaluate(RULES, {"TEMP": 30.0, "GAS": 400})] == ["hot", "gas"]
+    assert [r.name for r in evaluate(RULES, {"TEMP": 18.0})] == ["cold"]
+    assert evaluate(RULES, {"TEMP": 22.0, "GAS": 300}) == []
+
+
+def test_evaluate_skips_missing_sensors():
+    assert evaluate(RULES, {"TEMP": None}) == []
+    assert evaluate(RULES, {}) == []
@@ -0,0 +1,100 @@
+## intent_engine: 정확 일치 / 근사 매칭 / 동점 보류 / 부정·질문 거절
+import pytest
+
+from intent_engine import IntentEngine, guard, normalize
+
+# main.py COMMANDS와 같은 모양의 축약 테이블
+COMMANDS = [
+    {"kws": ["불 켜", "조명 켜"], "msg": "", "lang": "ko", "cmd": "LED_ON"},
+    {"kws": ["불 꺼", "조명 꺼"], "msg": "", "lang": "ko", "cmd": "LED_OFF"},
+    {"kws": ["선풍기 켜", "팬 켜"], "msg": "", "lang": "ko", "cmd": "FAN_ON"},
+    {"kws": ["선풍기 꺼", "팬 꺼"], "msg": "", "lang": "ko", "cmd": "FAN_OFF"},
+    {"kws": ["문 열어"], "msg": "", "lang": "ko", "cmd": "UNLOCK"},
+    {"kws": ["turn on light", "lights on"], "msg": "", "lang": "en", "cmd": "LED_ON"},
+    {"kws": ["turn off light", "lights off"], "msg": "", "lang": "en", "cmd": "LED_OFF"},
+    {"kws": ["turn on fan", "fan on"], "msg": "", "lang": "en", "cmd": "FAN_ON"},
+    {"kws": ["turn off fan", "fan off"], "msg": "", "lang": "en", "cmd": "FAN_OFF"},
+    {"kws": ["電気つけて"], "msg": "", "lang": "ja", "cmd": "LED_ON"},
+    {"kws": ["電気消して"], "msg": "", "lang": "ja", "cmd": "LED_OFF"},
+]
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return IntentEngine(COMMANDS)
+
+
+def _cmd(engine, text):
+    cmd, score = engine.match(text)
+    return (cmd["cmd"] if cmd else None), score
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("불 켜", "LED_ON"),
+    ("불 좀 꺼줘", "LED_OFF"),
+    ("조명을 켜줘", "LED_ON"),
+    ("선풍기 켜 줄래?", "FAN_ON"),
+    ("문 열어", "UNLOCK"),
+    ("Turn on the light, please.", "LED_ON"),
+    ("can you turn off the fan?", "FAN_OFF"),
+    ("電気をつけて", "LED_ON"),
+])
+def test_exact(engine, text, expected):
+    assert _cmd(engine, text) == (expected, 1.0)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("lights of", "LED_OFF"),        # 'lights off'에서 한 글자 빠짐
+    ("turn on the ligt", "LED_ON"),       # 'light' 오타
+])
+def test_fuzzy(engine, text, expected):
+    cmd, score = _cmd(engine, text)
+    assert cmd == expected
+    assert engine.fuzzy_min_score <= score < 1.0
+
+
+@pytest.mark.parametrize("text", [
+    "선풍기 커줘",   # '켜'/'꺼' 모두 자모 하나 차이 -> 동점이라 보류
+    "fan of",        # 'fan on'/'fan off' 동점
+])
+def test_tie_is_rejected(engine, text):
+    assert _cmd(engine, text) == (None, 0.0)
+
+
+def test_short_keyword_needs_exact_hit(engine):
+    # '불커' 는 '불켜'/'불꺼'와 자모 하나 차이 (0.8점) -> 근사 매칭 최소 점수 미만
+    assert _cmd(engine, "불 커") == (None, 0.0)
+
+
+@pytest.mark.parametrize("text, reason", [
+    ("불을 끄지 마", "negation"),
+    ("불 켜지 마", "negation"),
+    ("불 안 켜", "negation"),
+    ("don't turn on the light", "negation"),
+    ("do not turn off the fan", "negation"),
+    ("電気を消さないで", "negation"),
+    ("is the light on?", "question"),
+    ("is the fan on", "question"),
+    ("불 켜져 있어?", "question"),
+    ("팬 꺼져 있어?", "question"),
+    ("電気ついてる?", "question"),
+])
+def test_negation_and_question_rejected(engine, text, reason):
+    assert guard(text) == reason
+    assert _cmd(engine, text) == (None, 0.0)
+
+
+@pytest.mark.parametrize("text", ["불 켜줄래?", "can you turn on the light?", "불 켜 줄 수 있어?"])
+def test_request_with_question_mark_is_command(engine, text):
+    assert guard(text) is None
+    assert _cmd(engine, text)[0] == "LED_ON"
+
+
+@pytest.mark.parametrize("text", ["", "오늘 날씨 어때", "what time is it"])
+def test_no_match(engine, text):
+    assert _cmd(engine, text) == (None, 0.0)
+
+
+def test_normalize_strips_particles_and_fillers():
+    assert normalize("조명을 좀 켜 주세요!") == "조명켜주세요"
+    assert normalize("Please turn on the light") == "turnonlight"
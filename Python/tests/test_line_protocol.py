@@ -0,0 +1,71 @@
+## line_protocol: recv 경계와 무관한 줄 조립, UTF-8 경계, 긴 줄 버리기, 메시지 파싱
+import asyncio
+
+import pytest
+
+from line_protocol import LineDecoder, Message, parse_message, read_lines
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("LED_ON", ("LED_ON", "", None)),
+    ("CURRENT_TEMP:23.5 #3", ("CURRENT_TEMP", "23.5", "#3")),
+    ("current_temp : 23.5", ("CURRENT_TEMP", "23.5", None)),
+    ("SENSOR GAS=120 TEMP=24.1", ("SENSOR", "GAS=120 TEMP=24.1", None)),
+    ("REGISTER_FACE:엄마 #12", ("REGISTER_FACE", "엄마", "#12")),
+    ("  UNLOCKED  ", ("UNLOCKED", "", None)),
+    ("LED_ON#3", ("LED_ON", "#3", None)),          # '#id' 앞에는 공백이 있어야 요청 ID
+    ("불 켜줘", (None, "불 켜줘", None)),
+])
+def test_parse_message(line, expected):
+    msg = parse_message(line)
+    assert (msg.kind, msg.arg, msg.rid) == expected
+    assert msg.raw == line
+    assert isinstance(msg, Message)
+
+
+def test_lines_split_across_reads():
+    decoder = LineDecoder()
+    assert decoder.feed(b"LED_") == []
+    assert decoder.feed(b"ON\nFAN") == ["LED_ON"]
+    assert decoder.feed(b"_OFF\n\n  \nUNLOCK\n") == ["FAN_OFF", "UNLOCK"]
+
+
+def test_crlf_and_blank_lines_are_stripped():
+    assert LineDecoder().feed(b"LED_ON\r\n\r\nFAN_ON\r\n") == ["LED_ON", "FAN_ON"]
+
+
+def test_multibyte_character_split_between_reads():
+    data = "REGISTER_FACE:엄마\n".encode("utf-8")
+    cut = data.index("엄".encode("utf-8")) + 1      # 3바이트 문자의 중간
+    decoder = LineDecoder()
+    assert decoder.feed(data[:cut]) == []
+    assert decoder.feed(data[cut:]) == ["REGISTER_FACE:엄마"]
+
+
+def test_invalid_utf8_is_replaced_not_raised():
+    assert LineDecoder().feed(b"LED\xffON\n") == ["LED�ON"]
+
+
+def test_overlong_line_is_dropped_until_newline():
+    decoder = LineDecoder(max_line=8)
+    assert decoder.feed(b"X" * 20) == []
+    assert decoder.feed(b"YYY\nLED_ON\n") == ["LED_ON"]
+    assert decoder.feed(b"TOO_LONG_LINE\nFAN_ON\n") == ["FAN_ON"]
+
+
+def test_finish_returns_unterminated_last_line():
+    decoder = LineDecoder()
+    assert decoder.feed(b"LED_ON\nFAN_") == ["LED_ON"]
+    assert decoder.finish() == ["FAN_"]
+    assert decoder.finish() == []
+
+
+def test_read_lines_until_eof():
+    async def collect():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"LED_ON\nSENSOR GAS=1")
+        reader.feed_data(b"20\nUNLOCK")
+        reader.feed_eof()
+        return [line async for line in read_lines(reader)]
+
+    assert asyncio.run(collect()) == ["LED_ON", "SENSOR GAS=120", "UNLOCK"]
@@ -0,0 +1,87 @@
+## local_answers: 기기 상태 질문은 명령보다 먼저 걸러져 로컬 답변으로 가야 함
+from datetime import datetime
+
+import pytest
+
+from intent_engine import IntentEngine
+from local_answers import DeviceState, LocalAnswers, is_state_question
+
+
+class _Sensors:
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, key, max_age=None):
+        return self.values.get(key)
+
+
+COMMANDS = [
+    {"kws": ["불 켜"], "msg": "", "lang": "ko", "cmd": "LED_ON"},
+    {"kws": ["팬 꺼"], "msg": "", "lang": "ko", "cmd": "FAN_OFF"},
+    {"kws": ["fan on"], "msg": "", "lang": "en", "cmd": "FAN_ON"},
+    {"kws": ["電気つけて"], "msg": "", "lang": "ja", "cmd": "LED_ON"},
+]
+
+STATE_QUESTIONS = [
+    ("is the fan on?", "en", "The fan is on."),
+    ("불 켜져 있어?", "ko", "조명은 꺼져 있습니다."),
+    ("팬 꺼져 있어?", "ko", "선풍기는 켜져 있습니다."),
+    ("電気ついてる?", "ja", "電気は消えています。"),
+]
+
+
+@pytest.fixture
+def answers():
+    devices = DeviceState()
+    devices.note("LED_OFF")
+    devices.note("FAN_ON")
+    return LocalAnswers(_Sensors({"TEMP": 23.5, "HUMI": 41.0}), devices,
+                        now_fn=lambda: datetime(2026, 10, 17, 14, 5))
+
+
+@pytest.mark.parametrize("text, lang, expected", STATE_QUESTIONS)
+def test_state_question_answered_locally(answers, text, lang, expected):
+    assert is_state_question(text)
+    assert answers.answer(text, lang) == ("devices", expected)
+
+
+@pytest.mark.parametrize("text, lang, expected", STATE_QUESTIONS)
+def test_state_question_is_not_a_command(text, lang, expected):
+    # 명령 매칭(조기 감지 포함) 전에 걸러지고, 매처 자체도 질문은 명령으로 보지 않음
+    assert IntentEngine(COMMANDS).match(text) == (None, 0.0)
+
+
+@pytest.mark.parametrize("text", ["불 켜", "팬 꺼줘", "turn the fan on", "電気つけて", "오늘 날씨 어때",
+                                  "open the door", "open door", "문 열어줘"])
+def test_commands_are_not_state_questions(text):
+    assert not is_state_question(text)
+
+
+@pytest.mark.parametrize("text", ["is the door open", "door open?", "is the door locked", "문 잠겼어?"])
+def test_door_state_questions(answers, text):
+    assert is_state_question(text)
+    assert answers.answer(text, "en")[0] == "door"
+
+
+@pytest.mark.parametrize("text", ["문제 상태가 어때", "update the date", "문자 보내줘"])
+def test_substrings_do_not_trigger_local_answers(answers, text):
+    # 짧은 키워드가 다른 단어 안에 들어 있어도 문/날짜 질문으로 보지 않음
+    assert not is_state_question(text)
+    assert answers.answer(text, "ko") is None
+
+
+@pytest.mark.parametrize("text", ["문 잠겼어?", "현관문 상태 어때", "문이 열려 있어?"])
+def test_korean_door_questions(answers, text):
+    assert answers.answer(text, "ko") == ("door", "도어락 상태를 아직 모릅니다.")
+
+
+def test_date_questions(answers):
+    for text in ("what's the date today", "what is today's date", "오늘 날짜 알려줘"):
+        assert answers.answer(text, "en")[0] == "date"
+
+
+def test_other_local_answers(answers):
+    assert answers.answer("지금 몇 시야?", "ko") == ("time", "지금은 오후 2시 5분입니다.")
+    assert answers.answer("what's the indoor temperature", "en") == \
+        ("indoor", "Indoors, the temperature is 23.5 degrees.")
+    assert answers.answer("오늘 날씨 어때", "ko") is None
@@ -0,0 +1,37 @@
+## stt_policy: 발화 길이 기준 프로필 선택과 집 언어 고정/해제
+from stt_policy import DecodingPolicy
+
+
+def test_short_only_after_recording_ends():
+    policy = DecodingPolicy(command_prompt="Commands")
+    # 녹음 중 1.5초 시점의 구간: 긴 질문의 앞부분일 수 있으므로 short 아님
+    assert policy.choose(1.5, 0.1, 0.001, final=False).name == "medium"
+    assert policy.choose(1.5, 0.1, 0.001, final=True).name == "short"
+
+
+def test_long_utterance_segments_use_long_profile():
+    policy = DecodingPolicy(command_prompt="Commands", question_prompt=None)
+    profile = policy.choose(9.0, 0.1, 0.001, utterance_language="ko", final=False)
+    assert (profile.name, profile.beam_size, profile.initial_prompt) == ("long", 5, None)
+
+
+def test_noisy_overrides_length():
+    policy = DecodingPolicy()
+    assert policy.choose(1.0, 0.002, 0.001).name == "noisy"
+
+
+def test_household_language_pins_and_unpins():
+    policy = DecodingPolicy(pin_after=3)
+    for _ in range(3):
+        policy.observe("ko")
+    assert policy.household_language == "ko"
+    assert policy.choose(1.0, 0.1, 0.001).language == "ko"
+    policy.observe("en")
+    assert policy.household_language is None
+    assert policy.choose(1.0, 0.1, 0.001).language is None
+
+
+def test_unknown_language_is_ignored():
+    policy = DecodingPolicy(pin_after=1)
+    policy.observe(None)
+    assert policy.household_language is None
@@ -0,0 +1,84 @@
+## stt_stream: 조기 명령 감지는 VAD 끝점까지의 전체 발화로만 판단 (앞부분 "불 켜"로 실행하지 않음)
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from audio_recorder import AudioBuffer
+from intent_engine import IntentEngine
+from stt_stream import StreamingTranscriber
+
+SR = 16000
+BLOCK = SR // 10
+
+COMMANDS = [
+    {"kws": ["불 켜"], "msg": "", "lang": "ko", "cmd": "LED_ON"},
+    {"kws": ["불 꺼"], "msg": "", "lang": "ko", "cmd": "LED_OFF"},
+]
+
+
+class _PrefixWhisper:
+    """오디오 길이에 따라 앞부분만 들린 텍스트 또는 전체 텍스트를 돌려주는 가짜 Whisper"""
+
+    def __init__(self, prefix, full, full_after_sec):
+        self.prefix = prefix
+        self.full = full
+        self.full_after = int(full_after_sec * SR)
+        self.lengths = []
+
+    def transcribe(self, audio, **kwargs):
+        self.lengths.append(len(audio))
+        text = self.full if len(audio) >= self.full_after else self.prefix
+        seg = SimpleNamespace(text=text, avg_logprob=-0.1, no_speech_prob=0.01)
+        return iter([seg]), SimpleNamespace(language="ko")
+
+
+def _record(model, speech_sec, silence_sec=0.8):
+    """speech_sec 동안 소리, silence_sec 동안 무음을 0.1초 블록으로 넣고 (전사기, 실행된 명령 목록) 반환"""
+    rng = np.random.default_rng(0)
+    audio = np.concatenate([rng.uniform(-0.2, 0.2, int(speech_sec * SR)),
+                            np.zeros(int(silence_sec * SR))]).astype(np.float32)
+    buffer = AudioBuffer(SR)
+    fired = []
+    engine = IntentEngine(COMMANDS)
+    transcriber = StreamingTranscriber(model, buffer, match_fn=lambda t: engine.match(t)[0],
+                                       on_command=lambda cmd: fired.append(cmd["cmd"]))
+    for i in range(0, len(audio), BLOCK):
+        buffer.append(audio[i:i + BLOCK])
+        transcriber.on_audio()
+    return transcriber, fired
+
+
+@pytest.mark.parametrize("full", ["불 켜져 있어", "불 켜지 마"])
+def test_command_prefix_with_question_or_negation_ending_does_not_fire(full):
+    # 말하는 도중(0.8초 전)에는 "불 켜"까지만 들림
+    model = _PrefixWhisper("불 켜", full, full_after_sec=0.8)
+    transcriber, fired = _record(model, speech_sec=1.2)
+    text, _ = transcriber.finish()
+    assert fired == []
+    assert transcriber.command is None
+    assert text == full
+    # 끝점 전의 부분 오디오로는 디코딩하지 않음
+    assert min(model.lengths) >= int(1.2 * SR)
+
+
+def test_command_fires_at_endpoint():
+    model = _PrefixWhisper("불", "불 켜", full_after_sec=0.5)
+    transcriber, fired = _record(model, speech_sec=0.7)
+    # 녹음 종료 전, 끝점에서 이미 실행됨 (디코딩 스레드에서 호출되므로 잠시 기다림)
+    deadline = time.monotonic() + 2.0
+    while not fired and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert fired == ["LED_ON"]
+    text, _ = transcriber.finish()
+    assert text == "불 켜"
+    assert transcriber.command["cmd"] == "LED_ON"
+
+
+def test_command_without_endpoint_is_checked_at_finish():
+    model = _PrefixWhisper("불", "불 꺼", full_after_sec=0.5)
+    transcriber, fired = _record(model, speech_sec=0.7, silence_sec=0.1)
+    assert fired == []
+    transcriber.finish()
+    assert fired == ["LED_OFF"]
@@ -0,0 +1,111 @@
+## telemetry_store: 링 파일 기록/조회, 분/시간 요약, 한 바퀴 돈 링, 다시 열기, 형식 변경 시 옮기기
+import os
+
+import numpy as np
+import pytest
+
+import telemetry_store as tsm
+from telemetry_store import TelemetryStore
+
+T0 = 1_700_000_000 - 1_700_000_000 % 3600      # 시간 경계에서 시작
+
+# 테스트용 작은 용량 (raw 5000초, minute 200분, hour 50시간)
+SMALL = {
+    "raw": (tsm.RAW_COLUMNS, 5000, 1),
+    "minute": (tsm.ROLLUP_COLUMNS, 200, 60),
+    "hour": (tsm.ROLLUP_COLUMNS, 50, 3600),
+}
+
+
+def _fill(store, seconds, start=T0):
+    # TEMP는 시간마다 1도씩 오르고, PIR은 0/1 번갈아, GAS는 빠진 값
+    for i in range(seconds):
+        store.append({"TEMP": 20 + i // 3600, "HUMI": 40.0, "PIR": i % 2}, ts=start + i)
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = TelemetryStore(str(tmp_path / "telemetry"), tiers=SMALL)
+    yield s
+    s.close()
+
+
+def test_raw_range_is_half_open(store):
+    _fill(store, 100)
+    tier, cols = store.query(T0 + 10, T0 + 20, ("TEMP", "PIR"), tier="raw")
+    assert tier == "raw"
+    assert list(cols["ts"] - T0) == list(range(10, 20))
+    assert list(cols["PIR"]) == [0, 1] * 5
+    assert np.isnan(store.query(T0, T0 + 5, ("GAS",), tier="raw")[1]["GAS"]).all()
+
+
+def test_minute_and_hour_rollups(store):
+    _fill(store, 2 * 3600 + 61)      # 두 시간 + 다음 분 하나가 닫힘
+    summary = store.summary("TEMP", T0, T0 + 2 * 3600, tier="hour")
+    assert summary == {"mean": 20.5, "min": 20.0, "max": 21.0, "count": 2 * 3600}
+
+    ts, pir = store.series("PIR", T0, T0 + 300, tier="minute")
+    assert list(ts - T0) == [0, 60, 120, 180, 240]
+    assert np.allclose(pir, 0.5)
+
+    tier, cols = store.query(T0 + 3600, T0 + 3660, ("TEMP",), tier="minute")
+    assert cols["n"].tolist() == [60]
+    assert (cols["TEMP_min"][0], cols["TEMP_max"][0]) == (21.0, 21.0)
+    # 값이 한 번도 없던 필드는 요약 줄도 NaN이라 summary는 None
+    assert store.summary("GAS", T0, T0 + 3600, tier="minute") is None
+
+
+def test_open_bucket_is_not_written_yet(store):
+    _fill(store, 90)
+    assert len(store.query(T0, T0 + 3600, ("TEMP",), tier="minute")[1]["ts"]) == 1
+    assert store.summary("TEMP", T0, T0 + 3600, tier="hour") is None
+
+
+def test_ring_wraps_and_keeps_latest(store):
+    _fill(store, 6000)               # raw 용량 5000을 넘김
+    tier, cols = store.query(T0, T0 + 6000, ("TEMP",), tier="raw")
+    assert len(cols["ts"]) == 5000
+    assert cols["ts"][0] - T0 == 1000 and cols["ts"][-1] - T0 == 5999
+    assert np.all(np.diff(cols["ts"]) == 1)
+    # 경계를 걸친 구간도 두 조각을 이어서 돌려줌
+    _, part = store.query(T0 + 4990, T0 + 5010, ("TEMP",), tier="raw")
+    assert list(part["ts"] - T0) == list(range(4990, 5010))
+
+
+def test_backwards_timestamps_are_dropped(store):
+    _fill(store, 10)
+    assert not store.append({"TEMP": 1.0}, ts=T0 + 5)
+    assert not store.append({"GAS": np.nan}, ts=T0 + 100)   # 값이 하나도 없으면 기록 안 함
+    assert store.dropped == 1
+    assert len(store.query(T0, T0 + 200, tier="raw")[1]["ts"]) == 10
+
+
+def test_reopen_keeps_records(tmp_path):
+    directory = str(tmp_path / "telemetry")
+    first = TelemetryStore(directory, tiers=SMALL)
+    _fill(first, 200)
+    first.close()
+    again = TelemetryStore(directory, tiers=SMALL)
+    assert again.summary("TEMP", T0, T0 + 200, tier="raw")["count"] == 200
+    assert again.append({"TEMP": 30.0}, ts=T0 + 200)
+    assert not again.append({"TEMP": 30.0}, ts=T0 + 150)
+    again.close()
+
+
+def test_layout_change_moves_old_file_aside(tmp_path):
+    directory = str(tmp_path / "telemetry")
+    first = TelemetryStore(directory, tiers=SMALL)
+    _fill(first, 50)
+    first.close()
+    bigger = dict(SMALL, raw=(tsm.RAW_COLUMNS, 6000, 1))
+    store = TelemetryStore(directory, tiers=bigger)
+    assert len(store.query(T0, T0 + 50, tier="raw")[1]["ts"]) == 0
+    assert "raw.bin.old" in os.listdir(directory)
+    store.close()
+
+
+def test_pick_tier_by_span(store):
+    now = tsm.time.time()
+    assert store.pick_tier(now - 600, now) == "raw"
+    assert store.pick_tier(now - 3 * 3600, now) == "minute"
+    assert store.pick_tier(now - 7 * 86400, now) == "hour"
@@ -0,0 +1,82 @@
+## tts_cache: 메모리/디스크 2단 캐시, 잠금 밖 파일 쓰기, 용량 제한
+import os
+import threading
+
+from tts_cache import TTSCache
+
+
+class _Fetch:
+    """호출 횟수를 세는 가짜 합성 (문구마다 다른 바이트)"""
+
+    def __init__(self, size=10, gate=None):
+        self.calls = 0
+        self.size = size
+        self.gate = gate
+
+    def __call__(self, text, lang):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(2)
+        return (f"{lang}:{text}:".encode() * self.size)[:self.size]
+
+
+def test_fetch_once_then_serve_bytes_and_path(tmp_path):
+    fetch = _Fetch()
+    cache = TTSCache(str(tmp_path), fetch_fn=fetch)
+    path, data = cache.get_audio("안녕", "ko")
+    assert fetch.calls == 1
+    with open(path, "rb") as f:
+        assert f.read() == data
+    assert cache.get_audio("안녕", "ko") == (path, data)
+    assert cache.get_path("안녕", "ko") == path
+    assert fetch.calls == 1
+
+
+def test_memory_hit_rewrites_missing_file(tmp_path):
+    fetch = _Fetch()
+    cache = TTSCache(str(tmp_path), fetch_fn=fetch)
+    path, data = cache.get_audio("hello", "en")
+    os.remove(path)
+    assert cache.get_audio("hello", "en") == (path, data)
+    assert os.path.exists(path)
+    assert fetch.calls == 1
+
+
+def test_disk_hit_after_restart_fills_memory(tmp_path):
+    TTSCache(str(tmp_path), fetch_fn=_Fetch()).get_audio("불 켰어요", "ko")
+    fetch = _Fetch()
+    cache = TTSCache(str(tmp_path), fetch_fn=fetch)
+    path, data = cache.get_audio("불 켰어요", "ko")
+    assert fetch.calls == 0
+    os.remove(path)
+    # 디스크에서 읽은 바이트는 메모리에 남아 있으므로 다시 받지 않음
+    assert cache.get_audio("불 켰어요", "ko")[1] == data
+    assert fetch.calls == 0
+
+
+def test_disk_limit_evicts_least_recent(tmp_path):
+    cache = TTSCache(str(tmp_path), max_disk_bytes=25, fetch_fn=_Fetch(size=10))
+    first = cache.get_path("a", "ko")
+    cache.get_path("b", "ko")
+    cache.get_path("a", "ko")          # a를 최근으로
+    cache.get_path("c", "ko")          # b가 밀려남
+    names = sorted(os.listdir(tmp_path))
+    assert len(names) == 2
+    assert os.path.basename(first) in names
+    assert os.path.basename(cache._path(cache.make_key("b", "ko"))) not in names
+
+
+def test_concurrent_requests_fetch_once(tmp_path):
+    gate = threading.Event()
+    fetch = _Fetch(gate=gate)
+    cache = TTSCache(str(tmp_path), fetch_fn=fetch)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_audio("같은 문장", "ko")))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    gate.set()
+    for t in threads:
+        t.join(5)
+    assert fetch.calls == 1
+    assert len(set(results)) == 1
@@ -0,0 +1,169 @@
+## 파이프라인 단계별 지연 시간 기록 (span 기반)
+## 음성(녹음 종료 -> 오디오 준비 -> Whisper -> 인텐트 -> TCP 전송 -> TTS 합성 -> 재생)과
+## 얼굴(요청 -> 카메라 -> 첫 프레임 -> 검출 -> 인코딩 -> 매칭 -> UNLOCK) 흐름의 단계 시간을 고정 크기 링 버퍼에 모은다.
+## 기록은 튜플 하나를 deque에 넣는 것뿐이라 부담이 작고, summary()는 단계별 p50/p95, export_jsonl()은 JSON 줄로 내보낸다.
+## profile()은 켜져 있을 때만 일정 비율로 cProfile을 걸어 핫 루프의 함수별 시간을 모은다 (기본은 꺼짐).
+import cProfile
+import io
+import itertools
+import json
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+
+class Trace:
+    """파이프라인 실행 한 번 (여러 스레드를 거쳐 전달되며, 단계마다 mark/record)"""
+
+    def __init__(self, tracer, pipeline, trace_id):
+        self.tracer = tracer
+        self.pipeline = pipeline
+        self.id = trace_id
+        self.origin = self._last = time.perf_counter()
+        self.finished = False
+        self._spans = []           # (단계, 초)
+        self._once = set()
+        self._lock = threading.Lock()
+
+    def mark(self, stage, restart=False):
+        """직전 mark 이후 지금까지를 stage로 기록 (restart=True면 이후 경과 시간의 기준점도 지금으로)"""
+        now = time.perf_counter()
+        self.record(stage, now - self._last)
+        self._last = now
+        if restart:
+            self.origin = now
+
+    def record(self, stage, seconds, once=False):
+        """다른 단계와 겹쳐 진행된 작업의 소요 시간 기록 (once=True면 같은 단계는 처음 한 번만)"""
+        with self._lock:
+            if once:
+                if stage in self._once:
+                    return
+                self._once.add(stage)
+            if not self.finished:
+                self._spans.append((stage, seconds))
+                return
+        # 끝난 뒤 들어온 단계(재생 등)는 바로 링 버퍼로
+        self.tracer._push(self.pipeline, self.id, stage, seconds)
+
+    def elapsed(self):
+        return time.perf_counter() - self.origin
+
+    def finish(self, stage="total"):
+        """기준점부터 지금까지를 stage로 기록하고 모은 단계를 링 버퍼에 반영 (두 번째 호출부터는 무시)"""
+        with self._lock:
+            if self.finished:
+                return
+            self._spans.append((stage, self.elapsed()))
+            self.finished = True
+            spans, self._spans = self._spans, []
+        for name, seconds in spans:
+            self.tracer._push(self.pipeline, self.id, name, seconds)
+
+
+class Tracer:
+    """단계 시간 링 버퍼 + 샘플링 cProfile"""
+
+    def __init__(self, capacity=4096, profile_rate=0.0):
+        self.capacity = capacity
+        self.profile_rate = profile_rate      # 0이면 프로파일링 꺼짐, 0.05면 호출 20번 중 한 번
+        self._ring = deque(maxlen=capacity)   # (순번, wall 시각, 파이프라인, trace id, 단계, 초)
+        self._ids = itertools.count(1)
+        self._seq = itertools.count(1)
+        self._exported = 0                    # 이 순번까지는 파일로 내보냄
+        self._profile_lock = threading.Lock() # cProfile은 한 번에 하나만 켤 수 있음
+        self._stats = None
+        self._stats_lock = threading.Lock()
+
+    def start(self, pipeline):
+        return Trace(self, pipeline, next(self._ids))
+
+    def _push(self, pipeline, trace_id, stage, seconds):
+        self._ring.append((next(self._seq), time.time(), pipeline, trace_id, stage, seconds))
+
+    # -----------------------------------------------------
+    # 조회/내보내기
+    # -----------------------------------------------------
+    def count(self, pipeline, stage):
+        """링 버퍼에 남아 있는 (pipeline, stage) 기록 수"""
+        return sum(1 for e in list(self._ring) if e[2] == pipeline and e[4] == stage)
+
+    def summary(self, pipeline=None):
+        """(파이프라인, 단계) -> {count, p50_ms, p95_ms, max_ms}"""
+        groups = {}
+        for _, _, pipe, _, stage, seconds in list(self._ring):
+            if pipeline is None or pipe == pipeline:
+                groups.setdefault((pipe, stage), []).append(seconds)
+        out = {}
+        for key, values in groups.items():
+            ms = np.asarray(values) * 1000.0
+            p50, p95 = np.percentile(ms, [50, 95])
+            out[key] = {"count": len(ms), "p50_ms": float(p50), "p95_ms": float(p95), "max_ms": float(ms.max())}
+        return out
+
+    def report(self, pipeline=None):
+        summary = self.summary(pipeline)
+        print("[Trace] 단계별 지연 시간 (p50 / p95 / max)")
+        for (pipe, stage), s in sorted(summary.items()):
+            print(f"   {pipe + '/' + stage:<28} {s['p50_ms']:8.1f} {s['p95_ms']:8.1f} {s['max_ms']:8.1f} ms  (n={s['count']})")
+        return summary
+
+    def export_jsonl(self, path):
+        """지난 내보내기 이후 새로 쌓인 기록을 JSON 줄로 파일 끝에 덧붙임 (링 버퍼는 그대로). 쓴 줄 수 반환"""
+        entries = [e for e in list(self._ring) if e[0] > self._exported]
+        if not entries:
+            return 0
+        self._exported = entries[-1][0]
+        with open(path, "a", encoding="utf-8") as f:
+            for _, ts, pipe, trace_id, stage, seconds in entries:
+                f.write(json.dumps({"ts": round(ts, 3), "pipeline": pipe, "trace": trace_id,
+                                    "stage": stage, "ms": round(seconds * 1000.0, 2)}) + "\n")
+        return len(entries)
+
+    # -----------------------------------------------------
+    # 샘플링 프로파일링
+    # -----------------------------------------------------
+    @contextmanager
+    def profile(self):
+        """profile_rate 비율로만 cProfile을 걸고 결과를 누적 (다른 스레드가 프로파일링 중이면 건너뜀)"""
+        if self.profile_rate <= 0 or random.random() >= self.profile_rate \
+                or not self._profile_lock.acquire(blocking=False):
+            yield
+            return
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError:
+            # 다른 프로파일러가 이미 켜져 있음
+            self._profile_lock.release()
+            yield
+            return
+        try:
+            yield
+        finally:
+            prof.disable()
+            self._profile_lock.release()
+            with self._stats_lock:
+                if self._stats is None:
+                    self._stats = pstats.Stats(prof, stream=io.StringIO())
+                else:
+                    self._stats.add(prof)
+
+    def dump_profile(self, path, top=25):
+        """누적된 프로파일을 pstats 파일로 저장하고 누적 시간 상위 함수를 출력 (없으면 False)"""
+        with self._stats_lock:
+            stats, self._stats = self._stats, None
+        if stats is None:
+            return False
+        stats.dump_stats(path)
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats("cumulative").print_stats(top)
+        print(f"[Trace] 프로파일 저장: {path}")
+        print(out.getvalue())
+        return True
@@ -0,0 +1,204 @@
+## TTS 음성 캐시
+## (text, lang)을 해시한 키로 합성된 mp3를 디스크와 메모리에 저장한다 (용량 제한 LRU).
+## 재생은 get_audio()가 돌려주는 바이트로 하므로 메모리에 있는 문구는 디스크를 읽지 않는다.
+## 자주 쓰는 고정 문구는 시작 시 미리 받아 두어 네트워크 지연 없이 바로 재생할 수 있다.
+## 파일은 잠금 밖에서 임시 이름으로 쓴 뒤 교체하고 색인만 잠금 안에서 바꾸므로,
+## 여러 스레드가 동시에 말해도 파일이 꼬이지 않고 디스크 쓰기가 다른 조회를 막지 않는다.
+import hashlib
+import os
+import threading
+import urllib.parse
+from collections import OrderedDict
+
+import requests
+
+TTS_URL = "https://translate.google.com/translate_tts?ie=UTF-8&q={q}&tl={lang}&client=tw-ob"
+
+
+def fetch_google_tts(text, lang, session=None):
+    """Google TTS에서 mp3 바이트를 받아옴 (session을 주면 그 연결 풀을 재사용)"""
+    url = TTS_URL.format(q=urllib.parse.quote(text), lang=lang)
+    res = (session or requests).get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=5)
+    res.raise_for_status()
+    if not res.content:
+        raise ValueError("빈 TTS 응답")
+    return res.content
+
+
+class TTSCache:
+    """(text, lang) -> mp3 바이트/파일 경로를 돌려주는 2단 (메모리/디스크) LRU 캐시"""
+
+    def __init__(self, cache_dir, max_disk_bytes=64 * 1024 * 1024, max_mem_bytes=8 * 1024 * 1024,
+                 fetch_fn=fetch_google_tts):
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_mem_bytes = max_mem_bytes
+        self.fetch_fn = fetch_fn
+
+        self._lock = threading.Lock()
+        self._mem = OrderedDict()     # key -> mp3 bytes
+        self._mem_bytes = 0
+        self._disk = OrderedDict()    # key -> 파일 크기 (오래된 것부터)
+        self._disk_bytes = 0
+        self._inflight = {}           # key -> Event (같은 문장 중복 요청 방지)
+        self._indexed = False         # 디스크 색인은 처음 조회할 때 (생성만으로는 디스크를 읽지 않음)
+
+    @staticmethod
+    def make_key(text, lang):
+        return hashlib.sha1(f"{lang}\0{text}".encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".mp3")
+
+    def _load_index(self):
+        """기존 캐시 파일을 마지막 사용 시각 순으로 색인 (self._lock 보유 상태에서 처음 한 번) -> 밀려난 키 목록"""
+        self._indexed = True
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".mp3"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, name[:-4], st.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+        return self._evict_disk()
+
+    # -----------------------------------------------------
+    # LRU 관리 (self._lock 보유 상태에서 호출, 파일 I/O는 하지 않음)
+    # -----------------------------------------------------
+    def _remember(self, key, data):
+        if key in self._mem:
+            self._mem.move_to_end(key)
+            return
+        self._mem[key] = data
+        self._mem_bytes += len(data)
+        while self._mem_bytes > self.max_mem_bytes and len(self._mem) > 1:
+            _, old = self._mem.popitem(last=False)
+            self._mem_bytes -= len(old)
+
+    def _touch_disk(self, key, size):
+        """디스크 색인 갱신 -> 지워야 할 (밀려난) 키 목록 (파일 삭제는 잠금 밖에서 _remove)"""
+        if key in self._disk:
+            self._disk_bytes -= self._disk.pop(key)
+        self._disk[key] = size
+        self._disk_bytes += size
+        return self._evict_disk()
+
+    def _evict_disk(self):
+        evicted = []
+        while self._disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            evicted.append(key)
+        return evicted
+
+    def _remove(self, keys):
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    # -----------------------------------------------------
+    # 조회
+    # -----------------------------------------------------
+    def get_audio(self, text, lang):
+        """(mp3 경로, mp3 바이트) 반환. 메모리에 있으면 디스크를 읽지 않음 (없으면 합성 후 저장)"""
+        key = self.make_key(text, lang)
+        path = self._path(key)
+
+        while True:
+            with self._lock:
+                if not self._indexed:
+                    evicted = self._load_index()
+                else:
+                    evicted = []
+                data = self._mem.get(key)
+                if data is not None:
+                    self._mem.move_to_end(key)
+                on_disk = key in self._disk
+                if on_disk:
+                    self._disk.move_to_end(key)
+                waiter = None
+                if data is None and not on_disk:
+                    waiter = self._inflight.get(key)
+                    owner = waiter is None
+                    if owner:
+                        waiter = self._inflight[key] = threading.Event()
+            self._remove(evicted)
+
+            if data is not None:
+                if not on_disk or not os.path.exists(path):
+                    # 디스크에서 지워졌지만 메모리에 남아 있으면 다시 기록 (경로로 재생하는 경우 대비)
+                    self._write(key, data)
+                break
+            if on_disk:
+                try:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                except OSError:
+                    # 색인에는 있지만 파일이 사라짐 -> 색인에서 빼고 다시 조회
+                    with self._lock:
+                        if key in self._disk:
+                            self._disk_bytes -= self._disk.pop(key)
+                    continue
+                with self._lock:
+                    self._remember(key, data)
+                break
+
+            if not owner:
+                waiter.wait()
+                continue
+
+            try:
+                data = self.fetch_fn(text, lang)
+                with self._lock:
+                    self._remember(key, data)
+                self._write(key, data)
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                waiter.set()
+            break
+
+        try:
+            os.utime(path)   # 재시작 후에도 LRU 순서가 유지되도록 사용 시각 갱신
+        except OSError:
+            pass
+        return path, data
+
+    def get_path(self, text, lang):
+        """캐시된 mp3 경로 반환 (없으면 합성 후 저장)"""
+        return self.get_audio(text, lang)[0]
+
+    def _write(self, key, data):
+        """잠금 밖에서 임시 파일에 쓰고 교체한 뒤, 잠금 안에서 색인에만 반영"""
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            evicted = self._touch_disk(key, len(data))
+        self._remove(evicted)
+
+    def prewarm(self, phrases):
+        """(text, lang) 목록을 백그라운드에서 미리 합성"""
+        def worker():
+            ok = 0
+            for text, lang in phrases:
+                try:
+                    self.get_path(text, lang)
+                    ok += 1
+                except Exception as e:
+                    print(f"[TTS] 사전 캐시 실패 '{text}': {e}")
+            print(f"[TTS] 고정 문구 {ok}/{len(phrases)}개 캐시 완료")
+
+        t = threading.Thread(target=worker, daemon=True)
+        t.start()
+        return t
@@ -0,0 +1,123 @@
+## 무거운 모델 지연 로딩 + 시작 단계별 시간 기록
+## Whisper, dlib(face_recognition), Gemini 같은 모델은 리스너가 먼저 뜬 뒤 백그라운드 스레드에서 읽거나 처음 쓸 때 읽는다.
+## 로딩 중에 들어온 요청은 실패시키지 않고 get()/wait()에서 준비될 때까지 기다린다 (요청이 줄 서는 효과).
+## StageTimer는 시작 단계별 소요 시간을 모아 한 번에 출력해서 시작 지연이 다시 늘어나는지 확인할 수 있게 한다.
+import asyncio
+import threading
+import time
+
+IDLE = "idle"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class StageTimer:
+    """시작 단계 이름 -> 소요 시간(초) 기록"""
+
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self._stages = []          # (이름, 소요 시간, 시작 후 경과)
+        self._lock = threading.Lock()
+        self._last = self.origin
+
+    def mark(self, name):
+        """직전 mark 이후 지금까지를 name 단계로 기록"""
+        now = time.perf_counter()
+        with self._lock:
+            self._stages.append((name, now - self._last, now - self.origin))
+            self._last = now
+
+    def record(self, name, seconds):
+        """다른 단계와 겹쳐 진행된 작업(백그라운드 로딩 등)의 소요 시간 기록"""
+        with self._lock:
+            self._stages.append((name, seconds, time.perf_counter() - self.origin))
+
+    def report(self):
+        with self._lock:
+            stages = list(self._stages)
+        print("[Startup] 단계별 시작 시간")
+        for name, took, at in stages:
+            print(f"   {name:<24} {took * 1000:8.0f} ms   (시작 후 {at:.2f}s)")
+        return stages
+
+
+class LazyModel:
+    """loader()로 만드는 모델을 한 번만 읽고, 준비 상태(state)를 제공"""
+
+    def __init__(self, name, loader, timer=None):
+        self.name = name
+        self.loader = loader
+        self.timer = timer
+        self.state = IDLE
+        self.error = None
+        self._value = None
+        self._cond = threading.Condition()
+        self._waiters = []         # wait()로 기다리는 (루프, asyncio Future)
+
+    @property
+    def ready(self):
+        return self.state == READY
+
+    def start(self):
+        """백그라운드 스레드에서 로딩 시작 (이미 시작/완료됐으면 무시, 실패했으면 다시 시도)"""
+        with self._cond:
+            if self.state in (LOADING, READY):
+                return
+            self.state = LOADING
+            self.error = None
+        threading.Thread(target=self._load, name=f"load-{self.name}", daemon=True).start()
+
+    def _load(self):
+        print(f"[System] {self.name} 로딩 중...")
+        started = time.perf_counter()
+        try:
+            value = self.loader()
+        except Exception as e:
+            print(f"[System] {self.name} 로딩 실패: {e}")
+            with self._cond:
+                self.state = FAILED
+                self.error = e
+                self._cond.notify_all()
+            self._wake_waiters()
+            return
+        took = time.perf_counter() - started
+        with self._cond:
+            self._value = value
+            self.state = READY
+            self._cond.notify_all()
+        self._wake_waiters()
+        if self.timer is not None:
+            self.timer.record(f"{self.name} (background)", took)
+        print(f"[System] {self.name} 준비 완료 ({took:.1f}s)")
+
+    def _wake_waiters(self):
+        with self._cond:
+            waiters, self._waiters = self._waiters, []
+        for loop, fut in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(lambda f=fut: f.done() or f.set_result(None))
+
+    def _result(self):
+        if self.state == FAILED:
+            raise RuntimeError(f"{self.name} 로딩 실패: {self.error}")
+        return self._value
+
+    def get(self, timeout=None):
+        """모델 반환. 아직 로딩 전이면 시작하고, 준비될 때까지 기다림 (루프 스레드에서는 wait() 사용)"""
+        self.start()
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.state in (READY, FAILED), timeout=timeout):
+                raise TimeoutError(f"{self.name} 로딩 대기 시간 초과")
+            return self._result()
+
+    async def wait(self):
+        """이벤트 루프에서 준비될 때까지 기다림 (스레드를 잡지 않음). 실패하면 RuntimeError"""
+        self.start()
+        fut = asyncio.get_running_loop().create_future()
+        with self._cond:
+            if self.state in (READY, FAILED):
+                return self._result()
+            self._waiters.append((fut.get_loop(), fut))
+        await fut
+        return self._result()